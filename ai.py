@@ -1,49 +1,452 @@
 import httpx
 from dotenv import load_dotenv
+import asyncio
+import json
 import os
+import threading
+import time
+from collections import deque
 
 load_dotenv()
 OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
+OPENROUTER_URL = os.getenv("LLM_BASE_URL", 'https://openrouter.ai/api/v1') + '/chat/completions'
+
+# Models to use, in order of preference (comma separated in LLM_MODELS)
+LLM_MODELS = [m.strip() for m in os.getenv(
+    "LLM_MODELS",
+    "mistralai/mistral-small-3.1-24b-instruct,google/gemini-flash-1.5"
+).split(",") if m.strip()]
+
+# Routing strategy:
+#   "fallback" - try models one after another until one answers
+#   "hedged"   - start the next model if no token arrived within LLM_HEDGE_MS
+#   "latency"  - order models by rolling p95 time-to-first-token, then fall back
+LLM_ROUTING = os.getenv("LLM_ROUTING", "hedged")
+LLM_HEDGE_MS = float(os.getenv("LLM_HEDGE_MS", "1500"))
+LLM_TIMEOUT = 30  # seconds, per model
+
+LATENCY_WINDOW = 50  # Number of recent time-to-first-token samples kept per model
+
+# Backend:
+#   "remote" - the models above, on LLM_BASE_URL
+#   "local"  - a local model only (offline)
+#   "draft"  - a local draft shown at once while the remote models write the polished answer
+LLM_BACKEND = os.getenv("LLM_BACKEND", "remote")
+# Local model: a GGUF file run in-process with llama-cpp-python, or else an
+# OpenAI-compatible local server (llama.cpp's llama-server, Ollama, vLLM...)
+LOCAL_LLM_MODEL_PATH = os.getenv("LOCAL_LLM_MODEL_PATH", "")
+LOCAL_LLM_BASE_URL = os.getenv("LOCAL_LLM_BASE_URL", "http://127.0.0.1:8080/v1")
+LOCAL_LLM_MODEL = os.getenv("LOCAL_LLM_MODEL", "local")
+LOCAL_LLM_MAX_TOKENS = int(os.getenv("LOCAL_LLM_MAX_TOKENS", "250"))  # Drafts are kept short
+LOCAL_LLM_CONTEXT = 4096  # llama.cpp context window (tokens)
+LOCAL_LLM_GPU_LAYERS = int(os.getenv("LOCAL_LLM_GPU_LAYERS", "-1"))  # -1 = all layers on the GPU if any
+
+# Providers on OpenRouter that need an explicit cache_control breakpoint.
+# Others (OpenAI, DeepSeek, Mistral...) cache a stable prefix automatically.
+CACHE_CONTROL_PREFIXES = ("anthropic/", "google/gemini")
+
+# Running totals of prompt caching, filled from the response `usage` field
+prompt_cache_stats = {
+    "requests": 0,
+    "prompt_tokens": 0,
+    "cached_tokens": 0,
+    "uncached_tokens": 0,
+}
+
+
+def build_messages(system_prompt: str,
+            user_message: str,
+            context: str = "",
+            profile: str = "",
+            model: str = "") -> list:
+    """
+    Build the chat messages so that the static part of the prompt is a
+    byte-identical prefix across requests.
+
+    Layout: [system prompt + candidate profile] then [RAG context + question].
+    Everything that changes between questions comes after the stable prefix.
+    """
+    static_prefix = system_prompt
+    if profile:
+        static_prefix = f"{system_prompt}\n\n### CANDIDATE PROFILE:\n{profile}"
+
+    if model.startswith(CACHE_CONTROL_PREFIXES):
+        system_content = [{
+            "type": "text",
+            "text": static_prefix,
+            "cache_control": {"type": "ephemeral"}
+        }]
+    else:
+        system_content = static_prefix
+
+    # Build the user message with RAG context if provided
+    full_user_message = user_message
+    if context:
+        full_user_message = f"{context}\n\n### INTERVIEW QUESTION:\n{user_message}"
+
+    return [
+        {"role": "system", "content": system_content},
+        {"role": "user", "content": full_user_message}
+    ]
+
+
+def record_usage(usage: dict):
+    """Accumulate cached vs. uncached prompt tokens from a response `usage` field"""
+    if not usage:
+        return
+    prompt_tokens = usage.get('prompt_tokens', 0) or 0
+    details = usage.get('prompt_tokens_details') or {}
+    cached_tokens = details.get('cached_tokens', 0) or 0
+
+    prompt_cache_stats["requests"] += 1
+    prompt_cache_stats["prompt_tokens"] += prompt_tokens
+    prompt_cache_stats["cached_tokens"] += cached_tokens
+    prompt_cache_stats["uncached_tokens"] += prompt_tokens - cached_tokens
+
+    print(f"[LLM] Prompt tokens: {prompt_tokens} (cached: {cached_tokens}, uncached: {prompt_tokens - cached_tokens})")
+
+
+# Rolling time-to-first-token samples per model (seconds)
+model_latencies = {}
+
+
+def record_latency(model: str, seconds: float):
+    """Add a time-to-first-token sample for a model"""
+    model_latencies.setdefault(model, deque(maxlen=LATENCY_WINDOW)).append(seconds)
+
+
+def p95_latency(model: str) -> float:
+    """Rolling p95 time-to-first-token of a model (0 if never measured, failures count as LLM_TIMEOUT)"""
+    samples = model_latencies.get(model)
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+
+
+def order_models(models: list, strategy: str) -> list:
+    """Order candidate models for a strategy (unmeasured models are tried first, failing ones last)"""
+    if strategy == "latency":
+        return sorted(models, key=p95_latency)
+    return list(models)
+
+
+# Per-backend generation speed: time to first token and decode rate
+backend_stats = {}
+
+
+def record_generation(backend: str, first_token: float, tokens: int, seconds: float):
+    """Add a completed generation (`seconds` from the first token to the last)"""
+    stats = backend_stats.setdefault(backend, {
+        "requests": 0, "first_token": deque(maxlen=LATENCY_WINDOW), "tokens": 0, "seconds": 0.0
+    })
+    stats["requests"] += 1
+    stats["first_token"].append(first_token)
+    stats["tokens"] += tokens
+    stats["seconds"] += seconds
+
+
+def backend_report() -> str:
+    """One line per backend: TTFT percentiles and tokens/sec"""
+    lines = []
+    for backend, stats in backend_stats.items():
+        ordered = sorted(stats["first_token"])
+        p50 = ordered[len(ordered) // 2]
+        p95 = ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+        rate = stats["tokens"] / stats["seconds"] if stats["seconds"] else 0.0
+        lines.append(f"{backend}: TTFT p50 {p50:.2f}s, p95 {p95:.2f}s, "
+                     f"{rate:.1f} tokens/s ({stats['requests']} requests)")
+    return "\n".join(lines)
+
+
+async def stream_completion(client: httpx.AsyncClient, payload: dict, url: str = None, api_key: str = None):
+    """Yield content tokens from a streamed chat completion"""
+    api_key = OPENROUTER_API_KEY if api_key is None else api_key
+    headers = {'Content-Type': 'application/json'}
+    if api_key:  # Local servers usually need none
+        headers['Authorization'] = f'Bearer {api_key}'
+
+    async with client.stream('POST', url or OPENROUTER_URL, headers=headers,
+                             json={**payload, "stream": True},
+                             timeout=LLM_TIMEOUT) as response:
+        if response.status_code != 200:
+            body = await response.aread()
+            raise RuntimeError(f"HTTP {response.status_code}: {body[:200]!r}")
+
+        async for line in response.aiter_lines():
+            # SSE: skip keep-alive comments and blank lines
+            if not line.startswith('data:'):
+                continue
+            data = line[len('data:'):].strip()
+            if data == '[DONE]':
+                return
+
+            chunk = json.loads(data)
+            if chunk.get('error'):
+                # Mid-stream errors come as a chunk, the HTTP status is already 200
+                raise RuntimeError(f"stream error: {chunk['error']}")
+            if chunk.get('usage'):
+                record_usage(chunk['usage'])
+            for choice in chunk.get('choices', []):
+                token = (choice.get('delta') or {}).get('content')
+                if token:
+                    yield token
+        raise RuntimeError("stream ended before [DONE] (connection dropped)")
+
+
+class RemoteBackend:
+    def __init__(self, name: str, url: str = None, api_key: str = None):
+        """
+        OpenAI-compatible chat completions endpoint (OpenRouter, llama-server, Ollama...).
+        url/api_key default to OPENROUTER_URL/OPENROUTER_API_KEY, read at request time.
+        """
+        self.name = name
+        self.url = url
+        self.api_key = api_key
+
+    def stream(self, client: httpx.AsyncClient, payload: dict):
+        return stream_completion(client, payload, self.url, self.api_key)
+
+
+class LlamaCppBackend:
+    def __init__(self, model_path: str, n_ctx: int = LOCAL_LLM_CONTEXT, n_gpu_layers: int = LOCAL_LLM_GPU_LAYERS):
+        """
+        Small quantized GGUF model run in this process with llama-cpp-python:
+        no network round-trip and no remote queueing. Generation runs in a
+        thread, one request at a time; tokens are handed to the event loop.
+        """
+        self.name = "llama.cpp"
+        self.model_path = model_path
+        self.n_ctx = n_ctx
+        self.n_gpu_layers = n_gpu_layers
+        self.llm = None
+        self.lock = threading.Lock()
+
+    def load(self):
+        if self.llm is None:
+            from llama_cpp import Llama
+            print(f"Loading local LLM {os.path.basename(self.model_path)}...")
+            self.llm = Llama(model_path=self.model_path, n_ctx=self.n_ctx,
+                             n_gpu_layers=self.n_gpu_layers, verbose=False)
+        return self.llm
+
+    async def stream(self, client, payload: dict):
+        loop = asyncio.get_running_loop()
+        tokens = asyncio.Queue()
+        cancelled = threading.Event()
+
+        def emit(item):
+            try:
+                loop.call_soon_threadsafe(tokens.put_nowait, item)
+            except RuntimeError:
+                pass  # Event loop closed: nobody is waiting any more
+
+        def generate():
+            try:
+                with self.lock:
+                    chunks = self.load().create_chat_completion(
+                        messages=payload["messages"], max_tokens=payload["max_tokens"],
+                        temperature=payload["temperature"], stream=True)
+                    for chunk in chunks:
+                        if cancelled.is_set():
+                            break
+                        token = (chunk["choices"][0].get("delta") or {}).get("content")
+                        if token:
+                            emit(token)
+            except Exception as e:
+                emit(e)
+            finally:
+                emit(None)
+
+        threading.Thread(target=generate, daemon=True).start()
+        try:
+            while True:
+                item = await tokens.get()
+                if item is None:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            cancelled.set()  # Also stops the thread when the request is cancelled
+
+
+remote_backend = RemoteBackend("remote")
+_local_backend = None
+
+
+def get_local_backend():
+    """The configured local backend (created on first use)"""
+    global _local_backend
+    if _local_backend is None:
+        if LOCAL_LLM_MODEL_PATH:
+            _local_backend = LlamaCppBackend(LOCAL_LLM_MODEL_PATH)
+        else:
+            _local_backend = RemoteBackend("local", LOCAL_LLM_BASE_URL + '/chat/completions',
+                                           os.getenv("LOCAL_LLM_API_KEY", ""))
+    return _local_backend
+
+
+async def race_models(models: list, make_payload, hedge_delay, on_token=None, backend=None):
+    """
+    Run models with hedging: a model is started, and the next one is started
+    if no token arrived after `hedge_delay` seconds (None = only on failure).
+    The first model to stream a token wins and the others are cancelled.
+    If the winner fails mid-stream, it is penalized and the remaining models
+    (the cancelled ones first) are tried again; on_token has then already
+    received the start of the failed answer.
+
+    Returns:
+        (answer, model) or (None, None) if every model failed
+    """
+    backend = backend or remote_backend
+    winner = {}
+    first_token = asyncio.Event()
+
+    async def attempt(client, model):
+        parts = []
+        start = time.time()
+        async for token in backend.stream(client, make_payload(model)):
+            if not winner:
+                winner['model'] = model
+                winner['first_token'] = time.time()
+                record_latency(model, winner['first_token'] - start)
+                first_token.set()
+            if winner['model'] != model:
+                return None
+            parts.append(token)
+            if on_token:
+                on_token(token)
+        if parts:
+            # Streamed chunks are counted as tokens (one token per chunk on most servers)
+            record_generation(backend.name, winner['first_token'] - start, len(parts),
+                              time.time() - winner['first_token'])
+        return "".join(parts)
+
+    async with httpx.AsyncClient() as client:
+        queue = list(models)
+        running = {}
+        waiter = asyncio.create_task(first_token.wait())
+
+        try:
+            while queue or running:
+                # Launch the next model if nothing is running or the hedge fired
+                if queue and not winner:
+                    model = queue.pop(0)
+                    print(f"[LLM] Starting {model}")
+                    running[asyncio.create_task(attempt(client, model))] = model
+
+                timeout = hedge_delay if queue and not winner else None
+                done, _ = await asyncio.wait(set(running) | {waiter},
+                                             timeout=timeout,
+                                             return_when=asyncio.FIRST_COMPLETED)
+
+                if winner:
+                    # Cancel the losers, stream the winner to completion
+                    losers = []
+                    for task, model in list(running.items()):
+                        if model != winner['model']:
+                            task.cancel()
+                            del running[task]
+                            losers.append(model)
+                    winning_task = next(t for t, m in running.items() if m == winner['model'])
+                    try:
+                        return await winning_task, winner['model']
+                    except Exception as e:
+                        print(f"[LLM] {winner['model']} failed mid-stream: {e}")
+                        record_latency(winner['model'], LLM_TIMEOUT)
+                        del running[winning_task]
+                        queue[:0] = losers
+                        winner.clear()
+                        first_token.clear()
+                        waiter = asyncio.create_task(first_token.wait())
+                        continue
+
+                for task in done:
+                    if task is waiter:
+                        continue
+                    model = running.pop(task)
+                    error = task.exception()
+                    print(f"[LLM] {model} failed: {error or 'empty response'}")
+                    # Penalty sample, so a failing model sorts behind working ones
+                    record_latency(model, LLM_TIMEOUT)
+        finally:
+            waiter.cancel()
+            for task in running:
+                task.cancel()
+
+    return None, None
+
 
 async def generate_chatbot_response(system_prompt: str,
             user_message: str,
             temperature: float,
             max_tokens: int,
-            context: str = "") -> str:
+            context: str = "",
+            profile: str = "",
+            models: list = None,
+            strategy: str = None,
+            on_token=None,
+            backend: str = None,
+            on_draft=None) -> str:
+    """
+    Stream an answer with the configured backend (LLM_BACKEND, or `backend`).
 
+    In "draft" mode, on_draft(token) receives the tokens of the local draft
+    as they stream, until the remote answer is there; the remote answer is
+    returned, or the draft if every remote model failed.
+    """
     try:
-        headers = {
-            'Authorization': f'Bearer {OPENROUTER_API_KEY}',
-            'Content-Type': 'application/json',
-        }
-        
-        # Build the user message with RAG context if provided
-        full_user_message = user_message
-        if context:
-            full_user_message = f"{context}\n\n### INTERVIEW QUESTION:\n{user_message}"
-        
-        payload = {
-            "model": "mistralai/mistral-small-3.1-24b-instruct",
-            "messages": [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": full_user_message}
-            ],
-            "max_tokens": max_tokens,
-            "temperature": temperature
-        }
-        
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                'https://openrouter.ai/api/v1/chat/completions',
-                headers=headers,
-                json=payload,
-                timeout=30
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                return result['choices'][0]['message']['content']
+        strategy = strategy or LLM_ROUTING
+        backend = backend or LLM_BACKEND
+        candidates = order_models(models or LLM_MODELS, strategy)
+
+        def make_payload(model, tokens=max_tokens):
+            return {
+                "model": model,
+                "messages": build_messages(system_prompt, user_message, context, profile, model),
+                "max_tokens": tokens,
+                "temperature": temperature,
+                "usage": {"include": True}
+            }
+
+        if backend == "local":
+            answer, model = await race_models([LOCAL_LLM_MODEL], make_payload, None, on_token, get_local_backend())
+            if answer:
+                return answer
+            print("[LLM] Local model failed")
+            return None
+
+        draft_task = None
+        if backend == "draft":
+            async def draft():
+                text, _ = await race_models(
+                    [LOCAL_LLM_MODEL], lambda model: make_payload(model, min(max_tokens, LOCAL_LLM_MAX_TOKENS)),
+                    None, on_draft, get_local_backend())
+                return text
+            draft_task = asyncio.create_task(draft())
+
+        hedge_delay = LLM_HEDGE_MS / 1000 if strategy == "hedged" else None
+        try:
+            answer, model = await race_models(candidates, make_payload, hedge_delay, on_token)
+        except BaseException:
+            if draft_task:
+                draft_task.cancel()
+            raise
+
+        if answer:
+            if draft_task and not draft_task.done():
+                draft_task.cancel()  # The polished answer came first
+            print(f"[LLM] Answer from {model} (p95 first token: {p95_latency(model):.2f}s)")
+            return answer
+
+        print("[LLM] All models failed")
+        if draft_task:
+            # Offline: the local draft becomes the answer
+            text = await draft_task
+            if text:
+                print("[LLM] Using the local draft")
+                return text
 
     except Exception as e:
         print(f"LLM general conversation error: {e}")
-
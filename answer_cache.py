@@ -0,0 +1,207 @@
+import os
+import pickle
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+import numpy as np
+
+# Configuration
+SIMILARITY_THRESHOLD = 0.88  # Cosine similarity needed to reuse a cached answer
+CACHE_TTL = 7 * 24 * 3600    # Seconds before a cached answer expires
+MAX_ENTRIES = 500            # Least recently used answers are evicted beyond this
+MIN_CONTENT_WORDS = 2        # Shorter questions only reuse the answer of the same question
+
+# Function words (English and French) that do not make a question specific
+STOPWORDS = {
+    "the", "and", "you", "your", "are", "was", "were", "did", "does", "for", "with", "about",
+    "what", "why", "how", "when", "where", "who", "which", "can", "could", "would", "tell",
+    "les", "des", "une", "est", "que", "qui", "quoi", "vous", "votre", "vos", "pour", "avec",
+    "dans", "sur", "pourquoi", "comment", "quel", "quelle", "quels", "quelles", "avez",
+}
+
+
+def question_key(question: str) -> str:
+    """Exact-match key of a question (case and whitespace insensitive)"""
+    return " ".join(question.lower().split())
+
+
+def content_words(question: str) -> int:
+    """Number of words that make a question specific (3+ letters, not a function word)"""
+    return sum(1 for word in re.findall(r"\w+", question.lower())
+               if len(word) >= 3 and word not in STOPWORDS)
+
+
+class AnswerCache:
+    def __init__(self, encode: Callable, fingerprint: Callable[[], str],
+                 cache_file: str = "embeddings/answer_cache.pkl",
+                 threshold: float = SIMILARITY_THRESHOLD,
+                 ttl: float = CACHE_TTL,
+                 max_entries: int = MAX_ENTRIES):
+        """
+        Persistent semantic cache of AI answers keyed by question embedding.
+
+        Args:
+            encode: Function mapping a list of texts to an embedding matrix
+            fingerprint: Function returning the current fingerprint of the documents
+                         and embedding model; the whole cache is dropped when it changes
+            cache_file: Where the cache is stored on disk
+        """
+        self.encode = encode
+        self.fingerprint = fingerprint
+        self.cache_file = Path(cache_file)
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+        self.lock = threading.Lock()
+        self.entries = []  # dicts: question, answer, created, last_used
+        self.dirty = False # last_used changed since the last save
+        self.embeddings = np.zeros((0, 0), dtype=np.float32)  # normalized, one row per entry
+        self.documents_fingerprint = fingerprint()
+
+        self._load()
+
+    def _load(self):
+        """Load the cache from disk, discarding it if documents changed"""
+        if not self.cache_file.exists():
+            return
+        try:
+            with open(self.cache_file, 'rb') as f:
+                data = pickle.load(f)
+            if data.get('fingerprint') != self.documents_fingerprint:
+                print("[CACHE] Documents or embedding model changed, discarding cached answers")
+                return
+            self.entries = data['entries']
+            self.embeddings = data['embeddings']
+            self._expire()
+            print(f"[CACHE] Loaded {len(self.entries)} cached answers")
+        except Exception as e:
+            print(f"[CACHE] Could not load answer cache: {e}")
+
+    def _save(self):
+        """Write the cache atomically (caller holds the lock)"""
+        try:
+            self.cache_file.parent.mkdir(exist_ok=True)
+            tmp_file = self.cache_file.with_suffix('.tmp')
+            with open(tmp_file, 'wb') as f:
+                pickle.dump({
+                    'fingerprint': self.documents_fingerprint,
+                    'entries': self.entries,
+                    'embeddings': self.embeddings
+                }, f)
+            os.replace(tmp_file, self.cache_file)
+            self.dirty = False
+        except Exception as e:
+            print(f"[CACHE] Could not save answer cache: {e}")
+
+    def embed(self, question: str) -> np.ndarray:
+        """Normalized embedding of a question (can be passed to lookup/store)"""
+        embedding = np.asarray(self.encode([question])[0], dtype=np.float32)
+        return embedding / (np.linalg.norm(embedding) + 1e-12)
+
+    def _keep(self, mask: np.ndarray):
+        self.entries = [entry for entry, keep in zip(self.entries, mask) if keep]
+        self.embeddings = self.embeddings[mask]
+
+    def _expire(self):
+        """Drop entries older than the TTL"""
+        if not self.entries:
+            return
+        now = time.time()
+        mask = np.array([now - entry['created'] < self.ttl for entry in self.entries])
+        if not mask.all():
+            self._keep(mask)
+
+    def _check_documents(self):
+        """Invalidate everything if the documents changed since the cache was built"""
+        current = self.fingerprint()
+        if current != self.documents_fingerprint:
+            print("[CACHE] Documents or embedding model changed, invalidating cached answers")
+            self.documents_fingerprint = current
+            self.entries = []
+            self.embeddings = np.zeros((0, 0), dtype=np.float32)
+            self._save()
+
+    def lookup(self, question: str, embedding: np.ndarray = None,
+               exact: bool = False) -> Optional[Tuple[str, float]]:
+        """
+        Find a cached answer for a semantically similar question. With
+        exact=True only the same question (question_key) matches: short
+        questions are too close in embedding space to be told apart.
+
+        Returns:
+            (answer, similarity) or None on a miss
+        """
+        start_time = time.time()
+        if embedding is None and not exact:
+            embedding = self.embed(question)
+
+        with self.lock:
+            self._check_documents()
+            self._expire()
+            if not self.entries:
+                return None
+
+            if exact:
+                key = question_key(question)
+                similarities = np.array([1.0 if question_key(e['question']) == key else 0.0
+                                         for e in self.entries])
+            else:
+                similarities = self.embeddings @ embedding
+            best = int(np.argmax(similarities))
+            score = float(similarities[best])
+            if score < self.threshold:
+                return None
+
+            entry = self.entries[best]
+            entry['last_used'] = time.time()
+            self.dirty = True  # Saved with the next store() or close()
+            elapsed = (time.time() - start_time) * 1000
+            print(f"[CACHE] Hit ({score:.2f}) for \"{entry['question'][:50]}\" in {elapsed:.1f}ms")
+            return entry['answer'], score
+
+    def store(self, question: str, answer: str, embedding: np.ndarray = None, exact: bool = False):
+        """
+        Add an answer, replacing a near-duplicate question and evicting LRU entries.
+        With exact=True only an entry with the same question_key is replaced, so
+        distinct but similar questions (e.g. of the answer bank) all keep theirs.
+        """
+        if not answer:
+            return
+        if embedding is None:
+            embedding = self.embed(question)
+
+        now = time.time()
+        entry = {'question': question, 'answer': answer, 'created': now, 'last_used': now}
+
+        with self.lock:
+            self._check_documents()
+            if exact:
+                key = question_key(question)
+                self._keep(np.array([question_key(e['question']) != key for e in self.entries], dtype=bool))
+            elif self.entries:
+                similarities = self.embeddings @ embedding
+                self._keep(similarities < self.threshold)
+
+            if self.entries:
+                self.embeddings = np.vstack([self.embeddings, embedding[None, :]])
+            else:
+                self.embeddings = embedding[None, :]
+            self.entries.append(entry)
+
+            # LRU eviction
+            if len(self.entries) > self.max_entries:
+                order = np.argsort([e['last_used'] for e in self.entries])
+                mask = np.ones(len(self.entries), dtype=bool)
+                mask[order[:len(self.entries) - self.max_entries]] = False
+                self._keep(mask)
+
+            self._save()
+
+    def close(self):
+        """Save the last_used times of hits since the last store (LRU order survives restarts)"""
+        with self.lock:
+            if self.dirty:
+                self._save()
@@ -0,0 +1,203 @@
+"""
+Callback-mode audio capture with overflow and dropped-frame accounting.
+
+With blocking reads, PortAudio's small buffer overflows whenever the
+recording loop is busy (e.g. waiting for pending transcriptions after a
+silence), and the audio is silently discarded. Here PortAudio's callback
+pushes every block into a ring buffer that holds BUFFER_SECONDS of audio;
+the loop reads from it at its own pace and catches up after a stall.
+
+The ring is a bounded collections.deque: append in the callback and popleft
+in the reader are atomic, so neither side takes a lock and the callback
+never blocks.
+"""
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional
+import numpy as np
+
+# Configuration
+BUFFER_SECONDS = 60.0    # Audio the ring holds while the reader is stalled
+JITTER_WINDOW = 500      # Recent callbacks kept for the jitter percentile
+
+# PortAudio callback values (same as pyaudio.paContinue / paInputUnderflow / paInputOverflow)
+PA_CONTINUE = 0
+PA_INPUT_UNDERFLOW = 0x1
+PA_INPUT_OVERFLOW = 0x2
+
+
+class CallbackCapture:
+    def __init__(self, sample_rate: int, channels: int, frames_per_buffer: int = 1024,
+                 buffer_seconds: float = BUFFER_SECONDS):
+        """
+        Counters (see stats()):
+            overflows: callbacks PortAudio flagged with an input overflow (audio lost
+                       before the callback, usually a starved audio thread)
+            device_dropped_frames: frames missing between the ADC times of two callbacks
+            dropped_frames: frames evicted from the ring because the reader fell
+                            more than buffer_seconds behind
+            jitter: deviation of the callback interval from the block period
+        """
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.frames_per_buffer = frames_per_buffer
+        self.period = frames_per_buffer / sample_rate
+        self.capacity = max(1, int(buffer_seconds / self.period))
+        self.ring = deque(maxlen=self.capacity)
+        self.stream = None
+
+        self.callbacks = 0
+        self.frames_captured = 0
+        self.frames_read = 0
+        self.overflows = 0
+        self.underflows = 0
+        self.dropped_frames = 0
+        self.device_dropped_frames = 0
+        self.late_callbacks = 0
+        self.jitter = deque(maxlen=JITTER_WINDOW)
+        self.last_callback = None
+        self.last_adc_time = None
+
+    def open(self, p, device_index: int):
+        """Open a PyAudio input stream in callback mode on `device_index`"""
+        import pyaudiowpatch as pyaudio
+
+        self.stream = p.open(
+            format=pyaudio.paInt16,
+            channels=self.channels,
+            rate=self.sample_rate,
+            input=True,
+            input_device_index=device_index,
+            frames_per_buffer=self.frames_per_buffer,
+            stream_callback=self.callback
+        )
+        self.stream.start_stream()
+        return self
+
+    def callback(self, in_data, frame_count, time_info, status_flags):
+        """PortAudio callback: account the block and push it (never blocks)"""
+        now = time.perf_counter()
+        if self.last_callback is not None:
+            interval = now - self.last_callback
+            self.jitter.append(abs(interval - self.period))
+            if interval > 2 * self.period:
+                self.late_callbacks += 1
+        self.last_callback = now
+
+        adc_time = (time_info or {}).get('input_buffer_adc_time') or 0.0
+        if adc_time and self.last_adc_time:
+            gap = adc_time - self.last_adc_time - frame_count / self.sample_rate
+            if gap > 0.5 * self.period:
+                self.device_dropped_frames += int(gap * self.sample_rate)
+        self.last_adc_time = adc_time
+
+        if status_flags & PA_INPUT_OVERFLOW:
+            self.overflows += 1
+        if status_flags & PA_INPUT_UNDERFLOW:
+            self.underflows += 1
+        if len(self.ring) >= self.capacity:
+            self.dropped_frames += self.frames_per_buffer  # Oldest block evicted by the append
+        self.ring.append(in_data)
+        self.callbacks += 1
+        self.frames_captured += frame_count
+        return (None, PA_CONTINUE)
+
+    def read(self, poll_interval: float = 0.002) -> bytes:
+        """Next block, waiting for it like a blocking stream.read"""
+        while True:
+            try:
+                data = self.ring.popleft()
+            except IndexError:
+                time.sleep(poll_interval)
+                continue
+            self.frames_read += len(data) // (2 * self.channels)
+            return data
+
+    def clear(self):
+        """Discard buffered audio (e.g. captured while the app was starting)"""
+        self.ring.clear()
+
+    @property
+    def backlog_seconds(self) -> float:
+        return len(self.ring) * self.period
+
+    def stats(self) -> dict:
+        jitter = sorted(self.jitter)
+        return {
+            'callbacks': self.callbacks,
+            'overflows': self.overflows,
+            'underflows': self.underflows,
+            'dropped_frames': self.dropped_frames,
+            'device_dropped_frames': self.device_dropped_frames,
+            'late_callbacks': self.late_callbacks,
+            'jitter_p95_ms': jitter[int(0.95 * (len(jitter) - 1))] * 1000 if jitter else 0.0,
+            'jitter_max_ms': jitter[-1] * 1000 if jitter else 0.0,
+            'backlog_s': self.backlog_seconds,
+        }
+
+    def health(self) -> str:
+        """One-line summary for the status bar and trace output"""
+        s = self.stats()
+        lost = s['dropped_frames'] + s['device_dropped_frames']
+        return (f"Audio: {s['overflows']} overflows, {lost} frames dropped, "
+                f"jitter p95 {s['jitter_p95_ms']:.1f}ms, backlog {s['backlog_s']:.1f}s")
+
+    def close(self):
+        if self.stream is not None:
+            self.stream.stop_stream()
+            self.stream.close()
+            self.stream = None
+
+
+class SyntheticSource:
+    def __init__(self, callback: Callable, sample_rate: int = 48000, channels: int = 2,
+                 frames_per_buffer: int = 1024, signal: Optional[Callable[[int, int], np.ndarray]] = None):
+        """
+        Stand-in for a PortAudio input stream: calls `callback` with int16 blocks
+        at real-time pace from its own thread, with the same arguments
+        (in_data, frame_count, time_info, status_flags).
+
+        signal(start_frame, frame_count) returns int16 samples of shape
+        (frame_count, channels); default is a 220 Hz tone.
+        """
+        self.callback = callback
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.frames_per_buffer = frames_per_buffer
+        self.signal = signal or self._tone
+        self.frames = 0
+        self.running = False
+        self.thread = None
+
+    def _tone(self, start: int, count: int) -> np.ndarray:
+        t = (start + np.arange(count)) / self.sample_rate
+        tone = (np.sin(2 * np.pi * 220 * t) * 3000).astype(np.int16)
+        return np.repeat(tone[:, None], self.channels, axis=1)
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        return self
+
+    def _run(self):
+        period = self.frames_per_buffer / self.sample_rate
+        start = time.perf_counter()
+        while self.running:
+            deadline = start + (self.frames + self.frames_per_buffer) / self.sample_rate
+            delay = deadline - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            block = self.signal(self.frames, self.frames_per_buffer)
+            time_info = {'input_buffer_adc_time': start + self.frames / self.sample_rate,
+                         'current_time': time.perf_counter()}
+            # Late by more than a block: the device buffer overran meanwhile
+            flags = PA_INPUT_OVERFLOW if time.perf_counter() - deadline > period else 0
+            self.callback(block.tobytes(), self.frames_per_buffer, time_info, flags)
+            self.frames += self.frames_per_buffer
+
+    def stop(self):
+        self.running = False
+        if self.thread:
+            self.thread.join()
@@ -0,0 +1,91 @@
+"""
+Batched transcription benchmark: throughput and per-chunk latency of
+transcription_worker over batch sizes.
+
+A recording is cut into chunks of main.py's process interval. The chunks
+are queued all at once (a backlog, the worst case) or every --arrival-ms
+milliseconds. Larger batches raise throughput, but the first chunks of a
+batch wait for the whole batch to finish.
+
+Usage:
+    python benchmarks/bench_batched_whisper.py interview.wav [--batch-sizes 1 2 4 8] [--arrival-ms 0]
+"""
+import argparse
+import sys
+import threading
+import time
+import wave
+from pathlib import Path
+from queue import Queue
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from voice_to_text import transcription_worker
+
+CHUNK_SECONDS = 3.0  # main.py process_interval
+
+
+def load_chunks(path: str, seconds: float = CHUNK_SECONDS):
+    """(sample_rate, channels, [chunk bytes]) of a 16-bit PCM WAV file"""
+    with wave.open(path, 'rb') as wav:
+        sample_rate, channels = wav.getframerate(), wav.getnchannels()
+        frames = wav.readframes(wav.getnframes())
+    size = int(seconds * sample_rate) * channels * 2
+    return sample_rate, channels, [frames[i:i + size] for i in range(0, len(frames), size)]
+
+
+def run(sample_rate: int, channels: int, chunks: list, batch_size: int, arrival: float) -> dict:
+    transcription_queue = Queue()
+    results_queue = Queue()
+    stats = {}
+    worker = threading.Thread(
+        target=transcription_worker,
+        args=(sample_rate, channels, transcription_queue, results_queue),
+        kwargs={'stats': stats, 'max_batch_size': batch_size},
+        daemon=True
+    )
+    worker.start()
+
+    queued_at = {}
+    start = time.perf_counter()
+    for task_id, chunk in enumerate(chunks, 1):
+        queued_at[task_id] = time.perf_counter()
+        transcription_queue.put((chunk, task_id))
+        if arrival:
+            time.sleep(arrival)
+
+    latencies = []
+    for _ in chunks:
+        task_id, _ = results_queue.get()
+        latencies.append(time.perf_counter() - queued_at[task_id])
+    wall = time.perf_counter() - start
+    transcription_queue.put(None)
+    worker.join()
+
+    latencies.sort()
+    audio = len(chunks) * CHUNK_SECONDS
+    return {
+        'throughput': audio / wall,
+        'mean_batch': stats.get('tasks', 0) / max(stats.get('batches', 1), 1),
+        'p50_s': latencies[len(latencies) // 2],
+        'p95_s': latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark batched Whisper decoding")
+    parser.add_argument("wav", help="16-bit PCM recording to transcribe")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--arrival-ms", type=float, default=0, help="Delay between queued chunks (0 = backlog)")
+    args = parser.parse_args()
+
+    sample_rate, channels, chunks = load_chunks(args.wav)
+    print(f">>> {len(chunks)} chunks of {CHUNK_SECONDS}s, arrival every {args.arrival_ms:.0f}ms")
+
+    # Warm-up so the first configuration does not pay model initialization
+    run(sample_rate, channels, chunks[:1], 1, 0)
+
+    print(f"\n{'batch':>6} {'mean batch':>11} {'audio s/s':>10} {'p50 s':>7} {'p95 s':>7}")
+    for batch_size in args.batch_sizes:
+        stats = run(sample_rate, channels, chunks, batch_size, args.arrival_ms / 1000)
+        print(f"{batch_size:>6} {stats['mean_batch']:>11.1f} {stats['throughput']:>10.1f} "
+              f"{stats['p50_s']:>7.2f} {stats['p95_s']:>7.2f}")
@@ -0,0 +1,80 @@
+"""
+Conversation-aware retrieval benchmark on scripted multi-turn dialogues.
+
+Replays benchmarks/dialogues.json turn by turn and compares recall@k of
+single-turn retrieval (current question only) with ConversationMemory
+(question blended with the recent turns, plus the working set). Follow-up
+turns are reported separately from the opening questions.
+
+Usage:
+    python benchmarks/bench_conversation.py [--k 3]
+"""
+import argparse
+import contextlib
+import io
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from bench_retrieval import DATASET, build_rag
+from conversation_memory import ConversationMemory
+
+DIALOGUES = Path(__file__).parent / "dialogues.json"
+
+
+def replay(rag, dialogues: list, k: int, use_memory: bool) -> dict:
+    """Recall@k of opening and follow-up turns, and mean latency"""
+    index_of = {text: i for i, text in enumerate(rag.document_chunks)}
+    recalls = {'opening': [], 'follow-up': []}
+    latencies = []
+
+    for dialogue in dialogues:
+        memory = ConversationMemory(rag)
+        for turn_number, turn in enumerate(dialogue['turns']):
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                if use_memory:
+                    embedding = memory.embed(turn['query'])
+                    results = memory.retrieve(turn['query'], top_k=k, embedding=embedding)
+                    memory.add_turn(turn['query'], embedding)
+                else:
+                    results = rag.retrieve(turn['query'], top_k=k)
+                latencies.append((time.perf_counter() - start) * 1000)
+
+            retrieved = {index_of[chunk] for chunk, _, _ in results}
+            relevant = set(turn['relevant'])
+            recalls['opening' if turn_number == 0 else 'follow-up'].append(
+                len(retrieved & relevant) / len(relevant))
+
+    return {
+        'opening': sum(recalls['opening']) / len(recalls['opening']),
+        'follow_up': sum(recalls['follow-up']) / len(recalls['follow-up']),
+        'mean_ms': sum(latencies) / len(latencies),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark conversation-aware retrieval")
+    parser.add_argument("--k", type=int, default=3)
+    args = parser.parse_args()
+
+    with open(DATASET, 'r', encoding='utf-8') as f:
+        dataset = json.load(f)
+    with open(DIALOGUES, 'r', encoding='utf-8') as f:
+        dialogues = json.load(f)['dialogues']
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        rag = build_rag(dataset, tmp_dir)
+        with contextlib.redirect_stdout(io.StringIO()):
+            rag.retrieve("warm-up", top_k=args.k)
+
+        turns = sum(len(dialogue['turns']) for dialogue in dialogues)
+        print(f"\n{len(dialogues)} dialogues, {turns} turns, {len(rag.document_chunks)} chunks")
+        print(f"{'retrieval':<14} {'opening@' + str(args.k):>10} {'follow-up@' + str(args.k):>12} {'mean ms':>8}")
+        for name, use_memory in [("single-turn", False), ("conversation", True)]:
+            stats = replay(rag, dialogues, args.k, use_memory)
+            print(f"{name:<14} {stats['opening']:>10.3f} {stats['follow_up']:>12.3f} {stats['mean_ms']:>8.1f}")
@@ -0,0 +1,82 @@
+"""
+Embedding backend benchmark: import + load time, resident memory and
+per-query encode latency of the PyTorch and ONNX backends.
+
+Each backend runs in a fresh subprocess so import time and memory are not
+shared between measurements. Queries come from benchmarks/retrieval_set.json.
+
+Usage:
+    python onnx_encoder.py --export   # once
+    python benchmarks/bench_embedding_backend.py [--backends torch onnx-fp32 onnx-int8] [--repeat 5]
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+DATASET = Path(__file__).parent / "retrieval_set.json"
+sys.path.insert(0, str(ROOT))
+
+
+def run_backend(backend: str, repeat: int) -> dict:
+    """Measure one backend in this process (called in the subprocess)"""
+    with open(DATASET, 'r', encoding='utf-8') as f:
+        queries = [item['query'] for item in json.load(f)['queries']]
+
+    start = time.perf_counter()
+    if backend == "torch":
+        from sentence_transformers import SentenceTransformer
+        model = SentenceTransformer('all-MiniLM-L6-v2')
+    else:
+        from onnx_encoder import OnnxEncoder
+        model = OnnxEncoder(quantized=backend == "onnx-int8")
+    load_seconds = time.perf_counter() - start
+
+    model.encode(["warm-up"], convert_to_numpy=True)
+    latencies = []
+    for _ in range(repeat):
+        for query in queries:
+            start = time.perf_counter()
+            model.encode([query], convert_to_numpy=True)
+            latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+
+    from index_builder import peak_memory_mb
+    return {
+        'backend': backend,
+        'load_s': load_seconds,
+        'memory_mb': peak_memory_mb(),
+        'torch_imported': 'torch' in sys.modules,
+        'p50_ms': latencies[len(latencies) // 2],
+        'p95_ms': latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the embedding backends")
+    parser.add_argument("--backends", nargs="+", default=["torch", "onnx-fp32", "onnx-int8"])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_backend(args.worker, args.repeat)))
+        raise SystemExit(0)
+
+    rows = []
+    for backend in args.backends:
+        print(f">>> Measuring {backend}...")
+        process = subprocess.run([sys.executable, __file__, "--worker", backend, "--repeat", str(args.repeat)],
+                                 capture_output=True, text=True, cwd=ROOT)
+        if process.returncode != 0:
+            print(f"[NEGATIVE] {backend} failed:\n{process.stderr.strip()}")
+            continue
+        rows.append(json.loads(process.stdout.strip().splitlines()[-1]))
+
+    print(f"\n{'backend':<10} {'load s':>7} {'memory MB':>10} {'torch':>6} {'p50 ms':>7} {'p95 ms':>7}")
+    for row in rows:
+        print(f"{row['backend']:<10} {row['load_s']:>7.2f} {row['memory_mb']:>10.0f} "
+              f"{'yes' if row['torch_imported'] else 'no':>6} {row['p50_ms']:>7.1f} {row['p95_ms']:>7.1f}")
@@ -0,0 +1,77 @@
+"""
+Index build benchmark: throughput (chunks/sec) and peak memory of the
+pipelined builder on a synthetic corpus (100 MB by default).
+
+Usage:
+    python benchmarks/bench_index_build.py [--mb 100] [--files 200] [--processes 0 4] [--batch-size 32 128]
+
+Peak memory is the maximum resident size of the main process since it
+started (ru_maxrss), so each row also covers the rows before it; run one
+configuration at a time to compare them. Chunking worker processes are not
+included.
+"""
+import argparse
+import random
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from index_builder import IndexBuilder
+from rag import RAGSystem
+
+VOCABULARY = (
+    "projet équipe données pipeline python kubernetes docker api latence client "
+    "déploiement architecture performance modèle entraînement production migration "
+    "service base sql cache réseau sécurité test qualité livraison mesure résultat"
+).split()
+
+
+def generate_corpus(directory: Path, total_mb: float, num_files: int, seed: int = 0):
+    """Write markdown files with headers and random sentences"""
+    rng = random.Random(seed)
+    bytes_per_file = int(total_mb * 1024 ** 2 / num_files)
+    for i in range(num_files):
+        parts = []
+        size = 0
+        section = 0
+        while size < bytes_per_file:
+            if size // 4000 >= section:
+                section += 1
+                line = f"## Section {section}\n"
+            else:
+                line = " ".join(rng.choices(VOCABULARY, k=rng.randint(8, 20))) + ".\n"
+            parts.append(line)
+            size += len(line.encode('utf-8'))
+        (directory / f"doc_{i:04d}.md").write_text("".join(parts), encoding='utf-8')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the pipelined index build")
+    parser.add_argument("--mb", type=float, default=100)
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--processes", type=int, nargs="+", default=[0, 4])
+    parser.add_argument("--batch-size", type=int, nargs="+", default=[64])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        documents = Path(tmp_dir) / "documents"
+        documents.mkdir()
+        print(f">>> Generating {args.mb} MB corpus in {args.files} files...")
+        generate_corpus(documents, args.mb, args.files)
+
+        rag = RAGSystem(documents_dir=str(documents), embeddings_dir=str(Path(tmp_dir) / "embeddings"))
+        if not rag.load_model():
+            raise SystemExit(1)
+
+        rows = []
+        for processes in args.processes:
+            for batch_size in args.batch_size:
+                builder = IndexBuilder(rag, chunk_processes=processes, batch_size=batch_size)
+                builder.build()
+                rows.append((processes, batch_size, builder.stats))
+
+        print(f"\n{'processes':>10} {'batch':>6} {'chunks':>8} {'seconds':>8} {'chunks/s':>9} {'peak MB':>8}")
+        for processes, batch_size, stats in rows:
+            print(f"{processes:>10} {batch_size:>6} {stats['chunks']:>8} {stats['seconds']:>8.1f} "
+                  f"{stats['chunks_per_sec']:>9.0f} {stats['peak_memory_mb']:>8.0f}")
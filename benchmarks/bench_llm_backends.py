@@ -0,0 +1,82 @@
+"""
+LLM backend benchmark: time to first token and tokens/sec per backend, and
+time to the first visible answer in each LLM_BACKEND mode.
+
+Asks the questions of questions.txt one after another with the real prompt
+(system prompt, no RAG context). "draft" shows the local draft first, so its
+first visible answer is the draft's, while the final answer is the remote one.
+With --mock, both endpoints are MockLLMServer instances: a remote one with
+--remote-delay before the first token, and a fast "local" one.
+
+Usage:
+    python benchmarks/bench_llm_backends.py --mock [--backend remote local draft] [--questions 10]
+    LOCAL_LLM_MODEL_PATH=models/qwen2.5-1.5b-instruct-q4_k_m.gguf python benchmarks/bench_llm_backends.py
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import ai
+from prompt import system_prompt
+
+QUESTIONS = Path(__file__).resolve().parent.parent / "questions.txt"
+
+
+def load_questions(limit: int) -> list:
+    with open(QUESTIONS, 'r', encoding='utf-8') as f:
+        lines = [line.strip() for line in f]
+    return [line for line in lines if line and not line.startswith('#')][:limit]
+
+
+async def ask(question: str, backend: str, max_tokens: int) -> dict:
+    """Seconds to the first visible text and to the final answer"""
+    visible = []
+    start = time.perf_counter()
+
+    def seen(_):
+        visible or visible.append(time.perf_counter())
+
+    answer = await ai.generate_chatbot_response(
+        system_prompt=system_prompt, user_message=question, temperature=0.7, max_tokens=max_tokens,
+        backend=backend, on_token=seen, on_draft=seen
+    )
+    end = time.perf_counter()
+    return {'first_visible': (visible[0] if visible else end) - start, 'final': end - start, 'ok': bool(answer)}
+
+
+def median(values: list) -> float:
+    ordered = sorted(values)
+    return ordered[len(ordered) // 2] if ordered else 0.0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare LLM backends (TTFT, tokens/sec, first visible answer)")
+    parser.add_argument("--backend", nargs="+", default=["remote", "local", "draft"],
+                        choices=["remote", "local", "draft"])
+    parser.add_argument("--questions", type=int, default=10)
+    parser.add_argument("--max-tokens", type=int, default=500)
+    parser.add_argument("--mock", action="store_true", help="Use local mock endpoints")
+    parser.add_argument("--remote-delay", type=float, default=1200, help="Mock remote first-token delay (ms)")
+    args = parser.parse_args()
+
+    if args.mock:
+        from mock_llm_server import MockLLMServer
+        remote = MockLLMServer(port=0, delays={model: args.remote_delay / 1000 for model in ai.LLM_MODELS},
+                               token_delay=0.02).start()
+        local = MockLLMServer(port=0, token_delay=0.005).start()
+        ai.OPENROUTER_URL = f"{remote.base_url}/chat/completions"
+        ai.LOCAL_LLM_MODEL_PATH = ""
+        ai.LOCAL_LLM_BASE_URL = local.base_url
+
+    questions = load_questions(args.questions)
+    print(f">>> {len(questions)} questions per backend mode\n")
+    print(f"{'mode':<8} {'first visible s':>16} {'final s':>9} {'failed':>7}")
+    for backend in args.backend:
+        results = [asyncio.run(ask(question, backend, args.max_tokens)) for question in questions]
+        print(f"{backend:<8} {median([r['first_visible'] for r in results]):>16.2f} "
+              f"{median([r['final'] for r in results]):>9.2f} {sum(not r['ok'] for r in results):>7}")
+
+    print(f"\nPer backend:\n{ai.backend_report()}")
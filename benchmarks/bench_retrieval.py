@@ -0,0 +1,100 @@
+"""
+Retrieval benchmark: recall@k and latency on a small labelled query set.
+
+Builds a temporary index from benchmarks/retrieval_set.json and compares the
+retrieval modes of RAGSystem.retrieve. Suffixes add options to a mode:
+    +rerank  cross-encoder re-rank stage (e.g. "hybrid+rerank")
+    +boost   document-type boosts inferred from the question
+    +filter  search only the document types of the relevant chunks
+             (checks the per-type partitions on this mixed-type corpus)
+
+Usage:
+    python benchmarks/bench_retrieval.py [--k 3] [--modes dense hybrid hybrid+boost hybrid+filter]
+"""
+import argparse
+import contextlib
+import io
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from rag import RAGSystem, infer_type_boosts
+
+DATASET = Path(__file__).parent / "retrieval_set.json"
+
+
+def build_rag(dataset: dict, embeddings_dir: str) -> RAGSystem:
+    """Index the dataset chunks in a throwaway RAG system"""
+    rag = RAGSystem(documents_dir=embeddings_dir, embeddings_dir=embeddings_dir)
+    if not rag.load_model():
+        raise SystemExit("[NEGATIVE] Could not load the embedding model")
+    rag.document_chunks = [chunk['text'] for chunk in dataset['chunks']]
+    rag.metadata = [
+        {'source': chunk['source'], 'type': rag._get_document_type(chunk['source'])}
+        for chunk in dataset['chunks']
+    ]
+    rag.create_embeddings()
+    return rag
+
+
+def evaluate(rag: RAGSystem, queries: list, k: int, boost: bool = False,
+             filter_types: bool = False, **retrieve_kwargs) -> dict:
+    """Mean recall@k and latency percentiles of rag.retrieve over the queries"""
+    index_of = {text: i for i, text in enumerate(rag.document_chunks)}
+    recalls = []
+    latencies = []
+
+    for item in queries:
+        options = dict(retrieve_kwargs)
+        if boost:
+            options['boosts'] = infer_type_boosts(item['query'])
+        if filter_types:
+            options['types'] = sorted({rag.metadata[i]['type'] for i in item['relevant']})
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            results = rag.retrieve(item['query'], top_k=k, **options)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+        retrieved = {index_of[chunk] for chunk, _, _ in results}
+        relevant = set(item['relevant'])
+        recalls.append(len(retrieved & relevant) / len(relevant))
+
+    latencies.sort()
+    return {
+        'recall': sum(recalls) / len(recalls),
+        'mean_ms': sum(latencies) / len(latencies),
+        'p95_ms': latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark retrieval recall and latency")
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--modes", nargs="+", default=["dense", "hybrid", "hybrid+boost", "hybrid+filter", "hybrid+rerank"])
+    args = parser.parse_args()
+
+    with open(DATASET, 'r', encoding='utf-8') as f:
+        dataset = json.load(f)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        rag = build_rag(dataset, tmp_dir)
+
+        # Warm-up so the first query does not pay model initialization
+        with contextlib.redirect_stdout(io.StringIO()):
+            rag.retrieve("warm-up", top_k=args.k)
+
+        print(f"\n{len(dataset['queries'])} queries, {len(rag.document_chunks)} chunks")
+        print(f"{'mode':<15} {'recall@' + str(args.k):>10} {'mean ms':>10} {'p95 ms':>10}")
+        for name in args.modes:
+            mode, *options = name.split('+')
+            rerank = 'rerank' in options
+            if rerank:
+                # Load and warm the cross-encoder outside the measurements
+                with contextlib.redirect_stdout(io.StringIO()):
+                    rag.retrieve("warm-up", top_k=args.k, mode=mode, rerank=True)
+            stats = evaluate(rag, dataset['queries'], args.k, boost='boost' in options,
+                             filter_types='filter' in options, mode=mode, rerank=rerank)
+            print(f"{name:<15} {stats['recall']:>10.3f} {stats['mean_ms']:>10.1f} {stats['p95_ms']:>10.1f}")
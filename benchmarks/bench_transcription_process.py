@@ -0,0 +1,152 @@
+"""
+Audio deadline benchmark: dropped frames and loop jitter with Whisper in a
+thread of the capture process versus in its own process.
+
+A recording is played through an emulated capture device. The device
+produces frames in real time into a buffer of --buffer-blocks blocks; frames
+the loop does not read in time are dropped, as with stream.read(...,
+exception_on_overflow=False). The loop does what main.py's audio loop does
+per block and queues a chunk every process interval. A second thread ticks
+every 10ms like the Tk main loop and measures how late its ticks are.
+
+Usage:
+    python benchmarks/bench_transcription_process.py interview.wav [--engine thread process] [--seconds 60]
+"""
+import argparse
+import sys
+import threading
+import time
+import wave
+from pathlib import Path
+from queue import Queue
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+BLOCK_FRAMES = 1024       # main.py stream.read size
+PROCESS_INTERVAL = 3.0    # main.py process_interval
+TICK_SECONDS = 0.01       # GUI tick period
+
+
+class EmulatedDevice:
+    def __init__(self, frames: bytes, sample_rate: int, channels: int, buffer_blocks: int):
+        """Real-time source with a bounded buffer (overflowing frames are dropped)"""
+        self.frames = frames
+        self.sample_rate = sample_rate
+        self.frame_bytes = channels * 2
+        self.buffer_frames = buffer_blocks * BLOCK_FRAMES
+        self.position = 0      # Next frame the reader gets
+        self.dropped = 0
+        self.start = time.perf_counter()
+
+    def produced(self) -> int:
+        return int((time.perf_counter() - self.start) * self.sample_rate)
+
+    def read(self, count: int) -> bytes:
+        produced = self.produced()
+        if produced - self.position > self.buffer_frames:
+            # Overflow: the oldest frames were overwritten
+            lost = produced - self.buffer_frames - self.position
+            self.dropped += lost
+            self.position += lost
+        while self.produced() < self.position + count:
+            time.sleep(0.001)
+        offset = (self.position % (len(self.frames) // self.frame_bytes)) * self.frame_bytes
+        data = self.frames[offset:offset + count * self.frame_bytes]
+        data += bytes(count * self.frame_bytes - len(data))
+        self.position += count
+        return data
+
+
+def tick(stop: threading.Event, lateness: list):
+    """Tk-like periodic callback: how late each tick fires"""
+    deadline = time.perf_counter() + TICK_SECONDS
+    while not stop.is_set():
+        time.sleep(max(0.0, deadline - time.perf_counter()))
+        lateness.append(time.perf_counter() - deadline)
+        deadline += TICK_SECONDS
+
+
+def run(engine: str, frames: bytes, sample_rate: int, channels: int, seconds: float, buffer_blocks: int) -> dict:
+    results_queue = Queue()
+    stats = {}
+    if engine == "process":
+        from transcription_process import TranscriptionProcess
+        transcription_queue = TranscriptionProcess(sample_rate, channels, results_queue, stats=stats).start()
+    else:
+        from voice_to_text import transcription_worker, warm_up
+        warm_up()
+        transcription_queue = Queue()
+        threading.Thread(
+            target=transcription_worker,
+            args=(sample_rate, channels, transcription_queue, results_queue),
+            kwargs={'stats': stats},
+            daemon=True
+        ).start()
+    # Wait for the engine to be ready (model loaded, warmed up)
+    transcription_queue.put((bytes(int(sample_rate) * channels * 2), 0))
+    results_queue.get()
+
+    stop = threading.Event()
+    lateness = []
+    ticker = threading.Thread(target=tick, args=(stop, lateness), daemon=True)
+    ticker.start()
+
+    device = EmulatedDevice(frames, sample_rate, channels, buffer_blocks)
+    block_period = BLOCK_FRAMES / sample_rate
+    gaps = []
+    chunk = []
+    task_id = 0
+    last_process = last_read = time.perf_counter()
+    while time.perf_counter() - device.start < seconds:
+        data = device.read(BLOCK_FRAMES)
+        now = time.perf_counter()
+        gaps.append(now - last_read)
+        last_read = now
+        np.abs(np.frombuffer(data, dtype=np.int16)).max()
+        chunk.append(data)
+        while not results_queue.empty():
+            results_queue.get()
+        if now - last_process >= PROCESS_INTERVAL:
+            task_id += 1
+            transcription_queue.put((b''.join(chunk), task_id))
+            chunk = []
+            last_process = now
+
+    stop.set()
+    ticker.join()
+    transcription_queue.put(None)
+
+    expected = seconds * sample_rate
+    gaps.sort()
+    lateness.sort()
+    return {
+        'dropped_frames': device.dropped,
+        'dropped_pct': device.dropped / expected,
+        'late_reads': sum(1 for gap in gaps if gap > 2 * block_period),
+        'max_gap_ms': gaps[-1] * 1000 if gaps else 0.0,
+        'tick_p95_ms': lateness[int(0.95 * len(lateness))] * 1000 if lateness else 0.0,
+        'tick_max_ms': lateness[-1] * 1000 if lateness else 0.0,
+        'rtf': stats.get('decode_seconds', 0.0) / max(stats.get('audio_seconds', 0.0), 1e-9),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark audio deadlines with in-thread vs out-of-process Whisper")
+    parser.add_argument("wav", help="16-bit PCM recording (looped if shorter than --seconds)")
+    parser.add_argument("--engine", nargs="+", default=["thread", "process"], choices=["thread", "process"])
+    parser.add_argument("--seconds", type=float, default=60)
+    parser.add_argument("--buffer-blocks", type=int, default=4, help="Device buffer size in 1024-frame blocks")
+    args = parser.parse_args()
+
+    with wave.open(args.wav, 'rb') as wav:
+        sample_rate, channels = wav.getframerate(), wav.getnchannels()
+        frames = wav.readframes(wav.getnframes())
+
+    print(f">>> {args.seconds:.0f}s of capture at {sample_rate} Hz, device buffer {args.buffer_blocks} blocks")
+    print(f"\n{'engine':<8} {'dropped':>9} {'%':>7} {'late reads':>11} {'max gap ms':>11} "
+          f"{'tick p95 ms':>12} {'tick max ms':>12} {'RTF':>6}")
+    for engine in args.engine:
+        r = run(engine, frames, sample_rate, channels, args.seconds, args.buffer_blocks)
+        print(f"{engine:<8} {r['dropped_frames']:>9} {r['dropped_pct']:>7.2%} {r['late_reads']:>11} "
+              f"{r['max_gap_ms']:>11.1f} {r['tick_p95_ms']:>12.1f} {r['tick_max_ms']:>12.1f} {r['rtf']:>6.2f}")
@@ -0,0 +1,126 @@
+"""
+Checks of the LLM routing strategies against MockLLMServer (no network, no API key).
+
+- fallback: a failing model is skipped and the next one answers
+- mid-stream: a model dropping the connection after its first tokens is
+  replaced by the next one, in fallback and hedged mode
+- hedged: a slow model is raced after LLM_HEDGE_MS and the fast one wins,
+  with only the winner's tokens streamed
+- latency: a failing model is ordered behind a working one
+- cancellation: cancelling a request mid-stream stops the tokens
+
+Exits with status 1 if a check fails.
+
+Usage:
+    python benchmarks/check_llm_routing.py
+"""
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import ai
+from mock_llm_server import MockLLMServer
+
+SLOW_DELAY = 2.0   # Seconds before the slow model's first token
+HEDGE_MS = 200
+TOKEN_DELAY = 0.02
+DROP_AFTER = 3     # Tokens the "dropping" model streams before its connection drops
+
+
+async def ask(models: list, strategy: str, on_token=None):
+    return await ai.generate_chatbot_response(
+        system_prompt="You are a candidate.", user_message="Tell me about yourself.",
+        temperature=0.7, max_tokens=100, models=models, strategy=strategy,
+        on_token=on_token, backend="remote")
+
+
+async def check_fallback(server) -> str:
+    server.requests.clear()
+    answer = await ask(["broken", "good"], "fallback")
+    assert answer and answer.split() == server.answer.split(), "no answer from the second model"
+    assert [model for model, _ in server.requests] == ["broken", "good"], server.requests
+    return "failing model skipped, next model answered"
+
+
+async def check_mid_stream(server) -> str:
+    # Hedged: "dropping" wins the race against "slow", which is cancelled, then
+    # retried first when "dropping" fails; "good" is hedged against it again
+    for strategy, models, expected in (("fallback", ["dropping", "good"], ["dropping", "good"]),
+                                       ("hedged", ["slow", "dropping", "good"],
+                                        ["slow", "dropping", "slow", "good"])):
+        server.requests.clear()
+        ai.model_latencies.clear()
+        tokens = []
+        answer = await ask(models, strategy, tokens.append)
+        assert answer and answer.split() == server.answer.split(), f"{strategy}: no answer after the drop"
+        requested = [model for model, _ in server.requests]
+        assert requested == expected, f"{strategy}: requested {requested}"
+        assert len(tokens) > DROP_AFTER, f"{strategy}: tokens of the dropped stream missing"
+        order = ai.order_models(["dropping", "good"], "latency")
+        assert order == ["good", "dropping"], f"{strategy}: dropping model not penalized: {order}"
+    return f"connection dropped after {DROP_AFTER} tokens, remaining models answered"
+
+
+async def check_hedging(server) -> str:
+    server.requests.clear()
+    tokens = []
+    start = time.perf_counter()
+    answer = await ask(["slow", "good"], "hedged", tokens.append)
+    elapsed = time.perf_counter() - start
+    assert answer, "no answer"
+    assert elapsed < SLOW_DELAY, f"waited for the slow model ({elapsed:.2f}s)"
+    assert [model for model, _ in server.requests] == ["slow", "good"], server.requests
+    assert "".join(tokens) == answer, "tokens of the losing model were streamed"
+    return f"fast model won after the hedge in {elapsed:.2f}s"
+
+
+async def check_latency_order(server) -> str:
+    ai.model_latencies.clear()
+    answer = await ask(["broken", "good"], "latency")
+    assert answer, "no answer"
+    order = ai.order_models(["broken", "good"], "latency")
+    assert order == ["good", "broken"], f"failing model still first: {order}"
+    return f"order after a failure: {order}"
+
+
+async def check_cancellation(server) -> str:
+    tokens = []
+    task = asyncio.create_task(ask(["good"], "fallback", tokens.append))
+    while not tokens:
+        await asyncio.sleep(0.01)
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    received = len(tokens)
+    await asyncio.sleep(10 * TOKEN_DELAY)
+    assert len(tokens) == received, f"{len(tokens) - received} tokens after cancellation"
+    assert received < len(server.answer.split()), "the answer completed before the cancellation"
+    return f"stream stopped after {received} tokens"
+
+
+async def main() -> bool:
+    server = MockLLMServer(port=0, delays={"slow": SLOW_DELAY}, failures={"broken"},
+                           drops={"dropping": DROP_AFTER}, token_delay=TOKEN_DELAY).start()
+    ai.OPENROUTER_URL = server.base_url + '/chat/completions'
+    ai.LLM_HEDGE_MS = HEDGE_MS
+    ok = True
+    try:
+        for name, check in (("fallback", check_fallback), ("mid-stream", check_mid_stream),
+                            ("hedged", check_hedging),
+                            ("latency", check_latency_order), ("cancellation", check_cancellation)):
+            try:
+                print(f"[POSITIVE] {name}: {await check(server)}")
+            except AssertionError as e:
+                print(f"[NEGATIVE] {name}: {e}")
+                ok = False
+    finally:
+        server.stop()
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if asyncio.run(main()) else 1)
@@ -0,0 +1,128 @@
+"""
+Checks of AIRequestManager against MockLLMServer delays (no network, no API key).
+
+- superseded: a newer question cancels the slow one still in flight, and
+  only the newer answer is delivered; on_cancel is called for the slow one
+  (the window then drops its partial draft)
+- concurrency: no more than max_concurrent LLM calls run at once
+- order: answers are delivered in question order, even when a later
+  question is answered first
+
+Exits with status 1 if a check fails.
+
+Usage:
+    python benchmarks/check_request_manager.py
+"""
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import ai
+from mock_llm_server import MockLLMServer
+from request_manager import AIRequestManager
+
+SLOW_DELAY = 2.0   # Seconds before the slow model's first token
+MEDIUM_DELAY = 0.6
+FAST_DELAY = 0.3
+
+
+class Recorder:
+    """Requests in flight and results delivered by an AIRequestManager"""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+        self.delivered = []  # (generation_id, answer)
+        self.cancelled = []  # generation_id passed to on_cancel
+        self.done = threading.Event()
+
+    def request(self, model: str):
+        async def run(generation_id):
+            with self.lock:
+                self.running += 1
+                self.max_running = max(self.max_running, self.running)
+            try:
+                return await ai.generate_chatbot_response(
+                    system_prompt="You are a candidate.", user_message=f"Question {generation_id}",
+                    temperature=0.7, max_tokens=100, models=[model], strategy="fallback", backend="remote")
+            finally:
+                with self.lock:
+                    self.running -= 1
+        return run
+
+    def on_result(self, expected: int):
+        def deliver(generation_id, answer):
+            self.delivered.append((generation_id, answer))
+            if len(self.delivered) >= expected:
+                self.done.set()
+        return deliver
+
+    def on_cancel(self, generation_id):
+        self.cancelled.append(generation_id)
+
+
+def check_superseded() -> str:
+    manager = AIRequestManager(max_concurrent=2, cancel_superseded=True)
+    recorder = Recorder()
+    start = time.perf_counter()
+    older = manager.submit(recorder.request("slow"), recorder.on_result(1), recorder.on_cancel)
+    time.sleep(0.1)
+    newer = manager.submit(recorder.request("fast"), recorder.on_result(1), recorder.on_cancel)
+    recorder.done.wait(SLOW_DELAY + 2)
+    elapsed = time.perf_counter() - start
+    time.sleep(0.2)  # Anything delivered late would show up now
+    manager.stop()
+
+    assert [gid for gid, _ in recorder.delivered] == [newer], f"delivered {recorder.delivered}"
+    assert recorder.delivered[0][1], "empty answer"
+    assert elapsed < SLOW_DELAY, f"waited for the superseded request ({elapsed:.2f}s)"
+    assert recorder.cancelled == [older], f"on_cancel called for {recorder.cancelled}"
+    return f"slow request cancelled (on_cancel #{older}), newer answer after {elapsed:.2f}s"
+
+
+def check_concurrency() -> str:
+    manager = AIRequestManager(max_concurrent=2, cancel_superseded=False)
+    recorder = Recorder()
+    for _ in range(6):
+        manager.submit(recorder.request("fast"), recorder.on_result(6))
+    recorder.done.wait(10)
+    time.sleep(0.2)  # Let the HTTP streams close before stopping the loop
+    manager.stop()
+
+    assert len(recorder.delivered) == 6, f"{len(recorder.delivered)}/6 delivered"
+    assert recorder.max_running <= 2, f"{recorder.max_running} requests ran at once"
+    return f"6 requests, at most {recorder.max_running} at once"
+
+
+def check_order() -> str:
+    manager = AIRequestManager(max_concurrent=3, cancel_superseded=False)
+    recorder = Recorder()
+    first = manager.submit(recorder.request("medium"), recorder.on_result(3))
+    manager.submit(recorder.request("fast"), recorder.on_result(3))
+    manager.submit(recorder.request("fast"), recorder.on_result(3))
+    recorder.done.wait(10)
+    time.sleep(0.2)  # Let the HTTP streams close before stopping the loop
+    manager.stop()
+
+    order = [gid for gid, _ in recorder.delivered]
+    assert order == [first, first + 1, first + 2], f"delivered in order {order}"
+    return f"delivered in order {order} although #{first} answered last"
+
+
+if __name__ == "__main__":
+    server = MockLLMServer(port=0, delays={"slow": SLOW_DELAY, "medium": MEDIUM_DELAY, "fast": FAST_DELAY}).start()
+    ai.OPENROUTER_URL = server.base_url + '/chat/completions'
+    ok = True
+    try:
+        for name, check in (("superseded", check_superseded), ("concurrency", check_concurrency),
+                            ("order", check_order)):
+            try:
+                print(f"[POSITIVE] {name}: {check()}")
+            except AssertionError as e:
+                print(f"[NEGATIVE] {name}: {e}")
+                ok = False
+    finally:
+        server.stop()
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,94 @@
+"""
+Checks that a resumed session shows each answer once (no model, no audio).
+
+A session log is written with SessionStore, left unfinished as after a crash,
+then resumed with SessionStore.resume_latest:
+    draft      a local draft followed by the final answer gives one AI message
+               (the final one), in session_state and in every export format
+    refresh    a cached answer shown while it is refreshed is replaced too
+    crash      a draft whose final answer never came is still shown
+
+Exits with status 1 if a check fails.
+
+Usage:
+    python benchmarks/check_session_resume.py
+"""
+import contextlib
+import io
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from session_store import EXPORT_FORMATS, SessionStore, export_events, session_state
+
+
+def resume(events: list) -> list:
+    """Record `events` as (kind, fields), crash, resume; returns the past events"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = SessionStore.create(tmp_dir, flush_interval=0.01)
+        for kind, fields in events:
+            store.record(kind, **fields)
+        store.close(ended=False)
+        with contextlib.redirect_stdout(io.StringIO()):
+            resumed = SessionStore.resume_latest(tmp_dir)
+        assert resumed, "session was not resumed"
+        store, past_events = resumed
+        store.close()
+    return past_events
+
+
+def ai_messages(past_events: list) -> list:
+    return [text for role, text in session_state(past_events)['conversation'] if role == "AI"]
+
+
+def check_draft() -> str:
+    past_events = resume([
+        ('question', {'id': 1, 'text': "How did you scale the pipeline?"}),
+        ('draft', {'id': 1, 'text': "Local draft", 'status': "Local draft"}),
+        ('answer', {'id': 1, 'text': "Final answer", 'status': "AI response received!"}),
+    ])
+    messages = ai_messages(past_events)
+    assert messages == ["Final answer"], f"resumed AI messages: {messages}"
+    for fmt in EXPORT_FORMATS:
+        exported = export_events(past_events, fmt)
+        if fmt == 'json':
+            exported = json.dumps(json.loads(exported)['conversation'])
+        assert exported.count("Final answer") == 1 and "Local draft" not in exported, \
+            f"{fmt} export repeats the answer"
+    return "draft + final answer -> 1 AI message, in " + "/".join(EXPORT_FORMATS) + " too"
+
+
+def check_refresh() -> str:
+    past_events = resume([
+        ('question', {'id': 1, 'text': "Tell me about yourself"}),
+        ('answer', {'id': 1, 'text': "First answer"}),
+        ('question', {'id': 2, 'text': "Tell me about yourself"}),
+        ('draft', {'id': 2, 'text': "First answer", 'status': "Cached answer (refreshing)"}),
+        ('answer', {'id': 2, 'text': "Refreshed answer"}),
+    ])
+    messages = ai_messages(past_events)
+    assert messages == ["First answer", "Refreshed answer"], f"resumed AI messages: {messages}"
+    return "cached answer + refresh -> 1 AI message per question"
+
+
+def check_crash() -> str:
+    past_events = resume([
+        ('question', {'id': 1, 'text': "Why this stack?"}),
+        ('draft', {'id': 1, 'text': "Local draft"}),
+    ])
+    messages = ai_messages(past_events)
+    assert messages == ["Local draft"], f"resumed AI messages: {messages}"
+    return "draft without a final answer is kept"
+
+
+if __name__ == "__main__":
+    ok = True
+    for name, check in (("draft", check_draft), ("refresh", check_refresh), ("crash", check_crash)):
+        try:
+            print(f"[POSITIVE] {name}: {check()}")
+        except AssertionError as e:
+            print(f"[NEGATIVE] {name}: {e}")
+            ok = False
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,111 @@
+"""
+Checks of document-type filters, boosts and guarantees in RAGSystem.retrieve
+on a mixed-type corpus (no embedding model needed).
+
+Chunk embeddings are set by hand, so every similarity to the query is known:
+    filter     only the requested types are returned, plus guaranteed ones
+    boost      a boosted type overtakes a slightly closer chunk of another
+               type, in dense and hybrid mode, and also when every cosine
+               is negative
+    guarantee  min_per_type={'cv': 1} puts the best cv chunk in the results
+               even when it ranks last, without exceeding top_k
+
+Exits with status 1 if a check fails.
+
+Usage:
+    python benchmarks/check_type_ranking.py
+"""
+import contextlib
+import io
+import sys
+import tempfile
+from pathlib import Path
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from bm25 import BM25Index
+from rag import RAGSystem, TYPE_BOOST
+
+# (source, cosine similarity to the query)
+CORPUS = [
+    ("experience_acme.md", 0.80),
+    ("experience_globex.md", 0.74),
+    ("project_pipeline.md", 0.72),
+    ("project_dashboard.md", 0.40),
+    ("notes.md", 0.60),
+    ("cv.md", 0.10),
+]
+
+
+def unit(similarity: float, index: int, dims: int = 16) -> np.ndarray:
+    """Unit vector with the given cosine to e0 (the query)"""
+    vector = np.zeros(dims, dtype=np.float32)
+    vector[0] = similarity
+    vector[1 + index] = np.sqrt(1 - similarity ** 2)
+    return vector
+
+
+def build_rag(directory: str, shift: float = 0.0) -> RAGSystem:
+    """Index CORPUS with every similarity lowered by `shift`"""
+    rag = RAGSystem(documents_dir=directory, embeddings_dir=directory)
+    rag.model = object()  # Only checked for presence: retrieve() gets query_embedding
+    chunks = [f"Chunk from {source}" for source, _ in CORPUS]
+    metadata = [{'source': source, 'type': rag._get_document_type(source)} for source, _ in CORPUS]
+    embeddings = np.stack([unit(similarity - shift, i) for i, (_, similarity) in enumerate(CORPUS)])
+    rag.swap_index(chunks, metadata, embeddings, BM25Index().build(chunks))
+    return rag
+
+
+def sources(rag: RAGSystem, **kwargs) -> list:
+    query = np.zeros(16, dtype=np.float32)
+    query[0] = 1.0
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = rag.retrieve("unrelated words", rerank=False, query_embedding=query, **kwargs)
+    return [meta['source'] for _, meta, _ in results]
+
+
+def check_filter(rag: RAGSystem) -> str:
+    found = sources(rag, top_k=6, types=['projects'])
+    assert found and all(s.startswith("project_") for s in found), f"filtered results: {found}"
+    found = sources(rag, top_k=3, types=['projects'], min_per_type={'cv': 1})
+    assert "cv.md" in found and all(s.startswith(("project_", "cv")) for s in found), found
+    return f"types=['projects'] + cv guarantee -> {found}"
+
+
+def check_boost(rag: RAGSystem, negative_rag: RAGSystem) -> str:
+    boosts = {'projects': TYPE_BOOST}
+    for name, index in (("dense", rag), ("dense, negative cosines", negative_rag)):
+        plain = sources(index, top_k=3, mode="dense")
+        boosted = sources(index, top_k=3, mode="dense", boosts=boosts)
+        assert plain[0] == "experience_acme.md", f"{name}: unboosted order {plain}"
+        assert boosted.index("project_pipeline.md") < boosted.index("experience_globex.md"), \
+            f"{name}: boost did not raise projects: {boosted}"
+    boosted = sources(rag, top_k=3, mode="hybrid", boosts=boosts)
+    assert boosted[0] == "project_pipeline.md", f"hybrid: boost did not raise projects: {boosted}"
+    return f"projects x{TYPE_BOOST} ranks project_pipeline.md above experience_globex.md in every mode"
+
+
+def check_guarantee(rag: RAGSystem) -> str:
+    for mode in ("dense", "hybrid"):
+        found = sources(rag, top_k=3, mode=mode, min_per_type={'cv': 1})
+        assert len(found) == 3, f"{mode}: {len(found)} results"
+        assert "cv.md" in found, f"{mode}: cv missing from {found}"
+        assert found[0] == "experience_acme.md", f"{mode}: best chunk displaced: {found}"
+    return f"cv guaranteed in top 3: {found}"
+
+
+if __name__ == "__main__":
+    ok = True
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        with contextlib.redirect_stdout(io.StringIO()):
+            rag = build_rag(tmp_dir)
+            negative_rag = build_rag(tmp_dir, shift=0.9)  # Cosines from -0.1 down to -0.8
+        for name, check in (("filter", lambda: check_filter(rag)),
+                            ("boost", lambda: check_boost(rag, negative_rag)),
+                            ("guarantee", lambda: check_guarantee(rag))):
+            try:
+                print(f"[POSITIVE] {name}: {check()}")
+            except AssertionError as e:
+                print(f"[NEGATIVE] {name}: {e}")
+                ok = False
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,125 @@
+"""
+Simulation of the transcription quality governor with synthetic decode timings.
+
+Chunks arrive every process_interval seconds (stretched at the lower levels)
+and the worker decodes up to --max-batch queued chunks at once, like
+voice_to_text.transcription_worker. The decode time is a fixed per-decode overhead
+plus the audio duration times the machine's real-time factor, scaled by the
+cost of the current quality level. A load spike (another app hogging the CPU/GPU) multiplies the machine
+RTF for a while. The same scenario runs with a fixed level 0 and with the
+governor, reporting the latency per phase and every governor decision.
+
+Exits with status 1 if the governed p95 latency during the spike exceeds
+--max-spike-p95, or if the governor does not return to level 0 afterwards.
+
+Usage:
+    python benchmarks/sim_quality_governor.py [--rtf 0.35] [--spike 3.0] [--duration 300] [--max-batch 8]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from quality_governor import LEVELS, TARGET_LATENCY, QualityGovernor
+
+PROCESS_INTERVAL = 3.0                     # main.py process_interval
+MAX_BATCH_SIZE = 8                         # voice_to_text.MAX_BATCH_SIZE
+DECODE_OVERHEAD = 0.3                      # Seconds per decode, independent of length
+LEVEL_COST = [1.0, 0.75, 0.5, 0.5, 0.25]   # Decode cost of each level relative to level 0
+
+
+def simulate(duration: float, machine_rtf: float, spike: float, spike_window: tuple,
+             governor: QualityGovernor = None, max_batch: int = 1) -> list:
+    """Per-chunk (arrival, latency, level) of one run"""
+    level_of = lambda: governor.level if governor else 0
+    pending = []       # (arrival time, audio seconds) waiting for the worker
+    current = None     # ([(arrival time, audio seconds)], decode seconds, level) being decoded
+    worker_free = 0.0
+    last_arrival = 0.0
+    chunks = []
+
+    def start_next(now: float):
+        batch = pending[:max_batch]
+        del pending[:max_batch]
+        load = spike if spike_window[0] <= now < spike_window[1] else 1.0
+        level = level_of()
+        audio = sum(seconds for _, seconds in batch)
+        decode = (DECODE_OVERHEAD + audio * machine_rtf * load) * LEVEL_COST[level]
+        return (batch, decode, level), now + decode
+
+    while last_arrival < duration or current or pending:
+        next_arrival = last_arrival + PROCESS_INTERVAL * LEVELS[level_of()]['interval_factor']
+        if current and (worker_free <= next_arrival or last_arrival >= duration):
+            # Decode finished: the worker reports it, then takes the next chunks
+            batch, decode, level = current
+            chunks.extend((arrival, worker_free - arrival, level) for arrival, _ in batch)
+            if governor:
+                governor.record(sum(audio for _, audio in batch), decode, len(pending), len(batch))
+            current = None
+            if pending:
+                current, worker_free = start_next(worker_free)
+        elif last_arrival < duration:
+            # Chunk cut by the audio loop at the current level's interval
+            last_arrival = next_arrival
+            pending.append((next_arrival, PROCESS_INTERVAL * LEVELS[level_of()]['interval_factor']))
+            if not current:
+                current, worker_free = start_next(next_arrival)
+        else:
+            current, worker_free = start_next(worker_free)
+    return chunks
+
+
+def percentile(chunks: list, start: float, end: float, q: float) -> float:
+    latencies = sorted(latency for arrival, latency, _ in chunks if start <= arrival < end)
+    return latencies[min(len(latencies) - 1, int(q * len(latencies)))] if latencies else None
+
+
+def phase_stats(chunks: list, start: float, end: float) -> str:
+    if percentile(chunks, start, end, 0.5) is None:
+        return "-"
+    return f"p50 {percentile(chunks, start, end, 0.5):6.2f}s  p95 {percentile(chunks, start, end, 0.95):6.2f}s"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate the transcription quality governor")
+    parser.add_argument("--rtf", type=float, default=0.35, help="Machine RTF at level 0")
+    parser.add_argument("--spike", type=float, default=3.0, help="RTF multiplier during the load spike")
+    parser.add_argument("--duration", type=float, default=300)
+    parser.add_argument("--spike-start", type=float, default=60)
+    parser.add_argument("--spike-end", type=float, default=150)
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH_SIZE, help="Chunks decoded together at most")
+    parser.add_argument("--max-spike-p95", type=float, default=2 * TARGET_LATENCY,
+                        help="Governed p95 latency allowed during the spike (s)")
+    args = parser.parse_args()
+
+    window = (args.spike_start, args.spike_end)
+    phases = [("before spike", 0, window[0]), ("during spike", window[0], window[1]),
+              ("after spike", window[1], args.duration + 1)]
+
+    fixed = simulate(args.duration, args.rtf, args.spike, window, max_batch=args.max_batch)
+    governor = QualityGovernor(verbose=False)
+    governed = simulate(args.duration, args.rtf, args.spike, window, governor, args.max_batch)
+
+    print(f"Target latency {TARGET_LATENCY:.1f}s, machine RTF {args.rtf}, x{args.spike} spike "
+          f"from {window[0]:.0f}s to {window[1]:.0f}s, batches of up to {args.max_batch}\n")
+    print(f"{'phase':<14} {'fixed level 0':<28} {'governor':<28}")
+    for name, start, end in phases:
+        print(f"{name:<14} {phase_stats(fixed, start, end):<28} {phase_stats(governed, start, end):<28}")
+
+    print(f"\nGovernor decisions ({len(governor.decisions)}):")
+    for decision in governor.decisions:
+        print(f"  level {decision['from']} -> {decision['to']}: {decision['reason']} "
+              f"(RTF {decision['rtf']:.2f}, queue {decision['queue']})")
+    print(f"Final level: {governor.level}\n")
+
+    spike_p95 = percentile(governed, window[0], window[1], 0.95)
+    failures = []
+    if spike_p95 is not None and spike_p95 > args.max_spike_p95:
+        failures.append(f"p95 during the spike {spike_p95:.2f}s > {args.max_spike_p95:.2f}s")
+    if governor.level != 0:
+        failures.append(f"did not return to level 0 (level {governor.level})")
+    for failure in failures:
+        print(f"[NEGATIVE] {failure}")
+    if failures:
+        sys.exit(1)
+    print(f"[POSITIVE] p95 during the spike {spike_p95:.2f}s <= {args.max_spike_p95:.2f}s, back to level 0")
@@ -0,0 +1,131 @@
+"""
+Simulation of speculative answer drafting with synthetic speech and LLM timings.
+
+Each question of questions.txt is "spoken" at --wps words per second. Every
+process interval, the words spoken so far arrive as a partial transcript. The
+final question is asked once the silence and the trigger delay have passed.
+With --diverge, a fraction of the questions start as a different question and
+change course, so their drafts must be discarded. The LLM is a stub with a
+fixed time to first token and tokens/sec. Question embeddings are hashed bags
+of words, a rough stand-in for the sentence model that needs no download.
+
+Reports the time from the end of speech to the answer, with and without
+speculation, and the tokens spent and wasted. Time runs --speed times faster
+than real time.
+
+Usage:
+    python benchmarks/sim_speculative_drafting.py [--ttft 1.2] [--tps 40] [--diverge 0.3]
+"""
+import argparse
+import asyncio
+import random
+import re
+import sys
+import threading
+import time
+import zlib
+from pathlib import Path
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from question_detector import QuestionDetector, TRIGGER_DELAY
+from speculative_drafter import CONTINUE_SIMILARITY, SpeculativeDrafter
+
+PROCESS_INTERVAL = 3.0   # main.py process_interval: partial text arrives per chunk
+SILENCE_DURATION = 0.5   # main.py silence_duration
+ANSWER_TOKENS = 150
+QUESTIONS = Path(__file__).resolve().parent.parent / "questions.txt"
+
+
+def embed(text: str, dims: int = 512) -> np.ndarray:
+    vector = np.zeros(dims, dtype=np.float32)
+    for word in re.findall(r"\w+", text.lower()):
+        vector[zlib.crc32(word.encode()) % dims] += 1.0
+    return vector / (np.linalg.norm(vector) + 1e-12)
+
+
+def run(questions: list, speculate: bool, args) -> dict:
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    spent = {'tokens': 0}
+    scale = 1.0 / args.speed
+
+    async def generate(question, context, on_token):
+        await asyncio.sleep(args.ttft * scale)
+        start = time.perf_counter()
+        for token in range(ANSWER_TOKENS):
+            # Paced against the clock: many tiny sleeps would overshoot
+            delay = start + (token + 1) * scale / args.tps - time.perf_counter()
+            if delay > 0.002:
+                await asyncio.sleep(delay)
+            on_token("x")
+        return f"Answer to: {question}"
+
+    def count(token):
+        spent['tokens'] += 1
+
+    drafter = SpeculativeDrafter(loop, generate, embed, QuestionDetector(on_question=print).score,
+                                 similarity=args.similarity)
+    rng = random.Random(args.seed)
+    latencies = []
+    for question in questions:
+        spoken = question.split()
+        if rng.random() < args.diverge:
+            # Starts as another question, then changes course
+            opening = rng.choice(questions).split()
+            spoken = opening[:max(3, len(opening) // 2)] + spoken
+        speech_seconds = len(spoken) / args.wps
+
+        elapsed = 0.0
+        while speculate and elapsed + PROCESS_INTERVAL < speech_seconds:
+            elapsed += PROCESS_INTERVAL
+            time.sleep(PROCESS_INTERVAL * scale)
+            drafter.consider(" ".join(spoken[:int(elapsed * args.wps)]))
+        time.sleep((speech_seconds - elapsed + SILENCE_DURATION + TRIGGER_DELAY) * scale)
+
+        speech_end = time.perf_counter() - (SILENCE_DURATION + TRIGGER_DELAY) * scale
+        speculation = drafter.claim(question, embed(question)) if speculate else None
+        if speculation:
+            answer = speculation.future.result()
+        else:
+            answer = asyncio.run_coroutine_threadsafe(generate(question, "", count), loop).result()
+        latencies.append((time.perf_counter() - speech_end) / scale)
+        assert answer
+
+    loop.call_soon_threadsafe(loop.stop)
+    latencies.sort()
+    return {
+        'mean': sum(latencies) / len(latencies),
+        'p50': latencies[len(latencies) // 2],
+        'max': latencies[-1],
+        'tokens': spent['tokens'] + drafter.stats['tokens'],
+        'wasted': drafter.stats['wasted_tokens'],
+        'drafter': drafter.report(),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate speculative answer drafting")
+    parser.add_argument("--ttft", type=float, default=1.2, help="LLM time to first token (s)")
+    parser.add_argument("--tps", type=float, default=40, help="LLM tokens per second")
+    parser.add_argument("--wps", type=float, default=2.5, help="Interviewer words per second")
+    parser.add_argument("--diverge", type=float, default=0.3, help="Fraction of questions that change course")
+    parser.add_argument("--similarity", type=float, default=CONTINUE_SIMILARITY,
+                        help="Similarity needed to continue a draft")
+    parser.add_argument("--questions", type=int, default=20)
+    parser.add_argument("--speed", type=float, default=20, help="Simulated seconds per real second")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with open(QUESTIONS, 'r', encoding='utf-8') as f:
+        questions = [line.strip() for line in f if line.strip() and not line.startswith('#')][:args.questions]
+
+    print(f">>> {len(questions)} questions, LLM {args.ttft:.1f}s + {ANSWER_TOKENS} tokens at {args.tps:.0f}/s, "
+          f"{args.diverge:.0%} change course\n")
+    print("Seconds from the end of speech to the full answer:")
+    print(f"{'mode':<12} {'mean':>6} {'p50':>6} {'max':>6} {'tokens':>8} {'wasted':>8}")
+    results = {}
+    for mode, speculate in (("baseline", False), ("speculative", True)):
+        r = results[mode] = run(questions, speculate, args)
+        print(f"{mode:<12} {r['mean']:>6.2f} {r['p50']:>6.2f} {r['max']:>6.2f} {r['tokens']:>8} {r['wasted']:>8}")
+    print(f"\n{results['speculative']['drafter']}")
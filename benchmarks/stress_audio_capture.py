@@ -0,0 +1,87 @@
+"""
+Stress test of callback-mode capture: consumer stalls against the synthetic source.
+
+A SyntheticSource drives CallbackCapture in real time with a counter signal
+(each sample is the index of its block), so the reader can verify that the
+audio it gets is continuous. The reader stalls for each --stalls duration, like
+main.py's loop waiting for pending transcriptions. A stall shorter than the
+ring loses nothing. A longer one loses the excess, and the capture must
+count exactly the frames the reader finds missing. For comparison, the
+frames a blocking stream.read with a --device-blocks buffer would have lost
+are reported too.
+
+Exits with status 1 if a counter disagrees with the observed audio.
+
+Usage:
+    python benchmarks/stress_audio_capture.py [--stalls 0.5 2 4] [--buffer-seconds 3]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from audio_capture import CallbackCapture, SyntheticSource
+
+WRAP = 30000  # The block counter wraps around below the int16 limit (10 minutes at 48 kHz)
+FRAMES_PER_BUFFER = 1024
+
+
+def counter(start: int, count: int, channels: int) -> np.ndarray:
+    return np.full((count, channels), (start // FRAMES_PER_BUFFER) % WRAP, dtype=np.int16)
+
+
+def consume(capture: CallbackCapture, seconds: float, expected: int, channels: int) -> tuple:
+    """Read for `seconds` of wall time; returns (next expected block, frames found missing)"""
+    missing = 0
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        block = np.frombuffer(capture.read(), dtype=np.int16).reshape(-1, channels)
+        gap = (int(block[0, 0]) - expected) % WRAP
+        missing += gap * FRAMES_PER_BUFFER
+        expected = (expected + gap + 1) % WRAP
+    return expected, missing
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stress callback-mode capture with consumer stalls")
+    parser.add_argument("--stalls", type=float, nargs="+", default=[0.5, 2.0, 4.0], help="Stall durations (s)")
+    parser.add_argument("--buffer-seconds", type=float, default=3.0, help="Capture ring size")
+    parser.add_argument("--device-blocks", type=int, default=4, help="Blocking-read buffer for comparison")
+    parser.add_argument("--sample-rate", type=int, default=48000)
+    parser.add_argument("--channels", type=int, default=2)
+    args = parser.parse_args()
+
+    frames_per_buffer = FRAMES_PER_BUFFER
+    capture = CallbackCapture(args.sample_rate, args.channels, frames_per_buffer, args.buffer_seconds)
+    source = SyntheticSource(capture.callback, args.sample_rate, args.channels, frames_per_buffer,
+                             signal=lambda start, count: counter(start, count, args.channels)).start()
+
+    print(f">>> Ring {args.buffer_seconds:.1f}s, {args.sample_rate} Hz x {args.channels}, "
+          f"block {frames_per_buffer} frames\n")
+    print(f"{'stall s':>8} {'missing':>9} {'counted':>9} {'blocking read':>14} {'max backlog s':>14}")
+
+    failed = False
+    expected, _ = consume(capture, 0.5, 0, args.channels)
+    for stall in args.stalls:
+        counted_before = capture.dropped_frames
+        time.sleep(stall)  # Consumer stall
+        backlog = capture.backlog_seconds
+        expected, missing = consume(capture, 1.0 + stall, expected, args.channels)
+        counted = capture.dropped_frames - counted_before
+        blocking = max(0, int(stall * args.sample_rate) - args.device_blocks * frames_per_buffer)
+        print(f"{stall:>8.1f} {missing:>9} {counted:>9} {blocking:>14} {backlog:>14.2f}")
+
+        # Audio lost exactly as counted, and never within the ring's capacity
+        if missing != counted or (stall < args.buffer_seconds - 0.2 and missing):
+            failed = True
+
+    source.stop()
+    print(f"\n{capture.health()}")
+    print(f"Late callbacks: {capture.late_callbacks}, frames captured {capture.frames_captured}, "
+          f"read {capture.frames_read}")
+    if failed:
+        print("[NEGATIVE] Dropped-frame accounting does not match the audio received")
+        raise SystemExit(1)
+    print("[POSITIVE] Every lost frame was counted; stalls within the ring lost nothing")
@@ -0,0 +1,102 @@
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, List
+import numpy as np
+
+# Keeps technology names like "c++", "c#", "node.js" or "ci/cd" in one token
+TOKEN_PATTERN = re.compile(r"\w[\w+#./-]*")
+COMPOUND_SEPARATORS = re.compile(r"[/-]+")
+MIN_IDF_SHARE = 0.25  # Coverage ignores matches below this share of the corpus' highest IDF
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercase word tokens (accents kept, trailing punctuation stripped).
+    Slash and dash compounds also yield their parts: "ci/cd" -> ci/cd, ci, cd.
+    """
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        token = token.rstrip('./-')
+        tokens.append(token)
+        if '/' in token or '-' in token:
+            tokens.extend(part for part in COMPOUND_SEPARATORS.split(token) if part)
+    return tokens
+
+
+class BM25Index:
+    VERSION = 2  # Bumped when tokenization changes, so cached indexes are rebuilt
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        """
+        Inverted-index BM25 scorer.
+
+        Posting weights are precomputed at build time, so scoring a query is
+        one vectorized scatter-add per query term.
+        """
+        self.k1 = k1
+        self.b = b
+        self.version = self.VERSION
+        self.num_docs = 0
+        self.max_idf = 0.0
+        self.idf: Dict[str, float] = {}
+        self.postings: Dict[str, tuple] = {}  # term -> (doc_ids int32, weights float32)
+
+    def build(self, documents: List[str]) -> "BM25Index":
+        """Index a list of documents (positions are the document IDs)"""
+        doc_tokens = [tokenize(doc) for doc in documents]
+        self.num_docs = len(doc_tokens)
+        lengths = np.array([len(tokens) for tokens in doc_tokens], dtype=np.float32)
+        avg_length = float(lengths.mean()) if self.num_docs else 0.0
+
+        term_docs = defaultdict(list)
+        term_freqs = defaultdict(list)
+        for doc_id, tokens in enumerate(doc_tokens):
+            for term, freq in Counter(tokens).items():
+                term_docs[term].append(doc_id)
+                term_freqs[term].append(freq)
+
+        self.idf = {}
+        self.postings = {}
+        for term, doc_ids in term_docs.items():
+            doc_ids = np.array(doc_ids, dtype=np.int32)
+            tf = np.array(term_freqs[term], dtype=np.float32)
+            norm = self.k1 * (1 - self.b + self.b * lengths[doc_ids] / max(avg_length, 1e-9))
+            weights = tf * (self.k1 + 1) / (tf + norm)
+
+            df = len(doc_ids)
+            self.idf[term] = math.log(1 + (self.num_docs - df + 0.5) / (df + 0.5))
+            self.postings[term] = (doc_ids, weights.astype(np.float32))
+        self.max_idf = max(self.idf.values(), default=0.0)
+        return self
+
+    def score(self, query: str) -> np.ndarray:
+        """BM25 score of every document for a query"""
+        scores = np.zeros(self.num_docs, dtype=np.float32)
+        for term in set(tokenize(query)):
+            posting = self.postings.get(term)
+            if posting is not None:
+                doc_ids, weights = posting
+                scores[doc_ids] += self.idf[term] * weights
+        return scores
+
+    def coverage(self, query: str, min_share: float = MIN_IDF_SHARE) -> np.ndarray:
+        """
+        Share of the query's IDF mass found in each document (0-1).
+
+        Rare terms (names, acronyms) count a lot, stopwords almost nothing.
+        Terms absent from the corpus weigh as much as the rarest term, and
+        documents matching less than `min_share` of the highest IDF get 0 so
+        stopwords alone never count. Both are relative to the corpus: IDF
+        values grow with the number of documents.
+        """
+        query_terms = set(tokenize(query))
+        min_idf = min_share * self.max_idf
+        total = sum(self.idf.get(term, self.max_idf) for term in query_terms) or 1.0
+
+        covered = np.zeros(self.num_docs, dtype=np.float32)
+        for term in query_terms:
+            if term in self.idf:
+                covered[self.postings[term][0]] += self.idf[term]
+        covered[covered < min_idf] = 0.0
+        return covered / total
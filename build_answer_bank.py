@@ -0,0 +1,117 @@
+"""
+Build the precomputed answer bank offline, before the interview.
+
+Runs retrieval + LLM generation for every question of a question list
+(concurrently, rate limited, with retries) and stores the answers in
+embeddings/answer_bank.pkl. Questions already in the bank are skipped, so an
+interrupted build can simply be restarted.
+
+Usage:
+    python build_answer_bank.py [questions.txt] [--concurrency 4] [--rpm 30]
+"""
+import argparse
+import asyncio
+import time
+from answer_cache import AnswerCache, question_key
+from ai import generate_chatbot_response
+from prompt import system_prompt
+from rag import initialize_rag, get_rag_system, retrieve_context, get_candidate_profile
+
+ANSWER_BANK_FILE = "embeddings/answer_bank.pkl"
+
+
+def open_answer_bank(rag) -> AnswerCache:
+    """Open the answer bank (never expires, invalidated when documents change)"""
+    return AnswerCache(
+        encode=rag.encode,
+        fingerprint=rag.cache_fingerprint,
+        cache_file=ANSWER_BANK_FILE,
+        ttl=float('inf'),
+        max_entries=100000
+    )
+
+
+class RateLimiter:
+    """Allow at most `rate_per_minute` acquisitions per minute (evenly spaced)"""
+    def __init__(self, rate_per_minute: float):
+        self.interval = 60.0 / rate_per_minute
+        self.next_time = 0.0
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            now = time.monotonic()
+            wait = self.next_time - now
+            self.next_time = max(now, self.next_time) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+async def answer_question(question, bank, profile, limiter, semaphore, retries):
+    """Retrieve context and generate one answer, retrying with backoff"""
+    async with semaphore:
+        context = await asyncio.to_thread(retrieve_context, question, 3)
+
+        for attempt in range(1, retries + 1):
+            await limiter.acquire()
+            answer = await generate_chatbot_response(
+                system_prompt=system_prompt,
+                user_message=question,
+                temperature=0.7,
+                max_tokens=500,
+                context=context,
+                profile=profile
+            )
+            if answer:
+                await asyncio.to_thread(bank.store, question, answer, None, True)
+                print(f"[BANK] Answered: {question[:60]}")
+                return True
+
+            delay = 2 ** attempt
+            print(f"[BANK] Attempt {attempt}/{retries} failed for \"{question[:40]}\", retrying in {delay}s")
+            await asyncio.sleep(delay)
+
+        print(f"[BANK] Giving up on: {question[:60]}")
+        return False
+
+
+async def build_answer_bank(questions, concurrency=4, rate_per_minute=30, retries=3):
+    rag = get_rag_system()
+    bank = open_answer_bank(rag)
+    profile = get_candidate_profile()
+
+    # Same exact key as bank.store(exact=True): similar questions are distinct entries
+    done = {question_key(entry['question']) for entry in bank.entries}
+    todo = [q for q in questions if question_key(q) not in done]
+    print(f">>> {len(questions)} questions, {len(questions) - len(todo)} already in the bank, {len(todo)} to answer")
+
+    limiter = RateLimiter(rate_per_minute)
+    semaphore = asyncio.Semaphore(concurrency)
+    start_time = time.time()
+
+    results = await asyncio.gather(*[
+        answer_question(q, bank, profile, limiter, semaphore, retries) for q in todo
+    ])
+
+    elapsed = time.time() - start_time
+    print(f"[POSITIVE] Answered {sum(results)}/{len(todo)} questions in {elapsed:.1f}s")
+    print(f"[POSITIVE] Answer bank has {len(bank.entries)} answers ({ANSWER_BANK_FILE})")
+
+
+def load_questions(path: str):
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute answers for common interview questions")
+    parser.add_argument("questions", nargs="?", default="questions.txt", help="One question per line")
+    parser.add_argument("--concurrency", type=int, default=4, help="Parallel LLM requests")
+    parser.add_argument("--rpm", type=float, default=30, help="Max LLM requests per minute")
+    parser.add_argument("--retries", type=int, default=3)
+    args = parser.parse_args()
+
+    if not initialize_rag():
+        raise SystemExit("[NEGATIVE] RAG system failed to initialize")
+
+    asyncio.run(build_answer_bank(load_questions(args.questions), args.concurrency, args.rpm, args.retries))
@@ -0,0 +1,153 @@
+"""
+Offline calibration of silence detection on recorded WAV files.
+
+Runs main.py's utterance segmentation on each recording. Speech is detected
+per block of audio, and an utterance ends after SILENCE_DURATION of silence.
+It compares fixed amplitude thresholds with the adaptive noise floor
+(noise_floor.py) at several speech margins. Every utterance costs a flush of
+the transcription and the GUI, so false triggers are the figure to minimize.
+
+With a `speech` list in the recording's sidecar file (interview.json:
+{"speech": [[start, end], ...]} in seconds), false triggers and missed speech
+are measured exactly. A false trigger is an utterance that overlaps no speech
+region. Missed speech is a region that no utterance overlaps. Without labels,
+utterances with less than MIN_SPEECH seconds of sound (breaths, clicks) are
+counted as false triggers instead. --noise-db adds white noise to the
+recordings, to reproduce a noisy loopback source.
+
+Usage:
+    python calibrate_silence.py recordings/ [--thresholds 300 500 1000] [--margins 8 12 16]
+    python calibrate_silence.py interview.wav --noise-db -45
+"""
+import argparse
+import json
+import wave
+from pathlib import Path
+from typing import Callable, List, Tuple
+import numpy as np
+
+from noise_floor import NoiseFloor, RELEASE_MARGIN_DB, SPEECH_MARGIN_DB
+
+# Segmentation (same defaults as main.py)
+SILENCE_DURATION = 0.5   # Seconds of silence that end an utterance
+BLOCK_FRAMES = 1024
+MIN_SPEECH = 0.3         # Without labels: utterances with less sound are false triggers
+LABEL_TOLERANCE = 0.2    # Seconds of slack when matching utterances with labeled speech
+STUCK_UTTERANCE = 30.0   # An utterance this long means silence is never detected
+
+
+def detect_utterances(frames: bytes, sample_rate: int, channels: int,
+                      is_sound: Callable[[np.ndarray], bool]) -> List[Tuple[float, float]]:
+    """(first sound, last sound) of each utterance, in seconds"""
+    block_bytes = BLOCK_FRAMES * channels * 2
+    utterances = []
+    audio_time = 0.0
+    onset = None
+    last_sound = 0.0
+    for offset in range(0, len(frames), block_bytes):
+        block = np.frombuffer(frames[offset:offset + block_bytes], dtype=np.int16)
+        audio_time += len(block) / channels / sample_rate
+        if is_sound(block):
+            if onset is None:
+                onset = audio_time - len(block) / channels / sample_rate
+            last_sound = audio_time
+        elif onset is not None and audio_time - last_sound > SILENCE_DURATION:
+            utterances.append((onset, last_sound))
+            onset = None
+    if onset is not None:
+        utterances.append((onset, last_sound))
+    return utterances
+
+
+def score(utterances: List[Tuple[float, float]], speech: list, minutes: float) -> dict:
+    """False triggers (per minute and share of utterances), missed speech, longest utterance"""
+    if speech is not None:
+        overlaps = lambda u, s: u[0] < s[1] + LABEL_TOLERANCE and u[1] > s[0] - LABEL_TOLERANCE
+        false = sum(1 for u in utterances if not any(overlaps(u, s) for s in speech))
+        missed = sum(1 for s in speech if not any(overlaps(u, s) for u in utterances))
+    else:
+        false = sum(1 for start, end in utterances if end - start < MIN_SPEECH)
+        missed = None
+    longest = max((end - start for start, end in utterances), default=0.0)
+    return {
+        'utterances': len(utterances),
+        'false': false,
+        'false_per_min': false / minutes if minutes else 0.0,
+        'false_rate': false / len(utterances) if utterances else 0.0,
+        'missed': missed,
+        'longest': longest,
+    }
+
+
+def load_recording(path: Path, noise_db: float = None) -> Tuple[bytes, int, int, list]:
+    """Frames, sample rate, channels and labeled speech regions (None if unlabeled)"""
+    with wave.open(str(path), 'rb') as wav:
+        if wav.getsampwidth() != 2:
+            raise ValueError(f"{path.name}: 16-bit PCM WAV required")
+        sample_rate, channels = wav.getframerate(), wav.getnchannels()
+        frames = wav.readframes(wav.getnframes())
+    if noise_db is not None:
+        samples = np.frombuffer(frames, dtype=np.int16).astype(np.float32)
+        noise = np.random.default_rng(0).normal(0, 32768 * 10 ** (noise_db / 20), len(samples))
+        frames = np.clip(samples + noise, -32768, 32767).astype(np.int16).tobytes()
+
+    speech = None
+    sidecar = path.with_suffix('.json')
+    if sidecar.exists():
+        with open(sidecar, 'r', encoding='utf-8') as f:
+            speech = json.load(f).get('speech')
+    return frames, sample_rate, channels, speech
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare fixed and adaptive silence detection on WAV files")
+    parser.add_argument("path", help="WAV file or directory of WAV files")
+    parser.add_argument("--thresholds", type=int, nargs="*", default=[300, 500, 1000],
+                        help="Fixed int16 amplitude thresholds (main.py silence_threshold)")
+    parser.add_argument("--margins", type=float, nargs="*", default=[8.0, SPEECH_MARGIN_DB, 16.0],
+                        help="Adaptive speech margins above the noise floor (dB)")
+    parser.add_argument("--noise-db", type=float, help="Add white noise at this RMS level (dBFS)")
+    args = parser.parse_args()
+
+    path = Path(args.path)
+    files = sorted(path.glob("*.wav")) if path.is_dir() else [path]
+    if not files:
+        raise SystemExit(f"[NEGATIVE] No WAV files in {path}")
+
+    settings = [(f"fixed {t}", lambda sr, t=t: (lambda block: np.abs(block).max() > t)) for t in args.thresholds]
+    settings += [(f"floor +{m:g} dB", lambda sr, m=m: NoiseFloor(
+        sr, BLOCK_FRAMES, speech_margin=m, release_margin=min(RELEASE_MARGIN_DB, m / 2)).update)
+        for m in args.margins]
+
+    totals = {name: [] for name, _ in settings}
+    minutes_total = 0.0
+    labeled = True
+    for wav_path in files:
+        frames, sample_rate, channels, speech = load_recording(wav_path, args.noise_db)
+        labeled = labeled and speech is not None
+        minutes = len(frames) / (channels * 2) / sample_rate / 60
+        minutes_total += minutes
+        for name, make_detector in settings:
+            utterances = detect_utterances(frames, sample_rate, channels, make_detector(sample_rate))
+            totals[name].append(score(utterances, speech, minutes))
+
+    noise = f", white noise at {args.noise_db:g} dBFS" if args.noise_db is not None else ""
+    print(f">>> {len(files)} recording(s), {minutes_total:.1f} min{noise}; false triggers "
+          f"{'from labeled speech' if labeled else f'estimated (utterances under {MIN_SPEECH}s of sound)'}\n")
+    print(f"{'detector':<16} {'utterances':>11} {'false':>6} {'false/min':>10} {'false %':>8} "
+          f"{'missed':>7} {'longest s':>10}")
+    best = None
+    for name, _ in settings:
+        runs = totals[name]
+        utterances = sum(r['utterances'] for r in runs)
+        false = sum(r['false'] for r in runs)
+        missed = sum(r['missed'] for r in runs) if labeled else None
+        longest = max(r['longest'] for r in runs)
+        stuck = " (never silent)" if longest >= STUCK_UTTERANCE else ""
+        print(f"{name:<16} {utterances:>11} {false:>6} {false / minutes_total:>10.2f} "
+              f"{false / utterances if utterances else 0.0:>8.1%} {'-' if missed is None else missed:>7} "
+              f"{longest:>10.1f}{stuck}")
+        key = (longest >= STUCK_UTTERANCE, missed or 0, false)
+        if best is None or key < best[0]:
+            best = (key, name)
+    print(f"\nBest: {best[1]} (fewest false triggers without missing speech or getting stuck)")
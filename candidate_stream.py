@@ -0,0 +1,173 @@
+import threading
+import time
+from collections import deque
+from queue import Queue
+from typing import Callable, Optional
+import numpy as np
+
+from audio_capture import CallbackCapture
+from noise_floor import NoiseFloor
+
+# Configuration
+CANDIDATE_THRESHOLD = 500  # int16 amplitude of speech on the microphone (adaptive=False)
+CANDIDATE_SILENCE = 0.7    # Seconds of silence that end a candidate utterance
+MAX_UTTERANCE = 15.0       # Seconds after which a long utterance is sent for transcription
+ECHO_GATE_FACTOR = 4.0     # While the candidate speaks, loopback audio must be this many
+                           # times above its silence threshold to count as the interviewer
+PRE_ROLL_BLOCKS = 4        # Blocks kept before speech starts (word onsets)
+BLOCK_FRAMES = 1024
+
+
+class StreamVAD:
+    def __init__(self, silence_duration: float, threshold: int = CANDIDATE_THRESHOLD,
+                 noise_floor: Optional[NoiseFloor] = None):
+        """
+        Energy VAD with a hangover: speech lasts until `silence_duration` without
+        a loud block. Blocks are loud against `noise_floor` if given, else above
+        the fixed int16 amplitude `threshold`.
+        """
+        self.threshold = threshold
+        self.noise_floor = noise_floor
+        self.silence_duration = silence_duration
+        self.active = False
+        self.last_sound = 0.0
+
+    def update(self, block: np.ndarray, now: float) -> bool:
+        if self.noise_floor:
+            loud = self.noise_floor.update(block)
+        else:
+            loud = len(block) and int(np.abs(block.astype(np.int32)).max()) > self.threshold
+        if loud:
+            self.last_sound = now
+            self.active = True
+        elif self.active and now - self.last_sound > self.silence_duration:
+            self.active = False
+        return self.active
+
+
+class CandidateStream:
+    def __init__(self, p, on_utterance: Callable[[str, float], None],
+                 whisper_model=None, threshold: int = CANDIDATE_THRESHOLD,
+                 silence_duration: float = CANDIDATE_SILENCE, adaptive: bool = True,
+                 max_utterance: float = MAX_UTTERANCE):
+        """
+        Microphone capture of the candidate, next to the loopback capture of
+        the interviewer in main.py.
+
+        The microphone has its own VAD, against the microphone's noise floor
+        (noise_floor.py) or, with adaptive=False, a fixed threshold. Its state
+        gates the loopback stream:
+        while the candidate speaks, quiet loopback audio is treated as echo
+        of their own voice (see is_echo). Candidate utterances skip the main
+        Whisper model; with `whisper_model` (e.g. voice_to_text.load_cheap_model())
+        they are transcribed and passed to `on_utterance(text, started_at)`.
+        Utterances longer than `max_utterance` seconds are sent in parts, so
+        a stuck VAD cannot buffer audio forever.
+
+        Args:
+            p: PyAudio instance shared with the loopback stream
+        """
+        self.p = p
+        self.on_utterance = on_utterance
+        self.whisper_model = whisper_model
+        self.max_utterance = max_utterance
+        self.is_running = False
+        self.capture = None
+
+        device = p.get_default_input_device_info()
+        self.device_name = device['name']
+        self.sample_rate = int(device['defaultSampleRate'])
+        self.channels = 1
+        self.vad = StreamVAD(silence_duration, threshold,
+                             NoiseFloor(self.sample_rate, BLOCK_FRAMES) if adaptive else None)
+
+        self.transcription_queue = Queue()
+        self.results_queue = Queue()
+        self.started_at = {}  # task_id -> wall time the utterance started
+        # Candidate audio kept off the main model, and the cheap model's decode time
+        self.stats = {'utterances': 0, 'audio_seconds': 0.0}
+        self.decode_stats = {'decode_seconds': 0.0}
+
+    @property
+    def is_speaking(self) -> bool:
+        return self.vad.active
+
+    def is_echo(self, loopback_level: int, loopback_threshold: int) -> bool:
+        """Loopback audio heard while the candidate speaks, not loud enough to be the interviewer"""
+        return self.vad.active and loopback_level <= loopback_threshold * ECHO_GATE_FACTOR
+
+    def start(self):
+        self.capture = CallbackCapture(self.sample_rate, self.channels, BLOCK_FRAMES).open(
+            self.p, self.p.get_default_input_device_info()['index'])
+        print(f"Candidate microphone: {self.device_name} ({self.sample_rate} Hz)")
+        self.is_running = True
+        threading.Thread(target=self._capture, daemon=True).start()
+
+        if self.whisper_model is not None:
+            from voice_to_text import transcription_worker
+            threading.Thread(
+                target=transcription_worker,
+                args=(self.sample_rate, self.channels, self.transcription_queue, self.results_queue),
+                kwargs={'whisper_model': self.whisper_model, 'stats': self.decode_stats},
+                daemon=True
+            ).start()
+            threading.Thread(target=self._deliver, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.is_running = False
+        self.transcription_queue.put(None)
+
+    def _capture(self):
+        utterance = []
+        pre_roll = deque(maxlen=PRE_ROLL_BLOCKS)
+        started_at = 0.0
+        task_counter = 0
+        max_blocks = max(1, int(self.max_utterance * self.sample_rate / BLOCK_FRAMES))
+
+        def flush():
+            nonlocal task_counter
+            audio_bytes = b''.join(utterance)
+            utterance.clear()
+            self.stats['utterances'] += 1
+            self.stats['audio_seconds'] += len(audio_bytes) / 2 / self.channels / self.sample_rate
+            if self.whisper_model is not None:
+                task_counter += 1
+                self.started_at[task_counter] = started_at
+                self.transcription_queue.put((audio_bytes, task_counter))
+
+        while self.is_running:
+            data = self.capture.read()
+            now = time.time()
+            if self.vad.update(np.frombuffer(data, dtype=np.int16), now):
+                if not utterance:
+                    utterance.extend(pre_roll)
+                    pre_roll.clear()
+                    started_at = now
+                utterance.append(data)
+                if len(utterance) >= max_blocks:
+                    flush()
+            elif utterance:
+                flush()
+            else:
+                pre_roll.append(data)
+
+        self.capture.close()
+
+    def _deliver(self):
+        while self.is_running:
+            task_id, text = self.results_queue.get()
+            started_at = self.started_at.pop(task_id, time.time())
+            if text:
+                self.on_utterance(text, started_at)
+
+    def decode_savings(self, main_stats: dict) -> Optional[str]:
+        """Summary of the main-model decode time saved by not transcribing the candidate"""
+        if not main_stats.get('audio_seconds') or not self.stats['audio_seconds']:
+            return None
+        main_rtf = main_stats['decode_seconds'] / main_stats['audio_seconds']
+        avoided = self.stats['audio_seconds'] * main_rtf
+        saved = avoided - self.decode_stats['decode_seconds']
+        return (f"Candidate speech: {self.stats['audio_seconds']:.1f}s in {self.stats['utterances']} utterances, "
+                f"{saved:.1f}s of decode saved (main model RTF {main_rtf:.2f}, "
+                f"cheap model {self.decode_stats['decode_seconds']:.1f}s)")
@@ -0,0 +1,119 @@
+import re
+import threading
+from collections import OrderedDict, deque
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+# Configuration
+MAX_TURNS = 3               # Previous questions blended into the query
+TURN_DECAY = 0.5            # Weight multiplier per turn of age
+HISTORY_WEIGHT = 0.35       # Weight of the last turn relative to the question
+FOLLOW_UP_WEIGHT = 0.8      # ... when the question refers back ("that", "ça", ...)
+WORKING_SET_SIZE = 8        # Recently retrieved chunks kept per session
+WORKING_SET_SLOTS = 1       # Extra chunks re-included from the working set
+WORKING_SET_MIN_SCORE = 0.3 # Minimum similarity to re-include a chunk
+
+# Cues that a question refers back to the previous turns. Pronouns only count
+# at the end of the question ("...after that?") or as demonstratives before a
+# noun ("that model"): "how", "it" or "that" alone also open new questions,
+# and "this job" or "ce poste" is the position being interviewed for.
+FOLLOW_UP_PATTERN = re.compile(
+    r"^\s*(and|et|so|donc|alors|also|aussi)\b|\b(what|how) about\b|"
+    r"(?<!think )(?<!know )(?<!say )(?<!believe )\b(that|this|those|these) "
+    r"(?!is\b|was\b|are\b|you\b|we\b|i\b|they\b|the\b|a\b|an\b|job\b|role\b|position\b|company\b)\w+|"
+    r"\b(cet|cette|ces) (?!entreprise\b|offre\b)\w+|\bce (?!que\b|qui\b|dont\b|poste\b)\w+|"
+    r"\b(you|vous) (just )?(mentioned|said|talked about|avez (mentionné|évoqué|parlé))\b|"
+    r"\b(that|this|it|them|there|then|ça|cela|ceci|là|là-bas|dessus|depuis)\s*[?.!]*\s*$",
+    re.IGNORECASE
+)
+
+
+def _normalize(vector: np.ndarray) -> np.ndarray:
+    vector = np.asarray(vector, dtype=np.float32)
+    return vector / (np.linalg.norm(vector) + 1e-12)
+
+
+class ConversationMemory:
+    def __init__(self, rag, max_turns: int = MAX_TURNS, decay: float = TURN_DECAY,
+                 history_weight: float = HISTORY_WEIGHT,
+                 working_set_size: int = WORKING_SET_SIZE):
+        """
+        Per-session memory that makes retrieval follow the conversation.
+
+        The query vector blends the current question with the decayed
+        embeddings of the previous questions (encoded once, when the turn is
+        added), so "and how did you scale that?" still points at the project
+        of the previous turn. Recently retrieved chunks form a working set
+        whose stored embeddings are re-scored with a dot product, no index scan.
+        """
+        self.rag = rag
+        self.decay = decay
+        self.history_weight = history_weight
+        self.working_set_size = working_set_size
+        self.turns = deque(maxlen=max_turns)  # (question, normalized embedding)
+        self.working_set = OrderedDict()      # chunk text -> (metadata, normalized embedding)
+        self.lock = threading.Lock()
+
+    def embed(self, question: str) -> np.ndarray:
+        return _normalize(self.rag.encode([question])[0])
+
+    def query_embedding(self, question: str, embedding: Optional[np.ndarray] = None) -> np.ndarray:
+        """Question embedding blended with the decayed embeddings of the recent turns"""
+        blended = self.embed(question) if embedding is None else _normalize(embedding)
+        with self.lock:
+            turns = list(self.turns)
+        if not turns:
+            return blended
+
+        weight = FOLLOW_UP_WEIGHT if FOLLOW_UP_PATTERN.search(question) else self.history_weight
+        for age, (_, turn_embedding) in enumerate(reversed(turns)):
+            blended = blended + weight * self.decay ** age * turn_embedding
+        return _normalize(blended)
+
+    def add_turn(self, question: str, embedding: Optional[np.ndarray] = None):
+        """Record an asked question (after its own retrieval)"""
+        embedding = self.embed(question) if embedding is None else _normalize(embedding)
+        with self.lock:
+            self.turns.append((question, embedding))
+
+    def remember(self, results: List[Tuple[str, Dict, float]]):
+        """Move retrieved chunks to the front of the working set"""
+        embeddings = self.rag.chunk_embeddings([chunk for chunk, _, _ in results])
+        with self.lock:
+            for chunk, metadata, _ in results:
+                if chunk in embeddings:
+                    self.working_set[chunk] = (metadata, _normalize(embeddings[chunk]))
+                    self.working_set.move_to_end(chunk, last=False)
+            while len(self.working_set) > self.working_set_size:
+                self.working_set.popitem()
+
+    def _from_working_set(self, query: np.ndarray, exclude: set) -> List[Tuple[str, Dict, float]]:
+        """Best working-set chunks for the query that retrieval did not return"""
+        with self.lock:
+            candidates = [(chunk, metadata, embedding) for chunk, (metadata, embedding)
+                          in self.working_set.items() if chunk not in exclude]
+        if not candidates:
+            return []
+        scores = np.stack([embedding for _, _, embedding in candidates]) @ query
+        order = np.argsort(-scores)[:WORKING_SET_SLOTS]
+        return [(candidates[i][0], candidates[i][1], float(scores[i]))
+                for i in order if scores[i] >= WORKING_SET_MIN_SCORE]
+
+    def retrieve(self, question: str, top_k: int = 3, embedding: Optional[np.ndarray] = None,
+                 remember: bool = True, **retrieve_kwargs) -> List[Tuple[str, Dict, float]]:
+        """
+        rag.retrieve with the blended query, plus re-included working-set chunks.
+        With remember=False (pre-warm on a partial question) the working set
+        is only read: results that are never used must not crowd it.
+        """
+        query = self.query_embedding(question, embedding)
+        results = self.rag.retrieve(question, top_k=top_k, query_embedding=query, **retrieve_kwargs)
+        extra = self._from_working_set(query, {chunk for chunk, _, _ in results})
+        if remember:
+            self.remember(results)
+        return results + extra
+
+    def reset(self):
+        with self.lock:
+            self.turns.clear()
+            self.working_set.clear()
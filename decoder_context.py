@@ -0,0 +1,107 @@
+import re
+import time
+from collections import Counter
+from pathlib import Path
+from typing import List, Optional
+
+from document_loader import SUPPORTED_EXTENSIONS, iter_document_lines
+
+# Configuration
+MAX_KEY_TERMS = 30     # Vocabulary terms from documents/ in every prompt
+CONTEXT_CHARS = 200    # Recent committed text carried over (Whisper keeps ~220 prompt tokens)
+CONTEXT_TTL = 20.0     # Seconds without speech after which the recent text is dropped
+
+# Terms Whisper tends to misspell: CamelCase, acronyms, versions, dotted names (FastAPI, AWS, Node.js, C++)
+TERM_PATTERN = re.compile(r'\b[A-Za-z][\w+#.-]*[\w+#]|\b[A-Za-z]\b[+#]+')
+CAPITALIZED_PATTERN = re.compile(r'(?<![.!?:]\s)(?<!^)\b[A-Z][a-z]{2,}\b(?![.+#-]\w)')
+LIST_ITEM_PATTERN = re.compile(r'\b[A-Z][a-z]{2,}\b(?![.+#-]\w)')
+COMMON_WORDS = {
+    'the', 'and', 'for', 'with', 'from', 'this', 'that', 'les', 'des', 'une', 'pour', 'avec', 'dans',
+    'january', 'february', 'march', 'april', 'may', 'june', 'july', 'august', 'september',
+    'october', 'november', 'december', 'present', 'project', 'projects', 'experience', 'skills',
+}
+
+
+def is_key_term(word: str) -> bool:
+    """Word with inner capitals, digits or symbols (not a plain English word)"""
+    inner = word[1:]
+    return (any(c.isupper() for c in inner) or any(c.isdigit() for c in word)
+            or any(c in '+#.' for c in inner.rstrip('.')))
+
+
+def extract_key_terms(documents_dir: str = "documents", max_terms: int = MAX_KEY_TERMS) -> List[str]:
+    """
+    Vocabulary of the candidate's documents worth priming Whisper with.
+
+    Technical terms (CamelCase, acronyms, versions, dotted names), items of
+    comma-separated lists (skills) and proper nouns capitalized mid-sentence
+    at least twice, most frequent first.
+    """
+    counts = Counter()
+    path = Path(documents_dir)
+    if not path.exists():
+        return []
+
+    for file_path in sorted(path.iterdir()):
+        if file_path.suffix.lower() not in SUPPORTED_EXTENSIONS:
+            continue
+        try:
+            for line in iter_document_lines(file_path):
+                line = line.lstrip('#-*> ').strip()
+                for word in TERM_PATTERN.findall(line):
+                    word = word.rstrip('.-')
+                    if len(word) > 1 and is_key_term(word):
+                        counts[word] += 2  # Rarely plain words, always worth keeping
+                # In a list ("Python, Docker, Redis") every capitalized item is a name
+                is_list = line.count(',') >= 2
+                for word in (LIST_ITEM_PATTERN if is_list else CAPITALIZED_PATTERN).findall(line):
+                    if word.lower() not in COMMON_WORDS:
+                        counts[word] += 2 if is_list else 1
+        except Exception as e:
+            print(f"[NEGATIVE] Could not read {file_path.name} for key terms: {e}")
+
+    return [term for term, count in counts.most_common() if count >= 2][:max_terms]
+
+
+class DecoderContext:
+    def __init__(self, key_terms: List[str] = None, max_chars: int = CONTEXT_CHARS, ttl: float = CONTEXT_TTL):
+        """
+        Rolling initial prompt of one transcription stream.
+
+        Short chunks decoded cold lose the context of the previous ones. The
+        prompt is the documents' key terms followed by the end of the last
+        committed text; Whisper truncates prompts from the start, so the
+        recent text is kept last. The recent text expires after `ttl`
+        seconds without speech, and a chunk that only repeats it is not fed
+        back (Whisper can loop on its own prompt).
+        """
+        self.key_terms = key_terms or []
+        self.max_chars = max_chars
+        self.ttl = ttl
+        self.recent = ""
+        self.last_commit = 0.0
+
+    def prompt(self) -> Optional[str]:
+        if self.recent and time.time() - self.last_commit > self.ttl:
+            self.recent = ""
+        parts = []
+        if self.key_terms:
+            parts.append("Glossary: " + ", ".join(self.key_terms) + ".")
+        if self.recent:
+            parts.append(self.recent)
+        return " ".join(parts) or None
+
+    def commit(self, text: str):
+        """Carry a chunk's text over to the next prompt"""
+        text = text.strip()
+        if not text or text.lower() in self.recent.lower():
+            return
+        recent = f"{self.recent} {text}".strip()
+        if len(recent) > self.max_chars:
+            # Keep whole words at the end
+            recent = recent[-self.max_chars:].split(" ", 1)[-1]
+        self.recent = recent
+        self.last_commit = time.time()
+
+    def reset(self):
+        self.recent = ""
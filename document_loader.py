@@ -0,0 +1,242 @@
+import re
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+# Chunking configuration (all-MiniLM-L6-v2 truncates inputs at 256 tokens)
+CHUNK_TOKENS = 200    # Maximum tokens per chunk, header included
+CHUNK_OVERLAP = 40    # Tokens shared by consecutive windows of a long section
+MIN_CHUNK_CHARS = 20  # Smaller chunks are dropped
+MAX_SECTION_CHARS = 64 * 1024  # Long sections are streamed in pieces of this size
+
+SUPPORTED_EXTENSIONS = ('.txt', '.md', '.pdf', '.docx', '.html', '.htm')
+
+WORD_PATTERN = re.compile(r'\w+|[^\w\s]')
+
+
+# ---------------------------------------------------------------------------
+# Extractors: stream a file as markdown-like lines ('#' headers, plain text)
+# ---------------------------------------------------------------------------
+
+def _iter_text_lines(path: Path) -> Iterator[str]:
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            yield line.rstrip('\n')
+
+
+def _iter_pdf_lines(path: Path) -> Iterator[str]:
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        raise ImportError("PDF support requires: pip install pypdf")
+
+    reader = PdfReader(str(path))
+    for page in reader.pages:  # One page in memory at a time
+        for line in (page.extract_text() or "").splitlines():
+            yield line
+
+
+def _iter_docx_lines(path: Path) -> Iterator[str]:
+    try:
+        import docx
+    except ImportError:
+        raise ImportError("DOCX support requires: pip install python-docx")
+
+    for paragraph in docx.Document(str(path)).paragraphs:
+        style = paragraph.style.name if paragraph.style is not None else ""
+        if style.startswith('Heading'):
+            level = style.replace('Heading', '').strip()
+            level = int(level) if level.isdigit() else 1
+            yield f"{'#' * level} {paragraph.text}"
+        else:
+            yield paragraph.text
+
+
+class _HTMLToLines(HTMLParser):
+    """Convert HTML to lines, turning <h1>-<h6> into '#' headers"""
+    BLOCK_TAGS = {'p', 'div', 'li', 'br', 'tr', 'section', 'article', 'ul', 'ol', 'table'}
+    SKIP_TAGS = {'script', 'style', 'head'}
+
+    def __init__(self):
+        super().__init__()
+        self.lines = []
+        self.current = []
+        self.skip_depth = 0
+
+    def _flush(self, prefix=""):
+        text = " ".join("".join(self.current).split())
+        if text:
+            self.lines.append(prefix + text)
+        self.current = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP_TAGS:
+            self.skip_depth += 1
+        elif tag in self.BLOCK_TAGS or re.fullmatch(r'h[1-6]', tag):
+            self._flush()
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP_TAGS:
+            self.skip_depth = max(0, self.skip_depth - 1)
+        elif re.fullmatch(r'h[1-6]', tag):
+            self._flush('#' * int(tag[1]) + ' ')
+        elif tag in self.BLOCK_TAGS:
+            self._flush()
+
+    def handle_data(self, data):
+        if not self.skip_depth:
+            self.current.append(data)
+
+
+def _iter_html_lines(path: Path) -> Iterator[str]:
+    parser = _HTMLToLines()
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        while True:
+            block = f.read(64 * 1024)
+            if not block:
+                break
+            parser.feed(block)
+            yield from parser.lines
+            parser.lines = []
+    parser.close()
+    parser._flush()
+    yield from parser.lines
+
+
+EXTRACTORS = {
+    '.txt': _iter_text_lines,
+    '.md': _iter_text_lines,
+    '.pdf': _iter_pdf_lines,
+    '.docx': _iter_docx_lines,
+    '.html': _iter_html_lines,
+    '.htm': _iter_html_lines,
+}
+
+
+def iter_document_lines(path: Path) -> Iterator[str]:
+    """Stream a supported document as markdown-like lines"""
+    extractor = EXTRACTORS.get(path.suffix.lower())
+    if extractor is None:
+        raise ValueError(f"Unsupported document type: {path.suffix}")
+    return extractor(path)
+
+
+# ---------------------------------------------------------------------------
+# Chunking
+# ---------------------------------------------------------------------------
+
+def iter_sections(lines: Iterator[str]) -> Iterator[Tuple[str, str, int]]:
+    """
+    Group lines into sections delimited by markdown headers ('#' lines).
+    Sections longer than MAX_SECTION_CHARS are split so that a huge file
+    without headers never has to sit fully in memory.
+
+    Yields:
+        (header, body, body_offset) where body_offset is the character offset
+        of the body in the extracted text
+    """
+    header = ""
+    body = []
+    body_chars = 0
+    offset = 0
+    body_start = 0
+
+    for line in lines:
+        if line.startswith('#'):
+            if header or body:
+                yield header, "\n".join(body), body_start
+            header = line.strip()
+            body = []
+            body_chars = 0
+            body_start = offset + len(line) + 1
+        else:
+            if body_chars > MAX_SECTION_CHARS:
+                yield header, "\n".join(body), body_start
+                body = []
+                body_chars = 0
+                body_start = offset
+            body.append(line)
+            body_chars += len(line) + 1
+        offset += len(line) + 1
+
+    if header or body:
+        yield header, "\n".join(body), body_start
+
+
+class Chunker:
+    def __init__(self, tokenizer=None, max_tokens: int = CHUNK_TOKENS,
+                 overlap: int = CHUNK_OVERLAP):
+        """
+        Header-aware sliding-window chunker.
+
+        Args:
+            tokenizer: HuggingFace fast tokenizer of the embedding model (token
+                       counts match what the model sees); a word/punctuation
+                       approximation is used when None
+        """
+        self.tokenizer = tokenizer
+        self.max_tokens = max_tokens
+        self.overlap = min(overlap, max_tokens // 2)
+
+    def _token_spans(self, text: str) -> List[Tuple[int, int]]:
+        """Character span of every token of `text`"""
+        if self.tokenizer is not None:
+            try:
+                encoding = self.tokenizer(text, add_special_tokens=False,
+                                          return_offsets_mapping=True)
+                return [tuple(span) for span in encoding['offset_mapping']]
+            except Exception:
+                pass
+        return [match.span() for match in WORD_PATTERN.finditer(text)]
+
+    def chunk_section(self, header: str, body: str, body_offset: int) -> List[Dict]:
+        """Split one section into windows of at most max_tokens (header included)"""
+        header_tokens = len(self._token_spans(header)) if header else 0
+        budget = max(self.max_tokens - header_tokens, self.overlap + 1)
+        spans = self._token_spans(body)
+
+        if len(spans) <= budget:
+            windows = [(0, len(body))] if body.strip() else []
+        else:
+            windows = []
+            step = budget - self.overlap
+            for first in range(0, len(spans), step):
+                last = min(first + budget, len(spans)) - 1
+                start = spans[first][0]
+                end = spans[last][1]
+                # Snap to word boundaries (sub-word tokens split words)
+                while start > 0 and not body[start - 1].isspace():
+                    start -= 1
+                while end < len(body) and not body[end].isspace():
+                    end += 1
+                windows.append((start, end))
+                if last == len(spans) - 1:
+                    break
+
+        chunks = []
+        for start, end in windows:
+            text = body[start:end].strip()
+            if header:
+                text = f"{header}\n{text}" if text else header
+            if len(text) > MIN_CHUNK_CHARS:
+                chunks.append({
+                    'text': text,
+                    'header': header.lstrip('#').strip(),
+                    'start': body_offset + start,
+                    'end': body_offset + end,
+                })
+
+        # Header-only section: keep it if it carries information
+        if not windows and header and len(header) > MIN_CHUNK_CHARS:
+            chunks.append({'text': header, 'header': header.lstrip('#').strip(),
+                           'start': body_offset, 'end': body_offset})
+        return chunks
+
+    def chunk_lines(self, lines: Iterator[str]) -> Iterator[Dict]:
+        """Stream chunks (text, header, start, end) from document lines"""
+        for header, body, body_offset in iter_sections(lines):
+            yield from self.chunk_section(header, body, body_offset)
+
+    def chunk_file(self, path: Path) -> List[Dict]:
+        """Extract and chunk one document"""
+        return list(self.chunk_lines(iter_document_lines(path)))
@@ -0,0 +1,72 @@
+import threading
+import time
+from typing import Callable, Optional
+
+# Configuration
+POLL_INTERVAL = 1.0  # Seconds between checks of documents/
+DEBOUNCE = 2.0       # Seconds without further changes before re-indexing
+
+
+class DocumentWatcher:
+    def __init__(self, rag, on_status: Optional[Callable[[str], None]] = None,
+                 poll_interval: float = POLL_INTERVAL, debounce: float = DEBOUNCE):
+        """
+        Background watcher that keeps the RAG index in sync with documents/.
+
+        Polls file sizes and modification times (no extra dependency, works
+        the same on every OS), waits until the folder has been stable for
+        `debounce` seconds, then re-indexes only the added, modified or
+        deleted files and swaps the new index into the running RAGSystem.
+        """
+        self.rag = rag
+        self.on_status = on_status
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self.is_running = False
+        self.thread = None
+
+    def start(self):
+        self.is_running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.is_running = False
+
+    def _status(self, message: str):
+        print(f"[WATCH] {message}")
+        if self.on_status:
+            self.on_status(message)
+
+    def pending_changes(self, states: dict):
+        """(changed, removed) file names compared with the indexed state"""
+        indexed = self.rag.indexed_files
+        changed = sorted(name for name, state in states.items() if indexed.get(name) != list(state))
+        removed = sorted(name for name in indexed if name not in states)
+        return changed, removed
+
+    def _run(self):
+        last_states = None
+        last_change = time.time()
+
+        while self.is_running:
+            try:
+                states = self.rag.file_states()
+                if states != last_states:
+                    # Still being edited: restart the debounce window
+                    last_states = states
+                    last_change = time.time()
+                elif time.time() - last_change >= self.debounce:
+                    changed, removed = self.pending_changes(states)
+                    if changed or removed:
+                        names = ", ".join(changed + removed)
+                        self._status(f"Re-indexing documents: {names}...")
+                        self.rag.update_files(changed, removed)
+                        self._status(f"Index updated ({len(self.rag.document_chunks)} chunks)")
+                        last_change = time.time()
+            except Exception as e:
+                self._status(f"Re-indexing failed: {e}")
+                last_change = time.time()  # Retry after another debounce window
+
+            time.sleep(self.poll_interval)
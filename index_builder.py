@@ -0,0 +1,248 @@
+"""
+Pipelined index build for large document folders.
+
+Stages:
+    1. thread pool   - read and extract files (I/O bound)
+    2. process pool  - chunk the extracted sections (CPU bound, optional)
+    3. main thread   - encode chunks in batches as they are produced
+
+Each stage only keeps a bounded number of files in flight, so the whole
+corpus never sits in memory as raw text. The chunk texts and metadata are
+collected in memory (the running index serves from memory), and encoded
+batches are appended to embeddings.partial, which is read back once as a
+single array instead of concatenating many small ones. The index is then
+saved in the usual cache files.
+
+Usage (builds embeddings/ for documents/):
+    python index_builder.py [--processes 4] [--batch-size 64]
+"""
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterator, List
+import numpy as np
+from bm25 import BM25Index
+from document_loader import Chunker, SUPPORTED_EXTENSIONS, iter_document_lines, iter_sections
+
+# Configuration
+READ_WORKERS = 4        # Threads reading/extracting files
+CHUNK_PROCESSES = 0     # Processes chunking sections (0 = chunk in the reader threads)
+EMBED_BATCH_SIZE = 64   # Chunks per model.encode call
+FILES_IN_FLIGHT = 8     # Files extracted ahead of the encoder
+
+# Chunker of a chunking worker process (set by the pool initializer)
+_worker_chunker = None
+
+
+def _init_chunk_worker(tokenizer):
+    global _worker_chunker
+    _worker_chunker = Chunker(tokenizer=tokenizer)
+
+
+def _chunk_sections(sections: list) -> List[dict]:
+    """Chunk pre-extracted sections (runs in a worker process)"""
+    chunks = []
+    for header, body, offset in sections:
+        chunks.extend(_worker_chunker.chunk_section(header, body, offset))
+    return chunks
+
+
+def _bounded_map(executor, fn, items, window: int) -> Iterator:
+    """Like executor.map, but with at most `window` tasks submitted ahead"""
+    pending = deque()
+    for item in items:
+        pending.append(executor.submit(fn, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def peak_memory_mb() -> float:
+    """Peak resident memory of this process in MB (0 if unavailable)"""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Bytes on macOS, KB on Linux and the BSDs
+        return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+    except ImportError:
+        pass
+    try:
+        import psutil  # Windows: peak working set
+        return getattr(psutil.Process().memory_info(), 'peak_wset', 0) / 1024 ** 2
+    except ImportError:
+        return 0.0
+
+
+class IndexBuilder:
+    def __init__(self, rag, read_workers: int = READ_WORKERS,
+                 chunk_processes: int = CHUNK_PROCESSES,
+                 batch_size: int = EMBED_BATCH_SIZE):
+        """
+        Args:
+            rag: RAGSystem with its model loaded; receives the built index
+            chunk_processes: Use a process pool for chunking. Only safe when
+                             the calling script has an `if __name__ == "__main__"`
+                             guard (Windows starts workers by re-importing it).
+        """
+        self.rag = rag
+        self.read_workers = read_workers
+        self.chunk_processes = chunk_processes
+        self.batch_size = batch_size
+        self.tokenizer = getattr(rag.model, 'tokenizer', None)
+        self.stats = {}
+
+    def _list_files(self) -> List[Path]:
+        return sorted(
+            path for path in self.rag.documents_dir.iterdir()
+            if path.is_file() and path.suffix.lower() in SUPPORTED_EXTENSIONS
+        )
+
+    def _read_sections(self, path: Path):
+        """Extract one file into sections (runs in a reader thread)"""
+        try:
+            return path, list(iter_sections(iter_document_lines(path))), None
+        except Exception as e:
+            return path, [], e
+
+    def _read_and_chunk(self, path: Path):
+        """Extract and chunk one file in the reader thread"""
+        try:
+            return path, Chunker(tokenizer=self.tokenizer).chunk_file(path), None
+        except Exception as e:
+            return path, [], e
+
+    def _iter_file_chunks(self, files: List[Path], readers, chunkers) -> Iterator:
+        """Yield (path, chunks, error) per file, in file order"""
+        if chunkers is None:
+            yield from _bounded_map(readers, self._read_and_chunk, files, FILES_IN_FLIGHT)
+            return
+
+        pending = deque()
+        for path, sections, error in _bounded_map(readers, self._read_sections, files, FILES_IN_FLIGHT):
+            pending.append((path, chunkers.submit(_chunk_sections, sections), error))
+            if len(pending) >= FILES_IN_FLIGHT:
+                path, future, error = pending.popleft()
+                yield path, future.result(), error
+        while pending:
+            path, future, error = pending.popleft()
+            yield path, future.result(), error
+
+    def build(self) -> bool:
+        """Build chunks, embeddings and keyword index, encoding while files are still being read"""
+        rag = self.rag
+        if not rag.model:
+            print("[NEGATIVE] Model not loaded!")
+            return False
+
+        file_states = rag.file_states()  # Taken before reading: later edits get re-indexed
+        files = self._list_files()
+        if not files:
+            print(f"[NEGATIVE] No documents found in {rag.documents_dir}")
+            return False
+
+        print(f">>> Building index from {len(files)} files "
+              f"({self.read_workers} readers, {self.chunk_processes or 'no'} chunk processes, "
+              f"batch {self.batch_size})...")
+        start_time = time.time()
+
+        partial_embeddings = rag.embeddings_dir / "embeddings.partial"
+
+        chunks = []
+        metadata = []
+        batch = []
+        dim = None
+        encode_time = 0.0
+        bytes_read = 0
+
+        readers = ThreadPoolExecutor(max_workers=self.read_workers)
+        chunkers = None
+        if self.chunk_processes:
+            chunkers = ProcessPoolExecutor(max_workers=self.chunk_processes,
+                                           initializer=_init_chunk_worker,
+                                           initargs=(self.tokenizer,))
+
+        def flush(emb_file):
+            nonlocal batch, dim, encode_time
+            if not batch:
+                return
+            encode_start = time.time()
+            vectors = rag.model.encode(batch, batch_size=self.batch_size,
+                                       convert_to_numpy=True, show_progress_bar=False)
+            encode_time += time.time() - encode_start
+            vectors = np.asarray(vectors, dtype=np.float32)
+            dim = vectors.shape[1]
+            emb_file.write(vectors.tobytes())
+            batch = []
+
+        try:
+            with open(partial_embeddings, 'wb') as emb_file:
+                for path, file_chunks, error in self._iter_file_chunks(files, readers, chunkers):
+                    if error:
+                        print(f"      [NEGATIVE] Error reading {path.name}: {error}")
+                        continue
+                    bytes_read += path.stat().st_size
+                    doc_type = rag._get_document_type(path.name)
+                    for chunk in file_chunks:
+                        meta = {'source': path.name, 'type': doc_type, 'header': chunk['header'],
+                                'start': chunk['start'], 'end': chunk['end']}
+                        chunks.append(chunk['text'])
+                        metadata.append(meta)
+                        batch.append(chunk['text'])
+                        if len(batch) >= self.batch_size:
+                            flush(emb_file)
+                flush(emb_file)
+        finally:
+            readers.shutdown()
+            if chunkers:
+                chunkers.shutdown()
+
+        if not chunks:
+            os.remove(partial_embeddings)
+            print("[NEGATIVE] No chunks produced!")
+            return False
+
+        embeddings = np.fromfile(partial_embeddings, dtype=np.float32).reshape(-1, dim)
+        os.remove(partial_embeddings)
+        rag.swap_index(chunks, metadata, embeddings, BM25Index().build(chunks))
+        rag.indexed_files = file_states
+        rag._save_embeddings()
+
+        elapsed = time.time() - start_time
+        self.stats = {
+            'files': len(files),
+            'chunks': len(chunks),
+            'mb': bytes_read / 1024 ** 2,
+            'seconds': elapsed,
+            'chunks_per_sec': len(chunks) / elapsed if elapsed else 0.0,
+            'encode_seconds': encode_time,
+            'peak_memory_mb': peak_memory_mb(),
+        }
+        print(f"[POSITIVE] Indexed {len(chunks)} chunks ({self.stats['mb']:.1f} MB) in {elapsed:.1f}s "
+              f"- {self.stats['chunks_per_sec']:.0f} chunks/s, encode {encode_time:.1f}s, "
+              f"peak memory {self.stats['peak_memory_mb']:.0f} MB")
+        return True
+
+
+if __name__ == "__main__":
+    import argparse
+    from rag import RAGSystem
+
+    parser = argparse.ArgumentParser(description="Build the RAG index with a parallel pipeline")
+    parser.add_argument("--documents", default="documents")
+    parser.add_argument("--embeddings", default="embeddings")
+    parser.add_argument("--readers", type=int, default=READ_WORKERS)
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--batch-size", type=int, default=EMBED_BATCH_SIZE)
+    args = parser.parse_args()
+
+    rag = RAGSystem(documents_dir=args.documents, embeddings_dir=args.embeddings)
+    if not rag.load_model():
+        raise SystemExit(1)
+    builder = IndexBuilder(rag, read_workers=args.readers, chunk_processes=args.processes,
+                           batch_size=args.batch_size)
+    if not builder.build():
+        raise SystemExit(1)
@@ -5,12 +5,26 @@ import numpy as np
 import time
 import threading
 from queue import Queue
-from voice_to_text import transcription_worker
+from voice_to_text import transcription_worker, load_cheap_model, warm_up
+from decoder_context import DecoderContext, extract_key_terms
+from candidate_stream import CandidateStream
+from audio_capture import CallbackCapture
+from noise_floor import NoiseFloor
+from quality_governor import QualityGovernor
+from transcription_process import TranscriptionProcess
 from transcript_window import TranscriptWindow
-from ai import generate_chatbot_response
+from ai import generate_chatbot_response, backend_report
 from prompt import system_prompt
 import asyncio
-from rag import initialize_rag, retrieve_context
+from conversation_memory import ConversationMemory, FOLLOW_UP_PATTERN
+from rag import initialize_rag, retrieve_context, get_candidate_profile, get_rag_system
+from answer_cache import AnswerCache, MIN_CONTENT_WORDS, content_words
+from build_answer_bank import open_answer_bank
+from question_detector import QuestionDetector
+from request_manager import AIRequestManager
+from speculative_drafter import SpeculativeDrafter
+from session_store import SessionStore, session_state
+from document_watcher import DocumentWatcher
 
 # Queues for threading
 transcription_queue = Queue()  # Audio chunks to transcribe
@@ -19,9 +33,21 @@ results_queue = Queue()  # Transcription results
 # Configuration
 filename = "meeting_audio.wav"
 silence_threshold = 500  # Adjust as needed (int16 PCM amplitude)
+adaptive_silence = True  # Detect speech against the tracked noise floor instead of silence_threshold
 silence_duration = 0.5   # seconds to wait before printing accumulated text
 process_interval = 3.0   # Process audio every 3 seconds
 min_audio_duration = 0.5  # Minimum audio duration to transcribe (seconds)
+refresh_cached_answers = False  # Also generate a fresh answer after showing a cached one
+auto_ask_ai = True  # Ask the AI automatically when the interviewer finishes a question
+speculative_drafting = True  # Start the answer on the partial question while it is still spoken
+capture_candidate = True  # Capture the microphone (candidate) on its own stream, gating echo
+transcribe_candidate = False  # Also transcribe the candidate with a cheaper Whisper model
+adaptive_quality = True  # Lower beam size / chunk rate / model tier when transcription falls behind
+warm_up_whisper = True  # Decode a synthetic clip at startup so the first chunk is not slow
+carry_context = True  # Prime each chunk with the previous text and the key terms of documents/
+transcription_process = True  # Run Whisper in its own process (no GIL contention with audio/GUI)
+session_log = True  # Append transcript, questions, context and answers to sessions/ as they happen
+resume_session = True  # Continue the last session if the app did not exit cleanly (crash, power loss)
 
 # Initialize PyAudio
 p = pyaudio.PyAudio()
@@ -48,15 +74,9 @@ try:
     channels = default_speakers["maxInputChannels"]
     sample_rate = int(default_speakers["defaultSampleRate"])
     
-    # Open stream
-    stream = p.open(
-        format=pyaudio.paInt16,
-        channels=channels,
-        rate=sample_rate,
-        input=True,
-        input_device_index=default_speakers["index"],
-        frames_per_buffer=1024
-    )
+    # Open stream in callback mode: PortAudio pushes every block into a ring
+    # buffer, so audio is kept while the recording loop is busy
+    capture = CallbackCapture(sample_rate, channels, frames_per_buffer=1024).open(p, default_speakers["index"])
     
     print("=== Real-time Transcription Started ===")
     print(f"Processing audio every {process_interval}s")
@@ -64,103 +84,346 @@ try:
     print("Opening GUI window...")
     print("Press Ctrl+C to stop\n")
     
+    decode_stats = {}  # Decode time of the main Whisper model (interviewer)
+    quality_governor = QualityGovernor() if adaptive_quality else None
+    key_terms = extract_key_terms("documents") if carry_context else None
+    if key_terms is not None:
+        print(f"Whisper prompt primed with {len(key_terms)} key terms from documents/")
+    
+    # Whisper loading and warm-up overlap the RAG setup, in the transcription
+    # process or in a thread the worker waits for
+    transcription_engine = None
+    warm_up_thread = threading.Thread(target=warm_up, daemon=True)
+    if transcription_process:
+        transcription_engine = TranscriptionProcess(
+            sample_rate, channels, results_queue, min_audio_duration,
+            stats=decode_stats, governor=quality_governor, key_terms=key_terms, warm_up=warm_up_whisper
+        ).start()
+        transcription_queue = transcription_engine  # Same put/qsize/join interface
+    elif warm_up_whisper:
+        warm_up_thread.start()
+    
     # Initialize RAG system (one-time setup)
     print("\n" + "="*60)
     print("="*60)
+    answer_cache = None
+    answer_bank = None
+    conversation = None
     if initialize_rag():
         print("✅ RAG system ready! Answers will be personalized with your background.\n")
+        rag = get_rag_system()
+        answer_cache = AnswerCache(encode=rag.encode, fingerprint=rag.cache_fingerprint)
+        answer_bank = open_answer_bank(rag)  # Built offline with build_answer_bank.py
+        conversation = ConversationMemory(rag)  # Follow-up questions use the recent turns
     else:
         print("⚠️ RAG system failed to initialize. Will continue without context enhancement.")
         print("   To enable RAG, fill in documents/cv.txt, projects.txt, and experiences.txt\n")
     
-    # Define AI callback function
-    def handle_ai_request(transcript_text):
-        """Handle AI processing request from GUI button (with RAG context)"""
+    # Crash-safe session log (sessions/*.jsonl), written in the background
+    session = None
+    resumed_state = None
+    if session_log:
+        resumed = SessionStore.resume_latest() if resume_session else None
+        if resumed:
+            session, past_events = resumed
+            resumed_state = session_state(past_events)
+            print(f"[POSITIVE] Resumed {session.path.name}: {len(resumed_state['conversation'])} messages")
+            if conversation:
+                for question in resumed_state['questions'][-conversation.turns.maxlen:]:
+                    conversation.add_turn(question)
+        else:
+            session = SessionStore.create()
+            print(f"Session log: {session.path}")
+    
+    def log_event(kind, **fields):
+        if session:
+            session.record(kind, **fields)
+    
+    # Retrieval pre-warmed on the partial question while it is being spoken
+    prewarmed = {"text": "", "context": "", "chunk_ids": [], "results": []}
+    # Commit time of an automatically detected question (for click-free latency)
+    auto_trigger = {"committed_at": None}
+    
+    def prewarm_retrieval(partial_text):
+        """Run retrieval on the partial question so the final request can reuse it"""
+        chunk_ids = []
+        results = []
+        context = retrieve_context(partial_text, top_k=3, conversation=conversation, chunk_ids=chunk_ids,
+                                   remember=False, results_out=results)
+        prewarmed.update(text=partial_text, context=context, chunk_ids=chunk_ids, results=results)
+        if drafter:
+            drafter.consider(partial_text, context, chunk_ids)
+    
+    def prewarmed_context(question):
+        """Reuse the pre-warmed (context, chunk_ids, results) if the final question barely changed"""
+        partial = prewarmed["text"]
+        if partial and question.startswith(partial) and len(partial) >= 0.8 * len(question):
+            print("[RAG] Reusing pre-warmed context")
+            return prewarmed["context"], prewarmed["chunk_ids"], prewarmed["results"]
+        return None
+    
+    def on_question_detected(question, committed_at):
+        """Fire the AI without a button click"""
+        auto_trigger["committed_at"] = committed_at
+        transcript_window.request_ai()
+    
+    question_detector = QuestionDetector(on_question=on_question_detected, on_prewarm=prewarm_retrieval)
+    
+    # All AI requests run on one background loop: newer questions supersede
+    # older ones, concurrency is bounded and answers are displayed in order
+    ai_requests = AIRequestManager()
+    
+    async def generate_draft(question, context, on_token):
+        return await generate_chatbot_response(
+            system_prompt=system_prompt,
+            user_message=question,
+            temperature=0.7,
+            max_tokens=500,
+            context=context,
+            profile=get_candidate_profile(),
+            on_token=on_token
+        )
+    
+    # Answers drafted on the partial question, kept if the final question is close enough
+    drafter = None
+    if speculative_drafting and auto_ask_ai and answer_cache:
+        drafter = SpeculativeDrafter(ai_requests.loop, generate_draft, answer_cache.embed, question_detector.score)
+    
+    async def answer_question(generation_id, transcript_text):
+        """Produce (answer, status) for a question (runs on the request manager loop)"""
         try:
-            print(f"\n[AI] Processing transcript ({len(transcript_text)} chars)...")
+            print(f"\n[AI] Request #{generation_id}: processing transcript ({len(transcript_text)} chars)...")
+            
+            # Answer instantly if a similar question was prepared or already answered
+            question_embedding = None
+            refreshing = False  # A cached answer is shown until the new one replaces it
+            # A follow-up depends on the previous turns: never answered from (or stored in) the caches
+            cacheable = answer_cache is not None and not FOLLOW_UP_PATTERN.search(transcript_text)
+            if answer_cache:
+                question_embedding = await asyncio.to_thread(answer_cache.embed, transcript_text)
+            if cacheable:
+                exact = content_words(transcript_text) < MIN_CONTENT_WORDS
+                cached = (answer_bank.lookup(transcript_text, question_embedding, exact)
+                          or answer_cache.lookup(transcript_text, question_embedding, exact))
+                if cached:
+                    answer, score = cached
+                    if drafter:
+                        drafter.reset()
+                    if not refresh_cached_answers:
+                        conversation.add_turn(transcript_text, question_embedding)
+                        return answer, f"Cached answer ({score:.0%} match)"
+                    refreshing = True
+                    transcript_window.stream_message(generation_id, "AI", answer)
+                    log_event('draft', id=generation_id, text=answer, status="Cached answer (refreshing)")
+            
+            # An answer drafted while the question was spoken
+            speculation = drafter.claim(transcript_text, question_embedding) if drafter else None
+            if speculation:
+                log_event('retrieval', id=generation_id, chunk_ids=speculation.chunk_ids, prewarmed=True,
+                          speculative=True, ms=0.0)
+                transcript_window.update_status("Finishing the answer drafted during the question...")
+                response = await asyncio.wrap_future(speculation.future)
+                if response:
+                    conversation.add_turn(transcript_text, question_embedding)
+                    if cacheable:
+                        await asyncio.to_thread(answer_cache.store, transcript_text, response, question_embedding)
+                    return response, "AI response received! (drafted during the question)"
+            
             transcript_window.update_status("Retrieving relevant context...")
             
             # Retrieve relevant context from RAG system (fast: <200ms)
-            context = retrieve_context(transcript_text, top_k=3)
+            retrieval_start = time.time()
+            reused = prewarmed_context(transcript_text)
+            if reused:
+                context, chunk_ids, results = reused
+                if conversation:
+                    conversation.remember(results)
+            else:
+                chunk_ids = []
+                context = await asyncio.to_thread(retrieve_context, transcript_text, 3,
+                                                  conversation, question_embedding, chunk_ids)
+            log_event('retrieval', id=generation_id, chunk_ids=chunk_ids, prewarmed=reused is not None,
+                      ms=round((time.time() - retrieval_start) * 1000, 1))
+            if conversation:
+                conversation.add_turn(transcript_text, question_embedding)
             
             if context:
                 print(f"[RAG] Retrieved context ({len(context)} chars)")
             
             transcript_window.update_status("Waiting for AI response...")
             
-            # Run async function in sync context
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
+            draft = []
             
-            response = loop.run_until_complete(
-                generate_chatbot_response(
-                    system_prompt=system_prompt,
-                    user_message=transcript_text,
-                    temperature=0.7,
-                    max_tokens=500,
-                    context=context  # Add RAG context
-                )
-            )
+            def show_draft(token):
+                """Local model's draft (LLM_BACKEND=draft), streamed while the remote answer is written"""
+                if refreshing:
+                    return
+                if not draft:
+                    transcript_window.update_status("Local draft shown - polishing...")
+                draft.append(token)
+                transcript_window.stream_message(generation_id, "AI", token)
             
-            loop.close()
+            response = await generate_chatbot_response(
+                system_prompt=system_prompt,
+                user_message=transcript_text,
+                temperature=0.7,
+                max_tokens=500,
+                context=context,  # Add RAG context
+                profile=get_candidate_profile(),  # Static, cacheable prefix
+                on_draft=show_draft
+            )
+            if draft:
+                log_event('draft', id=generation_id, text="".join(draft), status="Local draft")
             
             if response:
                 print(f"[AI] Got response ({len(response)} chars)")
-                transcript_window.add_conversation_message("AI", response)
-                transcript_window.update_status("AI response received!")
-            else:
-                transcript_window.add_conversation_message("AI", "⚠️ No response from AI")
-                transcript_window.update_status("AI request failed")
+                if cacheable:
+                    await asyncio.to_thread(answer_cache.store, transcript_text, response, question_embedding)
+                return response, "AI response received!"
+            return "⚠️ No response from AI", "AI request failed"
                 
         except Exception as e:
-            error_msg = f"❌ Error: {str(e)}"
             print(f"[AI Error] {e}")
-            transcript_window.add_conversation_message("AI", error_msg)
-            transcript_window.update_status("AI error occurred")
+            return f"❌ Error: {str(e)}", "AI error occurred"
+    
+    # Define AI callback function
+    def handle_ai_request(transcript_text):
+        """Handle AI processing request from GUI button (with RAG context)"""
+        committed_at = auto_trigger["committed_at"]
+        auto_trigger["committed_at"] = None
+        question_detector.reset()
+        asked_at = time.time()
+        
+        def display(generation_id, result):
+            message, status = result
+            # Replaces the local draft streamed for this request, if any
+            transcript_window.finish_stream(generation_id, "AI", message)
+            transcript_window.update_status(status)
+            log_event('answer', id=generation_id, text=message, status=status,
+                      latency=round(time.time() - (committed_at or asked_at), 3))
+            if committed_at:
+                latency = time.time() - committed_at
+                median = question_detector.record_latency(latency)
+                print(f"[AI] Click-free latency: {latency:.2f}s (median {median:.2f}s)")
+                transcript_window.update_latency(f"{latency:.2f}s to answer (median {median:.2f}s)")
+        
+        generation_id = ai_requests.submit(lambda generation_id: answer_question(generation_id, transcript_text), display,
+                                           transcript_window.drop_stream)  # Superseded: drop its partial draft
+        log_event('question', id=generation_id, text=transcript_text, auto=committed_at is not None)
+    
+    # Rolling Whisper prompt: last transcribed text plus the vocabulary of documents/
+    # (kept by the transcription process itself when Whisper runs out of process)
+    decoder_context = None
+    if key_terms is not None and not transcription_engine:
+        decoder_context = DecoderContext(key_terms)
+    
+    def reset_session():
+        """New interview session: forget the previous turns and transcript context"""
+        if conversation:
+            conversation.reset()
+        if decoder_context:
+            decoder_context.reset()
+        if transcription_engine:
+            transcription_engine.reset_context()
+        if drafter:
+            drafter.reset()
+        log_event('clear')
     
     # Create GUI window with AI callback (will run in main thread)
-    transcript_window = TranscriptWindow(ai_callback=handle_ai_request)
+    transcript_window = TranscriptWindow(
+        ai_callback=handle_ai_request,
+        clear_callback=reset_session,
+        save_callback=session.export_to if session else None
+    )
     transcript_window.update_status("Initialized - Waiting for audio...")
+    if resumed_state:
+        transcript_window.restore(resumed_state['conversation'], resumed_state['transcript'])
+    
+    # Re-index edited documents in the background while the app runs
+    if answer_cache:
+        DocumentWatcher(get_rag_system(), on_status=transcript_window.update_status).start()
+    
+    # Candidate microphone on its own stream: echo gating, optional cheap transcription
+    candidate_stream = None
+    
+    def on_candidate_utterance(text, started_at):
+        transcript_window.add_conversation_message("Candidate", text)
+        log_event('candidate', text=text, started_at=started_at)
+    
+    if capture_candidate:
+        try:
+            candidate_stream = CandidateStream(
+                p,
+                on_utterance=on_candidate_utterance,
+                whisper_model=load_cheap_model() if transcribe_candidate else None,
+                adaptive=adaptive_silence
+            ).start()
+        except Exception as e:
+            print(f"⚠️ Candidate microphone unavailable ({e}), capturing the interviewer only")
+            candidate_stream = None
     
     # Define audio recording function to run in background thread
     def audio_recording_loop():
-        # Start transcription worker thread
-        worker = threading.Thread(
-            target=transcription_worker, 
-            args=(sample_rate, channels, transcription_queue, results_queue, min_audio_duration),
-            daemon=True
-        )
-        worker.start()
+        if not transcription_engine:
+            if warm_up_thread.is_alive():
+                warm_up_thread.join()
+            
+            # Start transcription worker thread
+            worker = threading.Thread(
+                target=transcription_worker, 
+                args=(sample_rate, channels, transcription_queue, results_queue, min_audio_duration),
+                kwargs={'stats': decode_stats, 'governor': quality_governor, 'context': decoder_context},
+                daemon=True
+            )
+            worker.start()
         
         # Audio buffers
         current_chunk = []      # Current 3-second chunk being collected
         all_frames = []         # All audio for saving
         accumulated_text = []   # Text segments collected in current speech period
         
-        # Timing and state
-        last_sound_time = time.time()
-        last_process_time = time.time()
+        # Timing and state. Chunking and silence use the audio clock (seconds of
+        # audio read), so audio buffered during a stall is segmented as it was spoken
+        capture.clear()  # Audio captured while the app was starting
+        last_sound_time = 0.0
+        last_process_time = 0.0
         recording_start = time.time()
         last_status_time = time.time()
         has_sound = False
         task_counter = 0
         pending_tasks = set()  # Track which tasks are pending
+        audio_lost = 0  # Overflows and dropped frames already reported
+        noise_floor = NoiseFloor(sample_rate, 1024) if adaptive_silence else None
         
         try:
             while True:
                 # Read audio chunk
-                data = stream.read(1024, exception_on_overflow=False)
-                current_chunk.append(data)
+                data = capture.read()
+                audio_now = capture.frames_read / sample_rate
                 all_frames.append(data)
                 
                 # Convert byte data to numpy array for amplitude analysis
                 audio_data = np.frombuffer(data, dtype=np.int16)
                 max_amplitude = np.abs(audio_data).max()
+                if noise_floor:
+                    is_sound = noise_floor.update(audio_data)
+                    level, threshold = noise_floor.rms, noise_floor.threshold
+                else:
+                    is_sound = max_amplitude > silence_threshold
+                    level, threshold = max_amplitude, silence_threshold
+                
+                # The candidate's own voice played back: keep it away from Whisper
+                if candidate_stream and candidate_stream.is_echo(level, threshold):
+                    data = bytes(len(data))
+                    max_amplitude = 0
+                    is_sound = False
+                current_chunk.append(data)
                 
                 # Update last sound time if audio detected
-                if max_amplitude > silence_threshold:
-                    last_sound_time = time.time()
+                if is_sound:
+                    last_sound_time = audio_now
                     has_sound = True
+                    question_detector.on_speech()
                 
                 # Check for completed transcription results (non-blocking)
                 # Process ALL available results
@@ -174,38 +437,49 @@ try:
                         accumulated_text.append(text)
                         # Don't print individual results, just accumulate silently
                 
+                if results_collected > 0 and auto_ask_ai:
+                    # Partial question: pre-warm retrieval while it is still spoken
+                    question_detector.on_partial(" ".join(accumulated_text))
+                
                 # Show status every 2 seconds
                 if time.time() - last_status_time > 2:
                     elapsed = int(time.time() - recording_start)
                     chunk_duration = len(current_chunk) * 1024 / sample_rate
-                    silence_elapsed = time.time() - last_sound_time
+                    silence_elapsed = audio_now - last_sound_time
                     queue_size = transcription_queue.qsize()
                     pending_count = len(pending_tasks)
+                    health = capture.health()
+                    if noise_floor:
+                        health = f"{noise_floor.describe()} | {health}"
                     
                     if has_sound and silence_elapsed < silence_duration:
                         status = f"Recording... {elapsed}s | Chunk: {chunk_duration:.1f}s | Level: {max_amplitude}"
                         if len(accumulated_text) > 0:
                             status += f" | Got: {len(accumulated_text)} segments"
-                        # Update GUI
-                        transcript_window.update_status(f"Recording... | Audio level: {max_amplitude} | Segments: {len(accumulated_text)}")
+                        gui_status = f"Recording... | Audio level: {max_amplitude} | Segments: {len(accumulated_text)}"
                     elif has_sound:
                         status = f"Silence: {silence_elapsed:.1f}s / {silence_duration:.1f}s | Got: {len(accumulated_text)} segments"
-                        # Update GUI
-                        transcript_window.update_status(f"Silence detected: {silence_elapsed:.1f}s / {silence_duration:.1f}s")
+                        gui_status = f"Silence detected: {silence_elapsed:.1f}s / {silence_duration:.1f}s"
                     else:
                         status = f"Waiting... {elapsed}s | Level: {max_amplitude}"
-                        # Update GUI
-                        transcript_window.update_status(f"Waiting for audio... | Level: {max_amplitude}")
+                        gui_status = f"Waiting for audio... | Level: {max_amplitude}"
+                    # Update GUI
+                    transcript_window.update_status(f"{gui_status} | {health}")
                     
                     if queue_size > 0 or pending_count > 0:
                         status += f" | Processing: {pending_count}"
                     
-                    print(status)
+                    print(f"{status} | {health}")
+                    lost = capture.overflows + capture.dropped_frames + capture.device_dropped_frames
+                    if lost > audio_lost:
+                        print(f"[AUDIO] Audio lost since last status: {capture.stats()}")
+                        audio_lost = lost
                     last_status_time = time.time()
                 
                 # Process audio every 3 seconds (or when chunk gets too large)
-                time_since_last_process = time.time() - last_process_time
-                if time_since_last_process >= process_interval and len(current_chunk) > 0:
+                time_since_last_process = audio_now - last_process_time
+                interval = process_interval * (quality_governor.settings['interval_factor'] if quality_governor else 1)
+                if time_since_last_process >= interval and len(current_chunk) > 0:
                     chunk_duration = len(current_chunk) * 1024 / sample_rate
                     
                     if chunk_duration >= min_audio_duration:
@@ -218,10 +492,10 @@ try:
                     
                     # Reset chunk
                     current_chunk = []
-                    last_process_time = time.time()
+                    last_process_time = audio_now
                 
                 # Check for silence to print accumulated text
-                silence_time = time.time() - last_sound_time
+                silence_time = audio_now - last_sound_time
                 if silence_time > silence_duration and has_sound:
                     # Start timing latency from silence detection to text display
                     latency_start = time.time()
@@ -275,7 +549,11 @@ try:
                         # Display in GUI window
                         transcript_window.append_text(full_text)
                         transcript_window.update_status(f"Transcription complete!")
+                        log_event('segment', text=full_text, latency=round(latency, 3))
                         transcript_window.update_latency(f"{latency:.2f}s")
+                        
+                        if auto_ask_ai:
+                            question_detector.on_commit(full_text, silence_time, latency_start)
                     else:
                         latency = time.time() - latency_start
                         print(f"\n[No transcription results received - Latency: {latency:.2f}s]\n")
@@ -286,15 +564,19 @@ try:
                     accumulated_text = []
                     has_sound = False
                     pending_tasks.clear()  # Clear any stuck tasks
-                    last_sound_time = time.time()
+                    last_sound_time = audio_now
                     
         except KeyboardInterrupt:
             print("\n\nCtrl+C pressed - Stopping recording...")
         
+        print(f"\n{capture.health()}")
+        print(f"Audio capture: {capture.stats()}")
+        if transcription_engine and transcription_engine.dropped_chunks:
+            print(f"Transcription chunks dropped: {transcription_engine.dropped_chunks}")
+        
         # Stop and close stream
         print("\nStopping stream...")
-        stream.stop_stream()
-        stream.close()
+        capture.close()
         p.terminate()
         print("Stream closed.")
     
@@ -326,6 +608,7 @@ try:
             print(f">> FINAL: {full_text}")
             print(f"{'='*60}\n")
             transcript_window.append_text(f"FINAL: {full_text}")
+            log_event('segment', text=full_text, final=True)
         
         # Stop transcription worker
         transcription_queue.put(None)
@@ -341,6 +624,12 @@ try:
             wf.close()
             print(f"Saved to: {filename}")
         
+        if candidate_stream:
+            candidate_stream.stop()
+            savings = candidate_stream.decode_savings(decode_stats)
+            if savings:
+                print(savings)
+        
         print("\n=== Recording complete! ===")
         transcript_window.update_status("Recording stopped")
     
@@ -351,7 +640,23 @@ try:
     recording_thread.start()
     
     # Run GUI in main thread (required for Windows)
-    transcript_window.run()
+    clean_exit = False
+    try:
+        transcript_window.run()
+        clean_exit = True
+    finally:
+        # Flushed in every case; only a closed window ends the session (an error leaves it resumable)
+        if session:
+            session.close(ended=clean_exit)
+            print(f"Session saved to {session.path}")
+        for cache in (answer_cache, answer_bank):
+            if cache:
+                cache.close()
+    report = backend_report()
+    if report:
+        print(f"LLM backends:\n{report}")
+    if drafter:
+        print(drafter.report())
     
 except Exception as e:
     print(f"Error: {e}")
@@ -0,0 +1,137 @@
+"""
+Local OpenAI-compatible mock endpoint for exercising the LLM client offline.
+
+Streams a canned answer word by word, with per-model injected delays,
+failures and connections dropped mid-stream. Point the app at it with:
+
+    LLM_BASE_URL=http://127.0.0.1:8765/v1 python main.py
+
+Usage:
+    python mock_llm_server.py --delay mistralai/mistral-small-3.1-24b-instruct=3000 --fail google/gemini-flash-1.5
+    python mock_llm_server.py --drop openai/gpt-4o-mini=5
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_ANSWER = ("Dans mon dernier projet, j'ai conçu un **pipeline de données** "
+                  "complet, de l'ingestion jusqu'au tableau de bord.")
+
+
+class MockLLMServer:
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765,
+                 delays: dict = None, failures: set = None, drops: dict = None,
+                 answer: str = DEFAULT_ANSWER, token_delay: float = 0.01):
+        """
+        Args:
+            delays: model -> seconds to wait before the first token
+            failures: models that answer with HTTP 500
+            drops: model -> tokens streamed before the connection is dropped
+            answer: text streamed back for every request
+            token_delay: seconds between streamed tokens
+        """
+        self.delays = delays or {}
+        self.failures = failures or set()
+        self.drops = drops or {}
+        self.answer = answer
+        self.token_delay = token_delay
+        self.requests = []  # (model, payload) of every request received
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                model = payload.get('model', '')
+                server.requests.append((model, payload))
+
+                if model in server.failures:
+                    self.send_response(500)
+                    self.end_headers()
+                    self.wfile.write(b'{"error": "injected failure"}')
+                    return
+
+                time.sleep(server.delays.get(model, 0))
+
+                try:
+                    if payload.get('stream'):
+                        self._stream(model)
+                    else:
+                        body = json.dumps({
+                            "model": model,
+                            "choices": [{"message": {"role": "assistant", "content": server.answer}}],
+                            "usage": server._usage(payload)
+                        }).encode()
+                        self.send_response(200)
+                        self.send_header('Content-Type', 'application/json')
+                        self.send_header('Content-Length', str(len(body)))
+                        self.end_headers()
+                        self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    # Client cancelled the request (e.g. lost a race)
+                    pass
+
+            def _stream(self, model):
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.end_headers()
+                for i, word in enumerate(server.answer.split(' ')):
+                    if i == server.drops.get(model):
+                        return  # Connection closed without [DONE]
+                    chunk = {"model": model, "choices": [{"delta": {"content": word + ' '}}]}
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                    self.wfile.flush()
+                    time.sleep(server.token_delay)
+                final = {"model": model, "choices": [], "usage": server._usage({})}
+                self.wfile.write(f"data: {json.dumps(final)}\n\ndata: [DONE]\n\n".encode())
+                self.wfile.flush()
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.base_url = f"http://{host}:{self.httpd.server_address[1]}/v1"
+
+    def _usage(self, payload: dict) -> dict:
+        return {"prompt_tokens": 100, "completion_tokens": len(self.answer.split()),
+                "prompt_tokens_details": {"cached_tokens": 0}}
+
+    def start(self):
+        """Serve in a background thread"""
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def _parse_delays(items):
+    delays = {}
+    for item in items or []:
+        model, ms = item.rsplit('=', 1)
+        delays[model] = float(ms) / 1000
+    return delays
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mock OpenAI-compatible LLM endpoint")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", action="append", help="model=ms before the first token")
+    parser.add_argument("--fail", action="append", default=[], help="model that returns HTTP 500")
+    parser.add_argument("--drop", action="append", help="model=N: drop the connection after N tokens")
+    parser.add_argument("--token-delay", type=float, default=10, help="ms between tokens")
+    args = parser.parse_args()
+
+    server = MockLLMServer(port=args.port, delays=_parse_delays(args.delay),
+                           failures=set(args.fail),
+                           drops={model: int(n) for model, n in (item.rsplit('=', 1) for item in args.drop or [])},
+                           token_delay=args.token_delay / 1000)
+    print(f"Mock LLM server on {server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
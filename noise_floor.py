@@ -0,0 +1,101 @@
+"""
+Adaptive noise-floor tracking for speech/silence decisions.
+
+A fixed amplitude threshold fails both ways: on a noisy loopback source the
+noise alone stays above it, so silence is never detected; on a quiet one,
+breaths and clicks cross it. Here the noise floor is a low percentile of the
+per-block RMS level (dBFS) over the last FLOOR_WINDOW seconds of non-speech,
+so it follows the source as it changes but long speech cannot raise it. Only
+a level that stays above the threshold for MAX_SPEECH seconds is taken as a
+new, louder noise floor. A block starts speech when it is SPEECH_MARGIN_DB above
+the floor and at least MIN_SPEECH_DB, so on a digitally silent source a
+breath does not count. Speech continues until the level falls
+SPEECH_MARGIN_DB - RELEASE_MARGIN_DB below that threshold, so a level
+hovering around a single threshold cannot flap.
+"""
+from collections import deque
+import numpy as np
+
+# Configuration
+FLOOR_WINDOW = 15.0       # Seconds of level history the floor is estimated on
+FLOOR_PERCENTILE = 10     # Percentile of the history taken as the noise floor
+SPEECH_MARGIN_DB = 12.0   # Level above the floor that starts speech
+RELEASE_MARGIN_DB = 6.0   # Level above the floor that keeps speech going (hysteresis)
+ONSET_BLOCKS = 2          # Consecutive loud blocks needed to start speech (clicks are shorter)
+INITIAL_FLOOR_DB = -60.0  # Floor assumed before any history
+MIN_FLOOR_DB = -80.0      # Digital silence would otherwise pull the floor to -inf
+MIN_SPEECH_DB = -55.0     # Absolute level speech must reach, whatever the floor
+MAX_SPEECH = 60.0         # Seconds of unbroken "speech" after which the source got louder
+
+
+def rms_db(block: np.ndarray) -> float:
+    """RMS level of int16 samples in dBFS"""
+    if not len(block):
+        return MIN_FLOOR_DB
+    rms = np.sqrt(np.mean(np.square(block.astype(np.float32))))
+    return max(MIN_FLOOR_DB, 20 * np.log10(rms / 32768.0 + 1e-10))
+
+
+class NoiseFloor:
+    def __init__(self, sample_rate: int, block_frames: int = 1024,
+                 window: float = FLOOR_WINDOW, percentile: float = FLOOR_PERCENTILE,
+                 speech_margin: float = SPEECH_MARGIN_DB, release_margin: float = RELEASE_MARGIN_DB,
+                 onset_blocks: int = ONSET_BLOCKS, min_speech_db: float = MIN_SPEECH_DB):
+        """
+        Speech/silence detector on blocks of int16 audio: update(block) per
+        block, then read `speech`, `level_db` and `floor_db`. `rms` and
+        `threshold` are the same level and speech threshold as linear int16
+        RMS amplitudes, for comparisons with other amplitude levels.
+        """
+        self.speech_margin = speech_margin
+        self.release_margin = release_margin
+        self.percentile = percentile
+        self.onset_blocks = onset_blocks
+        self.min_speech_db = min_speech_db
+        self.history = deque(maxlen=max(1, int(window * sample_rate / block_frames)))
+        self.max_speech_blocks = int(MAX_SPEECH * sample_rate / block_frames)
+
+        self.floor_db = INITIAL_FLOOR_DB
+        self.level_db = MIN_FLOOR_DB
+        self.speech = False
+        self.loud_blocks = 0
+        self.speech_blocks = 0  # Consecutive blocks of the current speech
+        self.onsets = 0  # Silence -> speech transitions
+
+    def update(self, block: np.ndarray) -> bool:
+        """Add a block; returns True while it is speech"""
+        self.level_db = rms_db(block)
+        onset_db = self.onset_db
+
+        if self.speech:
+            self.speech = self.level_db > onset_db - (self.speech_margin - self.release_margin)
+            self.speech_blocks = self.speech_blocks + 1 if self.speech else 0
+        else:
+            self.loud_blocks = self.loud_blocks + 1 if self.level_db > onset_db else 0
+            if self.loud_blocks >= self.onset_blocks:
+                self.speech = True
+                self.onsets += 1
+                self.loud_blocks = 0
+                self.speech_blocks = 1
+
+        # The floor learns from non-speech only, unless "speech" never ends
+        if not self.speech or self.speech_blocks > self.max_speech_blocks:
+            self.history.append(self.level_db)
+            self.floor_db = float(np.percentile(self.history, self.percentile))
+        return self.speech
+
+    @property
+    def onset_db(self) -> float:
+        """Level that starts speech"""
+        return max(self.floor_db + self.speech_margin, self.min_speech_db)
+
+    @property
+    def rms(self) -> float:
+        return 32768.0 * 10 ** (self.level_db / 20)
+
+    @property
+    def threshold(self) -> float:
+        return 32768.0 * 10 ** (self.onset_db / 20)
+
+    def describe(self) -> str:
+        return f"Level {self.level_db:.0f} dB, floor {self.floor_db:.0f} dB"
@@ -0,0 +1,217 @@
+"""
+ONNX Runtime backend for the all-MiniLM-L6-v2 embedding model.
+
+Runs the exported model with onnxruntime and a `tokenizers` fast tokenizer,
+so encoding never imports torch (smaller startup time and memory). The model
+can be dynamically quantized to int8 for faster CPU inference.
+
+Usage:
+    python onnx_encoder.py --export            # needs torch + transformers, once
+    python onnx_encoder.py --export --no-quantize
+    python onnx_encoder.py --verify            # compare with the PyTorch model
+
+Runtime dependencies: pip install onnxruntime tokenizers
+"""
+from pathlib import Path
+from typing import List, Union
+import numpy as np
+
+# Configuration
+MODEL_NAME = 'sentence-transformers/all-MiniLM-L6-v2'
+ONNX_MODEL_DIR = "models/all-MiniLM-L6-v2-onnx"
+MODEL_FILE = "model.onnx"
+QUANTIZED_MODEL_FILE = "model_int8.onnx"
+MAX_SEQ_LENGTH = 256  # Same truncation as the SentenceTransformer model
+INPUT_NAMES = ['input_ids', 'attention_mask', 'token_type_ids']
+
+# Minimum cosine similarity with the PyTorch embeddings
+MIN_COSINE = {'fp32': 0.9999, 'int8': 0.98}
+
+SAMPLE_TEXTS = [
+    "Parlez-moi de votre expérience avec Kubernetes.",
+    "Tell me about a project you built with Python and FastAPI.",
+    "Quel est votre niveau d'anglais ?",
+    "## Expérience\nData Engineer chez Acme : pipelines Airflow, dbt et Snowflake, "
+    "réduction du temps de déploiement de 40 minutes à 5 minutes.",
+    "Why do you want to join our company?",
+    "Comment gérez-vous les conflits dans une équipe ?",
+]
+
+
+class FastTokenizer:
+    """
+    Wraps a `tokenizers.Tokenizer` with the call signature the Chunker uses
+    on HuggingFace tokenizers (offsets of every token, no truncation).
+    """
+    def __init__(self, tokenizer):
+        self.tokenizer = tokenizer
+
+    def __call__(self, text: str, add_special_tokens: bool = True,
+                 return_offsets_mapping: bool = False) -> dict:
+        encoding = self.tokenizer.encode(text, add_special_tokens=add_special_tokens)
+        result = {'input_ids': encoding.ids, 'attention_mask': encoding.attention_mask}
+        if return_offsets_mapping:
+            result['offset_mapping'] = encoding.offsets
+        return result
+
+
+class OnnxEncoder:
+    def __init__(self, model_dir: str = ONNX_MODEL_DIR, quantized: bool = True, threads: int = 0):
+        """
+        Drop-in replacement for SentenceTransformer.encode (mean pooling and
+        L2 normalization, like all-MiniLM-L6-v2).
+
+        Args:
+            model_dir: Directory written by export_onnx()
+            quantized: Use the int8 model instead of the fp32 one
+            threads: onnxruntime intra-op threads (0 = runtime default)
+        """
+        import onnxruntime
+        from tokenizers import Tokenizer
+
+        model_dir = Path(model_dir)
+        model_file = model_dir / (QUANTIZED_MODEL_FILE if quantized else MODEL_FILE)
+        tokenizer_file = model_dir / "tokenizer.json"
+        if not model_file.exists() or not tokenizer_file.exists():
+            raise FileNotFoundError(f"{model_file} not found, run: python onnx_encoder.py --export")
+
+        # Batch tokenizer for the model: truncated and padded per batch
+        self.batch_tokenizer = Tokenizer.from_file(str(tokenizer_file))
+        self.batch_tokenizer.enable_truncation(MAX_SEQ_LENGTH)
+        pad_id = self.batch_tokenizer.token_to_id('[PAD]') or 0
+        self.batch_tokenizer.enable_padding(pad_id=pad_id, pad_token='[PAD]')
+
+        # Untruncated tokenizer for chunking (token counts of whole sections)
+        chunk_tokenizer = Tokenizer.from_file(str(tokenizer_file))
+        chunk_tokenizer.no_truncation()
+        chunk_tokenizer.no_padding()
+        self.tokenizer = FastTokenizer(chunk_tokenizer)
+
+        options = onnxruntime.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = onnxruntime.InferenceSession(str(model_file), options,
+                                                    providers=['CPUExecutionProvider'])
+        self.input_names = {node.name for node in self.session.get_inputs()}
+        self.model_file = model_file
+        self.quantized = quantized
+
+    def encode(self, texts: Union[str, List[str]], batch_size: int = 32,
+               convert_to_numpy: bool = True, show_progress_bar: bool = False) -> np.ndarray:
+        """Normalized sentence embeddings, one row per text"""
+        single = isinstance(texts, str)
+        if single:
+            texts = [texts]
+
+        # Encode texts of similar length together to minimize padding
+        order = np.argsort([len(text) for text in texts])
+        embeddings = np.zeros((len(texts), 0), dtype=np.float32)
+        for start in range(0, len(texts), batch_size):
+            batch = order[start:start + batch_size]
+            encodings = self.batch_tokenizer.encode_batch([texts[i] for i in batch])
+            input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+            attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+            feed = {
+                'input_ids': input_ids,
+                'attention_mask': attention_mask,
+                'token_type_ids': np.zeros_like(input_ids),
+            }
+            hidden = self.session.run(None, {k: v for k, v in feed.items() if k in self.input_names})[0]
+
+            # Mean pooling over real tokens, then L2 normalization
+            mask = attention_mask[..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+
+            if embeddings.shape[1] == 0:
+                embeddings = np.zeros((len(texts), pooled.shape[1]), dtype=np.float32)
+            embeddings[batch] = pooled
+
+        return embeddings[0] if single else embeddings
+
+
+def export_onnx(output_dir: str = ONNX_MODEL_DIR, quantize: bool = True) -> Path:
+    """Export MiniLM to ONNX (and an int8 copy); only this step needs torch"""
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
+    tokenizer.save_pretrained(str(output_dir))  # Writes tokenizer.json (fast tokenizer)
+    model = AutoModel.from_pretrained(MODEL_NAME).eval()
+
+    class HiddenStates(torch.nn.Module):
+        """Return the last hidden state only (pooling is done in numpy)"""
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, input_ids, attention_mask, token_type_ids):
+            return self.model(input_ids=input_ids, attention_mask=attention_mask,
+                              token_type_ids=token_type_ids)[0]
+
+    sample = tokenizer(SAMPLE_TEXTS[:2], padding=True, return_tensors='pt')
+    dynamic_axes = {name: {0: 'batch', 1: 'sequence'} for name in INPUT_NAMES + ['last_hidden_state']}
+    model_file = output_dir / MODEL_FILE
+    print(f">>> Exporting {MODEL_NAME} to {model_file}...")
+    with torch.no_grad():
+        torch.onnx.export(HiddenStates(model), tuple(sample[name] for name in INPUT_NAMES),
+                          str(model_file), input_names=INPUT_NAMES,
+                          output_names=['last_hidden_state'], dynamic_axes=dynamic_axes,
+                          opset_version=14)
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        quantized_file = output_dir / QUANTIZED_MODEL_FILE
+        print(f">>> Quantizing to int8: {quantized_file}...")
+        quantize_dynamic(str(model_file), str(quantized_file), weight_type=QuantType.QInt8)
+
+    print(f"[POSITIVE] ONNX model exported to {output_dir}")
+    return output_dir
+
+
+def compare_with_torch(texts: List[str] = SAMPLE_TEXTS, model_dir: str = ONNX_MODEL_DIR,
+                       quantized: bool = True) -> dict:
+    """Cosine similarity and max difference between ONNX and PyTorch embeddings"""
+    from sentence_transformers import SentenceTransformer
+
+    reference = SentenceTransformer('all-MiniLM-L6-v2').encode(texts, convert_to_numpy=True)
+    candidate = OnnxEncoder(model_dir, quantized=quantized).encode(texts)
+    cosines = (reference * candidate).sum(axis=1) / (
+        np.linalg.norm(reference, axis=1) * np.linalg.norm(candidate, axis=1)
+    )
+    precision = 'int8' if quantized else 'fp32'
+    return {
+        'precision': precision,
+        'min_cosine': float(cosines.min()),
+        'max_abs_diff': float(np.abs(reference - candidate).max()),
+        'passed': bool(cosines.min() >= MIN_COSINE[precision]),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export and check the ONNX embedding model")
+    parser.add_argument("--export", action="store_true", help="Export the model (needs torch)")
+    parser.add_argument("--no-quantize", action="store_true", help="Skip the int8 model")
+    parser.add_argument("--verify", action="store_true", help="Compare with the PyTorch model")
+    parser.add_argument("--model-dir", default=ONNX_MODEL_DIR)
+    args = parser.parse_args()
+
+    if args.export:
+        export_onnx(args.model_dir, quantize=not args.no_quantize)
+    if args.verify:
+        failed = False
+        for quantized in ([False] if args.no_quantize else [False, True]):
+            result = compare_with_torch(model_dir=args.model_dir, quantized=quantized)
+            status = "[POSITIVE]" if result['passed'] else "[NEGATIVE]"
+            print(f"{status} {result['precision']}: min cosine {result['min_cosine']:.5f} "
+                  f"(>= {MIN_COSINE[result['precision']]}), max abs diff {result['max_abs_diff']:.5f}")
+            failed |= not result['passed']
+        if failed:
+            raise SystemExit(1)
+    if not (args.export or args.verify):
+        parser.print_help()
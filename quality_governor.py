@@ -0,0 +1,107 @@
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+# Configuration
+TARGET_LATENCY = 2.0     # Seconds from a chunk being queued to its text
+RTF_HIGH = 0.8           # Degrade above this real-time factor...
+RTF_LOW = 0.4            # ...recover below this one (hysteresis)
+QUEUE_HIGH = 2           # Degrade when this many chunks wait
+WINDOW = 6               # Recent decodes considered
+COOLDOWN = 3             # Decodes between two decisions
+RECOVER_MARGIN = 0.75    # Recover only when latency is this far under target
+
+# Quality levels, best first. Lower levels trade accuracy for speed:
+# narrower beam, no temperature fallback, longer chunks (interval_factor times
+# main.py's process_interval, less per-decode overhead), then a smaller model.
+LEVELS = [
+    {'beam_size': 5, 'temperature': (0.0, 0.2, 0.4, 0.6, 0.8, 1.0), 'interval_factor': 1.0, 'model': 'main'},
+    {'beam_size': 3, 'temperature': (0.0, 0.4, 0.8), 'interval_factor': 1.0, 'model': 'main'},
+    {'beam_size': 1, 'temperature': 0.0, 'interval_factor': 1.0, 'model': 'main'},
+    {'beam_size': 1, 'temperature': 0.0, 'interval_factor': 1.7, 'model': 'main'},
+    {'beam_size': 1, 'temperature': 0.0, 'interval_factor': 1.7, 'model': 'fallback'},
+]
+
+
+class QualityGovernor:
+    def __init__(self, target_latency: float = TARGET_LATENCY, levels: List[Dict] = None,
+                 verbose: bool = True):
+        """
+        Adjusts the transcription settings to hold a target latency.
+
+        Fed after every decode (one chunk or a batch of chunks) with its audio
+        duration, decode time, the queue depth left behind and the number of
+        chunks decoded. The estimated latency of the next chunk is the backlog
+        ahead of it plus its own decode, at the recent decode time per chunk. The governor steps down
+        one level when that estimate or the real-time factor is too high or
+        the queue keeps growing. It steps back up once the recent decodes are
+        comfortably fast with an empty queue. Every decision is logged and
+        kept in `decisions`.
+        """
+        self.target_latency = target_latency
+        self.levels = levels or LEVELS
+        self.verbose = verbose
+        self.level = 0
+        self.recent = deque(maxlen=WINDOW)  # (audio_seconds, decode_seconds, queue_depth, chunks)
+        self.since_change = 0
+        self.decisions = []
+        self.lock = threading.Lock()
+
+    @property
+    def settings(self) -> Dict:
+        return self.levels[self.level]
+
+    def rtf(self) -> float:
+        audio = sum(a for a, _, _, _ in self.recent)
+        return sum(d for _, d, _, _ in self.recent) / audio if audio else 0.0
+
+    def estimated_latency(self) -> float:
+        """Queue wait plus decode time of the next chunk at the current pace"""
+        if not self.recent:
+            return 0.0
+        per_chunk = sum(d for _, d, _, _ in self.recent) / sum(c for _, _, _, c in self.recent)
+        return (self.recent[-1][2] + 1) * per_chunk
+
+    def record(self, audio_seconds: float, decode_seconds: float, queue_depth: int,
+               chunks: int = 1) -> Optional[Dict]:
+        """Account one decode of `chunks` chunks; returns the new settings if the level changed"""
+        with self.lock:
+            self.recent.append((audio_seconds, decode_seconds, queue_depth, max(1, chunks)))
+            self.since_change += 1
+            if self.since_change < COOLDOWN:
+                return None
+
+            rtf = self.rtf()
+            latency = self.estimated_latency()
+            depths = [q for _, _, q, _ in self.recent]
+            growing = queue_depth >= QUEUE_HIGH and depths[-1] >= depths[0]
+
+            if (latency > self.target_latency or rtf > RTF_HIGH or growing) \
+                    and self.level < len(self.levels) - 1:
+                reason = (f"latency {latency:.2f}s > {self.target_latency:.2f}s" if latency > self.target_latency
+                          else f"RTF {rtf:.2f} > {RTF_HIGH}" if rtf > RTF_HIGH
+                          else f"queue {queue_depth} growing")
+                return self._change(self.level + 1, reason, rtf, latency, queue_depth)
+
+            if self.level > 0 and rtf < RTF_LOW and max(depths) == 0 \
+                    and latency < RECOVER_MARGIN * self.target_latency:
+                return self._change(self.level - 1, f"RTF {rtf:.2f} < {RTF_LOW}, queue empty",
+                                    rtf, latency, queue_depth)
+            return None
+
+    def _change(self, level: int, reason: str, rtf: float, latency: float, queue_depth: int) -> Dict:
+        decision = {
+            'time': time.time(), 'from': self.level, 'to': level, 'reason': reason,
+            'rtf': rtf, 'latency': latency, 'queue': queue_depth,
+        }
+        self.decisions.append(decision)
+        if self.verbose:
+            direction = "Degrading" if level > self.level else "Recovering"
+            settings = self.levels[level]
+            print(f"[GOVERNOR] {direction} to level {level} ({reason}): beam {settings['beam_size']}, "
+                  f"chunks x{settings['interval_factor']}, model {settings['model']}")
+        self.level = level
+        self.since_change = 0
+        self.recent.clear()  # Judge the new level on its own decodes
+        return self.settings
@@ -0,0 +1,152 @@
+import re
+import threading
+import time
+from typing import Callable, Optional
+
+# Configuration
+QUESTION_THRESHOLD = 0.6  # Score needed to trigger the AI automatically
+TRIGGER_DELAY = 0.8       # Seconds to wait after a committed segment before firing
+MIN_QUESTION_WORDS = 3    # Ignore very short segments ("ok", "merci")
+LONG_PAUSE = 1.5          # A pause this long ends the interviewer's turn on its own
+
+# Interrogative cues (French and English), matched at the start of a sentence
+INTERROGATIVE_STARTS = re.compile(
+    r"^(qui|que|quoi|qu'est-ce|quel|quelle|quels|quelles|comment|pourquoi|où|quand|combien|"
+    r"est-ce|pouvez-vous|pourriez-vous|avez-vous|êtes-vous|parlez-moi|racontez-moi|"
+    r"décrivez|expliquez|présentez-vous|donnez-moi|"
+    r"what|why|how|when|where|who|which|can you|could you|would you|do you|did you|"
+    r"have you|are you|tell me|describe|explain|walk me through)\b",
+    re.IGNORECASE
+)
+INTERROGATIVE_ANYWHERE = re.compile(
+    r"\b(est-ce que|pourquoi|comment|tell me about|parlez-moi de|what about)\b",
+    re.IGNORECASE
+)
+
+
+class QuestionDetector:
+    def __init__(self, on_question: Callable[[str, float], None],
+                 on_prewarm: Optional[Callable[[str], None]] = None,
+                 classifier: Optional[Callable[[str], float]] = None,
+                 threshold: float = QUESTION_THRESHOLD,
+                 trigger_delay: float = TRIGGER_DELAY):
+        """
+        Detect the end of an interviewer's question on committed transcript
+        segments and fire the AI without a button click.
+
+        Args:
+            on_question: Called with (question_text, committed_at) when a question ends
+            on_prewarm: Called with partial question text while it is being spoken
+            classifier: Optional local model returning a question probability
+        """
+        self.on_question = on_question
+        self.on_prewarm = on_prewarm
+        self.classifier = classifier
+        self.threshold = threshold
+        self.trigger_delay = trigger_delay
+
+        self.lock = threading.Lock()
+        self.segments = []          # Committed segments of the current turn
+        self.committed_at = None    # When the first segment of the turn was committed
+        self.timer = None           # Pending (debounced) trigger
+        self.last_prewarm = ""
+
+        # Click-free latencies (commit -> answer displayed), in seconds
+        self.latencies = []
+
+    def score(self, text: str, pause: float = 0.0) -> float:
+        """Probability-like score that `text` is a finished question"""
+        text = text.strip()
+        if len(text.split()) < MIN_QUESTION_WORDS:
+            return 0.0
+
+        last_sentence = re.split(r'(?<=[.!?])\s+', text)[-1]
+        score = 0.0
+        if text.endswith('?'):
+            score = max(score, 0.9)
+        if INTERROGATIVE_STARTS.match(last_sentence):
+            score = max(score, 0.75)
+        if INTERROGATIVE_ANYWHERE.search(text):
+            score = max(score, 0.6)
+        if self.classifier:
+            try:
+                score = max(score, float(self.classifier(text)))
+            except Exception as e:
+                print(f"[DETECT] Classifier error: {e}")
+        if pause >= LONG_PAUSE:
+            score = min(1.0, score + 0.2)
+        return score
+
+    def on_partial(self, text: str):
+        """New (not yet committed) transcription text of the current question"""
+        if not self.on_prewarm or len(text.split()) < MIN_QUESTION_WORDS:
+            return
+        if text == self.last_prewarm:
+            return
+        self.last_prewarm = text
+        threading.Thread(target=self.on_prewarm, args=(text,), daemon=True).start()
+
+    def on_speech(self):
+        """Interviewer is speaking again: cancel a pending trigger (turn not over)"""
+        with self.lock:
+            if self.timer:
+                self.timer.cancel()
+                self.timer = None
+
+    def on_commit(self, text: str, pause: float, committed_at: float = None):
+        """
+        A segment was committed after `pause` seconds of silence. A turn that
+        only scores as a question after a long pause is re-scored when the
+        silence reaches LONG_PAUSE, unless on_speech() comes first.
+        """
+        with self.lock:
+            if not self.segments:
+                self.committed_at = committed_at or time.time()
+            self.segments.append(text)
+            turn_text = " ".join(self.segments)
+
+            # Debounce: a new commit supersedes the pending trigger
+            if self.timer:
+                self.timer.cancel()
+                self.timer = None
+
+            delay = self.trigger_delay
+            score = self.score(turn_text, pause)
+            if score < self.threshold:
+                if pause >= LONG_PAUSE:
+                    return
+                score = self.score(turn_text, LONG_PAUSE)
+                if score < self.threshold:
+                    return
+                delay = max(delay, LONG_PAUSE - pause)
+
+            print(f"[DETECT] Question detected (score {score:.2f}), asking AI in {delay:.1f}s")
+            self.timer = threading.Timer(delay, self._fire)
+            self.timer.daemon = True
+            self.timer.start()
+
+    def _fire(self):
+        with self.lock:
+            question = " ".join(self.segments)
+            committed_at = self.committed_at
+            self.segments = []
+            self.committed_at = None
+            self.timer = None
+            self.last_prewarm = ""
+        self.on_question(question, committed_at)
+
+    def reset(self):
+        """Forget the current turn (e.g. the user asked the AI manually)"""
+        with self.lock:
+            if self.timer:
+                self.timer.cancel()
+            self.timer = None
+            self.segments = []
+            self.committed_at = None
+            self.last_prewarm = ""
+
+    def record_latency(self, seconds: float):
+        """Record a click-free end-to-end latency and return the running median"""
+        self.latencies.append(seconds)
+        ordered = sorted(self.latencies)
+        return ordered[len(ordered) // 2]
@@ -1,9 +1,73 @@
 import json
 import pickle
+import re
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 from pathlib import Path
-from typing import List, Tuple, Dict
+from typing import Callable, Dict, List, Optional, Tuple
 import numpy as np
+from bm25 import BM25Index
+from document_loader import Chunker, SUPPORTED_EXTENSIONS
+from index_builder import IndexBuilder
+
+# Embedding backend: "torch" (SentenceTransformer) or "onnx" (onnxruntime, no torch
+# import; export the model first with: python onnx_encoder.py --export)
+EMBEDDING_BACKEND = "torch"
+EMBEDDING_MODEL = 'all-MiniLM-L6-v2'  # torch backend (the ONNX export is of the same model)
+ONNX_QUANTIZED = True      # int8 model for the onnx backend
+
+# Retrieval configuration
+RETRIEVAL_MODE = "hybrid"  # "dense" (embeddings only) or "hybrid" (BM25 + embeddings, RRF)
+RRF_K = 60                 # Reciprocal rank fusion constant
+
+# Optional cross-encoder re-ranking of the retrieved candidates
+RERANK = False
+RERANK_MODEL = 'cross-encoder/mmarco-mMiniLMv2-L12-H384-v1'  # Multilingual (FR/EN)
+# Faster, English only: 'cross-encoder/ms-marco-MiniLM-L-6-v2'
+RERANK_CANDIDATES = 10     # Chunks retrieved before re-ranking down to top_k
+RERANK_BUDGET_MS = 150     # Hard latency budget for the re-rank stage
+
+# Document-type weighting (types come from _get_document_type)
+QUERY_TYPE_BOOSTS = True   # Boost the types a question is about (see infer_type_boosts)
+TYPE_BOOST = 1.2           # Ranking multiplier of a boosted type
+REQUIRED_TYPES = {}        # Minimum chunks per type in every context, e.g. {'cv': 1}
+TYPE_CUES = [
+    ('projects', re.compile(r'\b(projets?|projects?|built|construit|réalisé|développé|developed|portfolio)\b', re.I)),
+    ('experiences', re.compile(r'\b(expériences?|experiences?|stages?|internships?|'
+                               r'entreprises?|company|companies|conflits?|conflicts?|challenges?|défis?)\b', re.I)),
+    ('cv', re.compile(r'\b(formation|études|diplômes?|degrees?|education|compétences|skills|'
+                      r'langues|languages|certifications?)\b', re.I)),
+]
+
+
+def infer_type_boosts(query: str) -> Dict[str, float]:
+    """Per-type ranking boosts for the document types a question mentions"""
+    return {doc_type: TYPE_BOOST for doc_type, pattern in TYPE_CUES if pattern.search(query)}
+
+
+def guarantee_types(items: list, type_of: Callable, k: int, min_per_type: Dict[str, int]) -> list:
+    """
+    First k of the ranked `items`, with lower-ranked items promoted so that
+    every type in `min_per_type` appears at least that many times (when
+    available). The lowest-ranked items no guarantee depends on make room.
+    """
+    selected = list(items[:k])
+    for doc_type, count in min_per_type.items():
+        missing = count - sum(type_of(item) == doc_type for item in selected)
+        extra = [item for item in items[k:] if type_of(item) == doc_type][:max(missing, 0)]
+        for item in extra:
+            for j in range(len(selected) - 1, -1, -1):
+                selected_type = type_of(selected[j])
+                if sum(type_of(s) == selected_type for s in selected) > min_per_type.get(selected_type, 0):
+                    del selected[j]
+                    break
+            else:
+                break  # Every slot is required by a guarantee
+            selected.append(item)
+    position = {id(item): i for i, item in enumerate(items)}
+    return sorted(selected, key=lambda item: position[id(item)])
+
 
 class RAGSystem:
     def __init__(self, documents_dir: str = "documents", embeddings_dir: str = "embeddings"):
@@ -22,15 +86,45 @@ class RAGSystem:
         self.document_chunks = []
         self.embeddings = None
         self.metadata = []
+        self.bm25 = None
+        self._candidate_profile = None
+        self._partitions = None  # (embeddings, per-type partitions) of the last index seen
+        self._chunk_rows = None  # (embeddings, chunk text -> row) of the last index seen
+        
+        # Files the index was built from (name -> [size, mtime_ns])
+        self.indexed_files = {}
+        # Guards swapping chunks/metadata/embeddings/bm25 as one unit
+        self.index_lock = threading.Lock()
+        
+        # Re-ranking stage (loaded on demand)
+        self.reranker = None
+        self._rerank_executor = ThreadPoolExecutor(max_workers=1)
+        self._rerank_future = None
+        self.rerank_ms_per_pair = None  # Moving average, used to predict the cost
+        self.last_timings = {}
         
         print(">>> Initializing RAG system...")
         
-    def load_model(self):
+    def load_model(self, backend: str = None):
         """Load the sentence transformer model (lightweight and fast)"""
+        if (backend or EMBEDDING_BACKEND) == "onnx":
+            try:
+                from onnx_encoder import OnnxEncoder
+                print(">>> Loading ONNX embedding model...")
+                self.model = OnnxEncoder(quantized=ONNX_QUANTIZED)
+                print(f"[POSITIVE] ONNX embedding model loaded ({'int8' if ONNX_QUANTIZED else 'fp32'})!")
+                return True
+            except ImportError:
+                print("[NEGATIVE] onnxruntime or tokenizers not installed!")
+                print("           Run: pip install onnxruntime tokenizers")
+            except Exception as e:
+                print(f"[NEGATIVE] Error loading ONNX model: {e}")
+            print(">>> Falling back to the PyTorch model")
+        
         try:
             from sentence_transformers import SentenceTransformer
             print(">>> Loading embedding model...")
-            self.model = SentenceTransformer('all-MiniLM-L6-v2')
+            self.model = SentenceTransformer(EMBEDDING_MODEL)
             print("[POSITIVE] Embedding model loaded!")
             return True
         except ImportError:
@@ -41,10 +135,25 @@ class RAGSystem:
             print(f"[NEGATIVE] Error loading model: {e}")
             return False
     
+    def load_reranker(self) -> bool:
+        """Load the cross-encoder used to re-rank retrieved chunks"""
+        if self.reranker is not None:
+            return True
+        try:
+            from sentence_transformers import CrossEncoder
+            print(">>> Loading re-ranking model...")
+            self.reranker = CrossEncoder(RERANK_MODEL)
+            print("[POSITIVE] Re-ranking model loaded!")
+            return True
+        except Exception as e:
+            print(f"[NEGATIVE] Could not load re-ranking model, re-ranking disabled: {e}")
+            self.reranker = False
+            return False
+    
     def load_documents(self) -> bool:
         """
         Load and chunk all documents from the documents directory.
-        Supports: .txt, .md files (PDF/DOCX support can be added)
+        Supports: .txt, .md, .html (built in), .pdf (pypdf), .docx (python-docx)
         """
         print(f">>> Loading documents from {self.documents_dir}...")
         
@@ -55,41 +164,25 @@ class RAGSystem:
         all_chunks = []
         all_metadata = []
         
-        for file_path in self.documents_dir.glob("*.txt"):
-            print(f"   Reading {file_path.name}...")
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                # Split into chunks (by sections marked with ##)
-                chunks = self._chunk_document(content, file_path.name)
-                all_chunks.extend(chunks)
-                
-                # Store metadata for each chunk
-                for chunk in chunks:
-                    all_metadata.append({
-                        'source': file_path.name,
-                        'type': self._get_document_type(file_path.name)
-                    })
-                
-                print(f"      [POSITIVE] Loaded {len(chunks)} chunks from {file_path.name}")
-            except Exception as e:
-                print(f"      [NEGATIVE] Error reading {file_path.name}: {e}")
+        files = sorted(
+            file_path for file_path in self.documents_dir.iterdir()
+            if file_path.is_file() and file_path.suffix.lower() in SUPPORTED_EXTENSIONS
+        )
         
-        # Also support markdown files
-        for file_path in self.documents_dir.glob("*.md"):
+        for file_path in files:
             print(f"   Reading {file_path.name}...")
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                chunks = self._chunk_document(content, file_path.name)
-                all_chunks.extend(chunks)
+                chunks = self._chunk_document(file_path)
                 
+                # Store metadata for each chunk
                 for chunk in chunks:
+                    all_chunks.append(chunk['text'])
                     all_metadata.append({
                         'source': file_path.name,
-                        'type': self._get_document_type(file_path.name)
+                        'type': self._get_document_type(file_path.name),
+                        'header': chunk['header'],
+                        'start': chunk['start'],
+                        'end': chunk['end']
                     })
                 
                 print(f"      [POSITIVE] Loaded {len(chunks)} chunks from {file_path.name}")
@@ -102,46 +195,21 @@ class RAGSystem:
         
         self.document_chunks = all_chunks
         self.metadata = all_metadata
-        print(f"[POSITIVE] Loaded {len(all_chunks)} total chunks from {len(list(self.documents_dir.glob('*.txt')) + list(self.documents_dir.glob('*.md')))} files")
+        print(f"[POSITIVE] Loaded {len(all_chunks)} total chunks from {len(files)} files")
         return True
     
-    def _chunk_document(self, content: str) -> List[str]:
+    def _chunk_document(self, file_path: Path) -> List[Dict]:
         """
-        Split document into semantic chunks.
-        Uses headers (##) as natural boundaries.
-        """
-        chunks = []
-        
-        # Split by headers (## or #)
-        lines = content.split('\n')
-        current_chunk = []
-        
-        for line in lines:
-            # Check if it's a header
-            if line.startswith('##') or line.startswith('#'):
-                # Save previous chunk if it exists
-                if current_chunk:
-                    chunk_text = '\n'.join(current_chunk).strip()
-                    if chunk_text and len(chunk_text) > 20:  # Minimum chunk size
-                        chunks.append(chunk_text)
-                
-                # Start new chunk with header
-                current_chunk = [line]
-            else:
-                current_chunk.append(line)
-        
-        # Add the last chunk
-        if current_chunk:
-            chunk_text = '\n'.join(current_chunk).strip()
-            if chunk_text and len(chunk_text) > 20:
-                chunks.append(chunk_text)
+        Split a document into chunks.
+        Uses headers (#, ##) as natural boundaries, then a sliding window of
+        CHUNK_TOKENS model tokens with CHUNK_OVERLAP overlap for long sections.
         
-        # If no headers found, split by paragraph (double newline)
-        if not chunks:
-            paragraphs = content.split('\n\n')
-            chunks = [p.strip() for p in paragraphs if p.strip() and len(p.strip()) > 20]
-        
-        return chunks
+        Returns:
+            List of dicts with the chunk text, its section header and the
+            start/end character offsets of the chunk in the extracted text
+        """
+        tokenizer = getattr(self.model, 'tokenizer', None) if self.model else None
+        return Chunker(tokenizer=tokenizer).chunk_file(file_path)
     
     def _get_document_type(self, filename: str) -> str:
         """Determine document type from filename"""
@@ -176,6 +244,9 @@ class RAGSystem:
                 convert_to_numpy=True
             )
             
+            # Build the keyword index alongside the embeddings
+            self.bm25 = self.build_keyword_index()
+            
             elapsed = time.time() - start_time
             print(f"[POSITIVE] Created embeddings in {elapsed:.2f}s")
             
@@ -187,17 +258,26 @@ class RAGSystem:
             print(f"[NEGATIVE] Error creating embeddings: {e}")
             return False
     
+    def build_keyword_index(self) -> BM25Index:
+        """Build the BM25 index over the current chunks"""
+        return BM25Index().build(self.document_chunks)
+    
     def _save_embeddings(self):
         """Save embeddings and metadata to disk"""
         try:
             embeddings_file = self.embeddings_dir / "embeddings.pkl"
             metadata_file = self.embeddings_dir / "metadata.json"
             chunks_file = self.embeddings_dir / "chunks.json"
+            bm25_file = self.embeddings_dir / "bm25.pkl"
             
             # Save embeddings
             with open(embeddings_file, 'wb') as f:
                 pickle.dump(self.embeddings, f)
             
+            # Save keyword index
+            with open(bm25_file, 'wb') as f:
+                pickle.dump(self.bm25, f)
+            
             # Save metadata
             with open(metadata_file, 'w', encoding='utf-8') as f:
                 json.dump(self.metadata, f, indent=2)
@@ -205,6 +285,14 @@ class RAGSystem:
             # Save chunks
             with open(chunks_file, 'w', encoding='utf-8') as f:
                 json.dump(self.document_chunks, f, indent=2, ensure_ascii=False)
+            
+            # Save the state of the indexed files (used to detect changes)
+            with open(self.embeddings_dir / "files.json", 'w', encoding='utf-8') as f:
+                json.dump(self.indexed_files, f, indent=2)
+            
+            # Save the embedding model the vectors come from
+            with open(self.embeddings_dir / "model.json", 'w', encoding='utf-8') as f:
+                json.dump({'fingerprint': self.model_fingerprint()}, f)
 
             print(f"[POSITIVE] Saved embeddings to {self.embeddings_dir}")
         except Exception as e:
@@ -221,6 +309,17 @@ class RAGSystem:
                 print(">>> No cached embeddings found, will create new ones")
                 return False
             
+            # Vectors of another backend, model or quantization are not comparable
+            # (older caches are trusted as current)
+            model_file = self.embeddings_dir / "model.json"
+            if model_file.exists():
+                with open(model_file, 'r', encoding='utf-8') as f:
+                    cached_model = json.load(f).get('fingerprint')
+                if cached_model != self.model_fingerprint():
+                    print(f">>> Embedding model changed ({cached_model} -> {self.model_fingerprint()}), "
+                          f"will create new embeddings")
+                    return False
+            
             print(">>> Loading cached embeddings...")
             
             # Load embeddings
@@ -235,62 +334,379 @@ class RAGSystem:
             with open(chunks_file, 'r', encoding='utf-8') as f:
                 self.document_chunks = json.load(f)
             
+            # Load keyword index (rebuilt for caches created before it existed
+            # or with an older tokenization)
+            bm25_file = self.embeddings_dir / "bm25.pkl"
+            if bm25_file.exists():
+                with open(bm25_file, 'rb') as f:
+                    self.bm25 = pickle.load(f)
+            if getattr(self.bm25, 'version', None) != BM25Index.VERSION:
+                self.bm25 = self.build_keyword_index()
+            
+            # Load the indexed files state (older caches are trusted as current)
+            files_file = self.embeddings_dir / "files.json"
+            if files_file.exists():
+                with open(files_file, 'r', encoding='utf-8') as f:
+                    self.indexed_files = json.load(f)
+            else:
+                self.indexed_files = self.file_states()
+            
             print(f"[POSITIVE] Loaded {len(self.document_chunks)} chunks from cache")
             return True
         except Exception as e:
             print(f"[NEGATIVE] Could not load cached embeddings: {e}")
             return False
     
-    def retrieve(self, query: str, top_k: int = 3) -> List[Tuple[str, Dict, float]]:
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Encode texts with the embedding model (one row per text)"""
+        return self.model.encode(texts, convert_to_numpy=True)
+    
+    def file_states(self) -> Dict[str, list]:
+        """Current [size, mtime_ns] of every supported document"""
+        states = {}
+        if self.documents_dir.exists():
+            for file_path in self.documents_dir.iterdir():
+                if file_path.is_file() and file_path.suffix.lower() in SUPPORTED_EXTENSIONS:
+                    stat = file_path.stat()
+                    states[file_path.name] = [stat.st_size, stat.st_mtime_ns]
+        return states
+    
+    def snapshot(self):
+        """Consistent (chunks, metadata, embeddings, bm25) of the current index"""
+        with self.index_lock:
+            return self.document_chunks, self.metadata, self.embeddings, self.bm25
+    
+    def swap_index(self, chunks: List[str], metadata: List[Dict], embeddings: np.ndarray, bm25):
+        """Atomically replace the index used by retrieve()"""
+        with self.index_lock:
+            self.document_chunks = chunks
+            self.metadata = metadata
+            self.embeddings = embeddings
+            self.bm25 = bm25
+            self._candidate_profile = None
+    
+    def type_partitions(self, metadata: List[Dict], embeddings: np.ndarray) -> Dict[str, tuple]:
+        """
+        Per-type (rows, embeddings, norms) of an index, so a filtered search
+        only scans the rows of the requested types. Computed once per index
+        version (keyed on the embeddings array, replaced on every swap).
+        """
+        cached = self._partitions
+        if cached is not None and cached[0] is embeddings:
+            return cached[1]
+        
+        rows_by_type = {}
+        for i, meta in enumerate(metadata):
+            rows_by_type.setdefault(meta.get('type', 'general'), []).append(i)
+        partitions = {}
+        for doc_type, rows in rows_by_type.items():
+            rows = np.array(rows)
+            matrix = np.ascontiguousarray(embeddings[rows])
+            partitions[doc_type] = (rows, matrix, np.linalg.norm(matrix, axis=1))
+        self._partitions = (embeddings, partitions)
+        return partitions
+    
+    def chunk_embeddings(self, chunks: List[str]) -> Dict[str, np.ndarray]:
+        """Stored embeddings of indexed chunks (by text), without re-encoding"""
+        with self.index_lock:
+            document_chunks, embeddings = self.document_chunks, self.embeddings
+            rows = self._chunk_rows
+            if rows is None or rows[0] is not embeddings:
+                rows = (embeddings, {text: i for i, text in enumerate(document_chunks)})
+                self._chunk_rows = rows
+        return {text: embeddings[rows[1][text]] for text in chunks if text in rows[1]}
+    
+    def update_files(self, changed: List[str], removed: List[str]) -> bool:
+        """
+        Re-index only the given files: re-chunk and re-encode added or
+        modified ones, drop removed ones, then swap the new index in.
+        retrieve() keeps serving the old index until the swap.
+        """
+        start_time = time.time()
+        chunks, metadata, embeddings, _ = self.snapshot()
+        states = self.file_states()
+        
+        added_chunks = []
+        added_metadata = []
+        failed = set()
+        for name in changed:
+            file_path = self.documents_dir / name
+            try:
+                file_chunks = [{
+                    'text': chunk['text'],
+                    'meta': {
+                        'source': name,
+                        'type': self._get_document_type(name),
+                        'header': chunk['header'],
+                        'start': chunk['start'],
+                        'end': chunk['end']
+                    }
+                } for chunk in self._chunk_document(file_path)]
+            except Exception as e:
+                # Keep its previous rows; its new state is still recorded so it
+                # is retried only when the file changes again
+                print(f"[NEGATIVE] Error re-indexing {name}: {e}")
+                failed.add(name)
+                continue
+            added_chunks += [chunk['text'] for chunk in file_chunks]
+            added_metadata += [chunk['meta'] for chunk in file_chunks]
+        
+        # Keep the rows of untouched files (and of files that failed to re-chunk)
+        stale = (set(changed) - failed) | set(removed)
+        keep = [i for i, meta in enumerate(metadata) if meta.get('source') not in stale]
+        new_chunks = [chunks[i] for i in keep]
+        new_metadata = [metadata[i] for i in keep]
+        
+        if embeddings is not None and len(keep):
+            new_embeddings = embeddings[keep]
+        else:
+            new_embeddings = None
+        if added_chunks:
+            added_embeddings = np.asarray(self.encode(added_chunks), dtype=np.float32)
+            if new_embeddings is None:
+                new_embeddings = added_embeddings
+            else:
+                new_embeddings = np.vstack([new_embeddings, added_embeddings])
+        
+        new_chunks += added_chunks
+        new_metadata += added_metadata
+        bm25 = BM25Index().build(new_chunks)
+        
+        self.swap_index(new_chunks, new_metadata, new_embeddings, bm25)
+        self.indexed_files = {name: state for name, state in states.items()
+                              if name not in removed}
+        self._save_embeddings()
+        
+        elapsed = time.time() - start_time
+        print(f"[POSITIVE] Re-indexed {len(changed)} changed / {len(removed)} removed files "
+              f"({len(added_chunks)} new chunks) in {elapsed:.2f}s")
+        return True
+    
+    def model_fingerprint(self) -> str:
+        """Embedding backend and model (for ONNX, the model file and so its quantization)"""
+        model_file = getattr(self.model, 'model_file', None)
+        if model_file is not None:
+            stat = model_file.stat()
+            return f"onnx:{model_file.name}:{stat.st_size}:{stat.st_mtime_ns}"
+        return f"torch:{EMBEDDING_MODEL}"
+    
+    def cache_fingerprint(self) -> str:
+        """
+        Fingerprint of everything cached answers depend on: the documents and
+        the embedding model their question vectors come from.
+        """
+        return f"{self.documents_fingerprint()}:{self.model_fingerprint()}"
+    
+    def documents_fingerprint(self) -> str:
+        """
+        Fingerprint of the documents directory (names, sizes, mtimes).
+        Changes whenever a document is added, edited or removed.
+        """
+        import hashlib
+        
+        digest = hashlib.sha1()
+        if self.documents_dir.exists():
+            for file_path in sorted(self.documents_dir.iterdir()):
+                if file_path.is_file():
+                    stat = file_path.stat()
+                    digest.update(f"{file_path.name}:{stat.st_size}:{stat.st_mtime_ns}\n".encode())
+        return digest.hexdigest()
+    
+    def retrieve(self, query: str, top_k: int = 3, mode: str = None,
+                 rerank: bool = None, types: Optional[List[str]] = None,
+                 boosts: Optional[Dict[str, float]] = None,
+                 min_per_type: Optional[Dict[str, int]] = None,
+                 query_embedding: Optional[np.ndarray] = None) -> List[Tuple[str, Dict, float]]:
         """
         Retrieve most relevant document chunks for a query.
         
         Args:
             query: The interview question or topic
             top_k: Number of top results to return (default: 3)
+            mode: "dense" or "hybrid" (default: RETRIEVAL_MODE)
+            rerank: Re-rank candidates with the cross-encoder (default: RERANK)
+            types: Only search chunks of these document types
+            boosts: Ranking multiplier per document type, e.g. {'projects': 1.2},
+                    applied to the RRF score or the shifted cosine (1 + similarity)
+            min_per_type: Minimum number of results per type, e.g. {'cv': 1}
+            query_embedding: Dense query vector to use instead of encoding
+                             `query` (which still drives the keyword search)
         
         Returns:
-            List of (chunk_text, metadata, similarity_score) tuples
+            List of (chunk_text, metadata, similarity_score) tuples.
+            In hybrid mode the score is the best of the cosine similarity and
+            the share of the query's rare terms found in the chunk; after
+            re-ranking it is the cross-encoder relevance probability.
         """
         if not self.model:
             print("[NEGATIVE] Model not loaded!")
             return []
         
-        if self.embeddings is None or not self.document_chunks:
+        # Work on a consistent snapshot (the index may be swapped meanwhile)
+        document_chunks, metadata, embeddings, bm25 = self.snapshot()
+        
+        if embeddings is None or not document_chunks:
             print("[NEGATIVE] No embeddings available!")
             return []
         
+        mode = mode or RETRIEVAL_MODE
+        rerank = RERANK if rerank is None else rerank
+        min_per_type = min_per_type or {}
+        num_candidates = max(top_k, RERANK_CANDIDATES) if rerank else top_k
         start_time = time.time()
         
         try:
             # Encode the query
-            query_embedding = self.model.encode([query], convert_to_numpy=True)[0]
+            if query_embedding is None:
+                query_embedding = self.encode([query])[0]
+            query_norm = np.linalg.norm(query_embedding)
             
-            # Calculate cosine similarity
-            similarities = np.dot(self.embeddings, query_embedding) / (
-                np.linalg.norm(self.embeddings, axis=1) * np.linalg.norm(query_embedding)
-            )
+            partitions = None
+            if types or boosts:
+                partitions = self.type_partitions(metadata, embeddings)
             
-            # Get top-k indices
-            top_indices = np.argsort(similarities)[-top_k:][::-1]
+            if types:
+                # Scan only the partitions of the requested (and guaranteed) types
+                scanned = [partitions[t] for t in dict.fromkeys(list(types) + list(min_per_type))
+                           if t in partitions]
+                if not scanned:
+                    return []
+                rows = np.concatenate([part_rows for part_rows, _, _ in scanned])
+                similarities = np.concatenate([
+                    np.dot(matrix, query_embedding) / (norms * query_norm)
+                    for _, matrix, norms in scanned
+                ])
+            else:
+                rows = None  # All rows
+                similarities = np.dot(embeddings, query_embedding) / (
+                    np.linalg.norm(embeddings, axis=1) * query_norm
+                )
+            
+            if mode == "hybrid" and bm25 is not None:
+                bm25_scores = bm25.score(query)
+                coverage = bm25.coverage(query)
+                if rows is not None:
+                    bm25_scores = bm25_scores[rows]
+                    coverage = coverage[rows]
+                
+                # Reciprocal rank fusion of the dense and keyword rankings
+                ranking = np.zeros(len(similarities))
+                ranking[np.argsort(-similarities)] += 1.0 / (RRF_K + np.arange(1, len(similarities) + 1))
+                keyword_order = np.argsort(-bm25_scores)
+                keyword_ranks = 1.0 / (RRF_K + np.arange(1, len(bm25_scores) + 1))
+                keyword_ranks[bm25_scores[keyword_order] <= 0] = 0.0  # No match, no vote
+                ranking[keyword_order] += keyword_ranks
+                
+                scores = np.maximum(similarities, coverage)
+            else:
+                # Shifted to [0, 2]: a boost multiplier must raise a negative cosine too
+                ranking = similarities + 1.0
+                scores = similarities
+            
+            if boosts:
+                weights = np.ones(len(document_chunks))
+                for doc_type, boost in boosts.items():
+                    if doc_type in partitions:
+                        weights[partitions[doc_type][0]] = boost
+                ranking *= weights if rows is None else weights[rows]
+            
+            order = np.argsort(-ranking)
+            if min_per_type:
+                type_of = lambda i: metadata[i if rows is None else rows[i]].get('type')
+                top_indices = guarantee_types(list(order), type_of, num_candidates, min_per_type)
+            else:
+                top_indices = order[:num_candidates]
             
             # Prepare results
             results = []
             for idx in top_indices:
+                chunk_index = idx if rows is None else rows[idx]
                 results.append((
-                    self.document_chunks[idx],
-                    self.metadata[idx],
-                    float(similarities[idx])
+                    document_chunks[chunk_index],
+                    metadata[chunk_index],
+                    float(scores[idx])
                 ))
             
             elapsed = (time.time() - start_time) * 1000  # Convert to ms
-            print(f"[POSITIVE] Retrieved {top_k} chunks in {elapsed:.1f}ms")
+            self.last_timings = {'retrieve_ms': elapsed, 'rerank_ms': 0.0, 'reranked': False}
+            
+            if rerank:
+                if min_per_type:
+                    # Keep the guarantee after the cross-encoder reorders the candidates
+                    results = self.rerank(query, results, len(results))
+                    results = guarantee_types(results, lambda r: r[1].get('type'), top_k, min_per_type)
+                else:
+                    results = self.rerank(query, results, top_k)
+                print(f"[POSITIVE] Retrieved {top_k} chunks ({mode}) in {elapsed:.1f}ms, "
+                      f"re-rank {self.last_timings['rerank_ms']:.1f}ms "
+                      f"({'applied' if self.last_timings['reranked'] else 'skipped'})")
+            else:
+                print(f"[POSITIVE] Retrieved {top_k} chunks ({mode}) in {elapsed:.1f}ms")
             
             return results
         except Exception as e:
             print(f"[NEGATIVE] Error during retrieval: {e}")
             return []
     
+    def _predict_pairs(self, pairs: List[Tuple[str, str]]) -> np.ndarray:
+        """
+        Score all pairs in one batched forward pass and update the cost estimate.
+        predict() already applies a sigmoid for single-label models, so these
+        are relevance probabilities.
+        """
+        start_time = time.time()
+        scores = self.reranker.predict(pairs, batch_size=len(pairs), show_progress_bar=False)
+        ms_per_pair = (time.time() - start_time) * 1000 / len(pairs)
+        if self.rerank_ms_per_pair is None:
+            self.rerank_ms_per_pair = ms_per_pair
+        else:
+            self.rerank_ms_per_pair = 0.8 * self.rerank_ms_per_pair + 0.2 * ms_per_pair
+        return np.asarray(scores, dtype=np.float32)
+    
+    def rerank(self, query: str, results: List[Tuple[str, Dict, float]],
+               top_k: int) -> List[Tuple[str, Dict, float]]:
+        """
+        Re-score retrieved chunks with the cross-encoder and keep the top-k.
+        
+        Falls back to the bi-encoder order when the stage would exceed
+        RERANK_BUDGET_MS (predicted from recent runs, or on timeout).
+        """
+        start_time = time.time()
+        fallback = results[:top_k]
+        
+        def skip(reason):
+            self.last_timings['rerank_ms'] = (time.time() - start_time) * 1000
+            print(f"[RERANK] Skipped: {reason}")
+            return fallback
+        
+        if len(results) <= 1:
+            return fallback
+        if not self.load_reranker():
+            return skip("model unavailable")
+        if self._rerank_future is not None and not self._rerank_future.done():
+            return skip("previous re-rank still running")
+        
+        pairs = [(query, chunk) for chunk, _, _ in results]
+        if self.rerank_ms_per_pair is not None:
+            predicted = self.rerank_ms_per_pair * len(pairs)
+            if predicted > RERANK_BUDGET_MS:
+                # Refresh the estimate in the background so it can recover
+                self._rerank_future = self._rerank_executor.submit(self._predict_pairs, pairs[:2])
+                return skip(f"predicted {predicted:.0f}ms > {RERANK_BUDGET_MS}ms budget")
+        
+        self._rerank_future = self._rerank_executor.submit(self._predict_pairs, pairs)
+        try:
+            probabilities = self._rerank_future.result(timeout=RERANK_BUDGET_MS / 1000)
+        except FutureTimeout:
+            return skip(f"exceeded {RERANK_BUDGET_MS}ms budget")
+        except Exception as e:
+            return skip(f"error: {e}")
+        
+        order = np.argsort(-probabilities)[:top_k]
+        self.last_timings['rerank_ms'] = (time.time() - start_time) * 1000
+        self.last_timings['reranked'] = True
+        return [(results[i][0], results[i][1], float(probabilities[i])) for i in order]
+    
     def initialize(self) -> bool:
         """
         Initialize the RAG system completely.
@@ -300,16 +716,18 @@ class RAGSystem:
         if not self.load_model():
             return False
         
+        # Load the re-ranker up front so the first question does not pay for it
+        if RERANK:
+            self.load_reranker()
+        
         # Try to load cached embeddings
         if self.load_embeddings():
             print("[POSITIVE] RAG system ready!")
             return True
         
-        # If no cache, load documents and create embeddings
-        if not self.load_documents():
-            return False
-        
-        if not self.create_embeddings():
+        # If no cache, build the index with the pipelined builder
+        # (read, chunk and encode in streaming batches)
+        if not IndexBuilder(self).build():
             return False
 
         print("[POSITIVE] RAG system ready!")
@@ -341,6 +759,27 @@ class RAGSystem:
                 context_parts.append("")  # Empty line for separation
         
         return "\n".join(context_parts)
+    
+    def get_candidate_profile(self, max_chars: int = 1500) -> str:
+        """
+        Build a stable summary of the candidate from the CV chunks.
+        
+        The result is computed once and reused so it stays byte-identical
+        across requests (it is part of the cacheable prompt prefix).
+        """
+        if self._candidate_profile is not None:
+            return self._candidate_profile
+        
+        cv_chunks = [
+            chunk for chunk, meta in zip(self.document_chunks, self.metadata)
+            if meta.get('type') == 'cv'
+        ]
+        profile = "\n\n".join(chunk.strip() for chunk in cv_chunks)
+        if len(profile) > max_chars:
+            profile = profile[:max_chars].rsplit(' ', 1)[0]
+        
+        self._candidate_profile = profile
+        return profile
 
 
 # Global RAG instance (will be initialized at startup)
@@ -358,17 +797,46 @@ def initialize_rag() -> bool:
     rag = get_rag_system()
     return rag.initialize()
 
-def retrieve_context(query: str, top_k: int = 3) -> str:
+def chunk_id(meta: Dict) -> str:
+    """Stable ID of a chunk for logs: source file and character span"""
+    return f"{meta.get('source', 'unknown')}:{meta.get('start', 0)}-{meta.get('end', 0)}"
+
+def retrieve_context(query: str, top_k: int = 3, conversation=None,
+                     query_embedding: np.ndarray = None, chunk_ids: List[str] = None,
+                     remember: bool = True, results_out: List = None) -> str:
     """
     Retrieve relevant context for a query.
     
     Args:
         query: The interview question or topic
         top_k: Number of chunks to retrieve
+        conversation: ConversationMemory of the session; follow-up questions
+                      are then resolved with the recent turns
+        query_embedding: Embedding of `query` if already computed
+        chunk_ids: If given, filled with the IDs of the chunks in the context
+        remember: Add the results to the conversation's working set (False
+                  for pre-warm retrieval on a partial question)
+        results_out: If given, filled with the (chunk, metadata, score) results
     
     Returns:
         Formatted context string to add to prompt
     """
     rag = get_rag_system()
-    results = rag.retrieve(query, top_k=top_k)
+    boosts = infer_type_boosts(query) if QUERY_TYPE_BOOSTS else None
+    if conversation is not None:
+        results = conversation.retrieve(query, top_k=top_k, embedding=query_embedding, remember=remember,
+                                        boosts=boosts, min_per_type=REQUIRED_TYPES)
+    else:
+        results = rag.retrieve(query, top_k=top_k, boosts=boosts, min_per_type=REQUIRED_TYPES,
+                               query_embedding=query_embedding)
+    if results_out is not None:
+        results_out.extend(results)
+    if chunk_ids is not None:
+        # Same confidence cut as format_context
+        chunk_ids.extend(chunk_id(meta) for _, meta, score in results if score > 0.3)
     return rag.format_context(results)
+
+def get_candidate_profile() -> str:
+    """Get the stable candidate profile block for the prompt prefix"""
+    rag = get_rag_system()
+    return rag.get_candidate_profile()
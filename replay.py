@@ -0,0 +1,406 @@
+"""
+Headless replay of recorded interviews through the live pipeline.
+
+Each WAV file goes through the same segmentation as main.py (fixed-interval
+chunks, silence flush), then through transcription_worker, retrieve_context
+and a local mock LLM server. No audio device, window or API key is needed.
+
+Reported per run:
+    - per-stage latency (transcription per chunk, silence-to-text, retrieval,
+      LLM first token, LLM total, silence-to-answer)
+    - real-time factor (transcription time / audio duration)
+    - first-chunk latency (transcription of the first chunk after startup)
+    - word error rate against reference transcripts
+    - retrieval hit rate (context contains one of the expected documents)
+
+A WAV file can have sidecar files with the same name:
+    interview.txt   reference transcript
+    interview.json  {"reference": "...", "sources": ["projects.txt"]}
+
+Usage:
+    python replay.py recordings/ --save-baseline benchmarks/replay_baseline.json
+    python replay.py recordings/ --baseline benchmarks/replay_baseline.json
+    python replay.py interview.wav --speed 1    # pace the audio in real time
+    python replay.py recordings/ --cold --no-context   # without warm-up / prompt carry-over
+    python replay.py recordings/ --fixed-threshold     # amplitude threshold instead of the noise floor
+"""
+import argparse
+import asyncio
+import json
+import re
+import threading
+import time
+import wave
+from pathlib import Path
+from queue import Queue
+from typing import Iterator, List, Tuple
+import numpy as np
+
+from noise_floor import NoiseFloor
+
+# Segmentation (same defaults as main.py)
+ADAPTIVE_SILENCE = True   # Noise-floor speech detection (main.py adaptive_silence)
+SILENCE_THRESHOLD = 500   # int16 PCM amplitude, when not adaptive
+SILENCE_DURATION = 0.5    # Seconds of silence that end an utterance
+PROCESS_INTERVAL = 3.0    # Seconds of audio per transcription chunk
+MIN_AUDIO_DURATION = 0.5  # Shorter chunks are not transcribed
+BLOCK_FRAMES = 1024       # Frames per stream.read in main.py
+FLUSH_TIMEOUT = 30        # Max seconds to wait for pending transcriptions
+TOP_K = 3
+
+# Regression thresholds when comparing with a baseline
+RELATIVE_TOLERANCE = 0.10  # Latencies and RTF may grow by 10%
+WER_TOLERANCE = 0.02       # Absolute WER increase
+HIT_RATE_TOLERANCE = 0.05  # Absolute hit rate decrease
+
+SOURCE_PATTERN = re.compile(r'\*\*From (.+?) \(')  # Sources listed by format_context
+STAGES = ['transcribe', 'silence_to_text', 'retrieve', 'llm_first_token', 'llm_total', 'silence_to_answer']
+
+
+def iter_segments(frames: bytes, sample_rate: int, channels: int,
+                  adaptive: bool = ADAPTIVE_SILENCE) -> Iterator[Tuple[str, float, object]]:
+    """
+    Replay main.py's segmentation in audio time.
+
+    Yields:
+        ('chunk', audio_time, audio_bytes) when a chunk is queued for transcription
+        ('flush', audio_time, silence_time) when silence ends an utterance
+    """
+    block_bytes = BLOCK_FRAMES * channels * 2
+    audio_time = 0.0
+    last_sound = 0.0
+    last_process = 0.0
+    has_sound = False
+    current_chunk = []
+    noise_floor = NoiseFloor(sample_rate, BLOCK_FRAMES) if adaptive else None
+
+    for offset in range(0, len(frames), block_bytes):
+        data = frames[offset:offset + block_bytes]
+        current_chunk.append(data)
+        audio_time += len(data) / (channels * 2) / sample_rate
+
+        block = np.frombuffer(data, dtype=np.int16)
+        if noise_floor.update(block) if noise_floor else np.abs(block).max() > SILENCE_THRESHOLD:
+            last_sound = audio_time
+            has_sound = True
+
+        if audio_time - last_process >= PROCESS_INTERVAL and current_chunk:
+            if len(current_chunk) * BLOCK_FRAMES / sample_rate >= MIN_AUDIO_DURATION:
+                yield 'chunk', audio_time, b''.join(current_chunk)
+            current_chunk = []
+            last_process = audio_time
+
+        if audio_time - last_sound > SILENCE_DURATION and has_sound:
+            yield 'flush', audio_time, audio_time - last_sound
+            has_sound = False
+            last_sound = audio_time
+
+    # End of the recording: transcribe what is left and close the utterance
+    if current_chunk and len(current_chunk) * BLOCK_FRAMES / sample_rate >= MIN_AUDIO_DURATION:
+        yield 'chunk', audio_time, b''.join(current_chunk)
+    yield 'flush', audio_time, audio_time - last_sound
+
+
+def word_error_rate(reference: str, hypothesis: str) -> Tuple[int, int]:
+    """(word edits, reference words) between two transcripts"""
+    normalize = lambda text: re.findall(r"[\w']+", text.lower())
+    ref, hyp = normalize(reference), normalize(hypothesis)
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i] + [0] * len(hyp)
+        for j, hyp_word in enumerate(hyp, 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1,
+                             previous[j - 1] + (ref_word != hyp_word))
+        previous = current
+    return previous[-1], len(ref)
+
+
+def load_expectations(wav_path: Path) -> dict:
+    """Reference transcript and expected sources from the sidecar files"""
+    expectations = {'reference': None, 'sources': []}
+    json_path = wav_path.with_suffix('.json')
+    text_path = wav_path.with_suffix('.txt')
+    if json_path.exists():
+        with open(json_path, 'r', encoding='utf-8') as f:
+            expectations.update(json.load(f))
+    if expectations['reference'] is None and text_path.exists():
+        expectations['reference'] = text_path.read_text(encoding='utf-8')
+    return expectations
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+class PipelineReplay:
+    def __init__(self, speed: float = 0.0, top_k: int = TOP_K, use_rag: bool = True,
+                 warm: bool = True, carry_context: bool = True, adaptive_silence: bool = ADAPTIVE_SILENCE):
+        """
+        Args:
+            speed: Audio pacing (1 = real time, 0 = as fast as possible)
+            use_rag: Retrieve context (needs the documents/ index)
+            warm: Warm Whisper up before the first file (as main.py does)
+            carry_context: Prime each chunk with the previous text and the documents' key terms
+            adaptive_silence: Detect speech against the noise floor (else SILENCE_THRESHOLD)
+        """
+        # Imported here: loading Whisper and the RAG model is slow
+        import ai
+        from decoder_context import extract_key_terms
+        from mock_llm_server import MockLLMServer
+        from voice_to_text import transcription_worker, warm_up
+
+        self.speed = speed
+        self.top_k = top_k
+        self.adaptive_silence = adaptive_silence
+        self.transcription_worker = transcription_worker
+        self.key_terms = extract_key_terms("documents") if carry_context else None
+        if warm:
+            warm_up()
+        self.generate = ai.generate_chatbot_response
+        self.llm_server = MockLLMServer(port=0).start()
+        ai.OPENROUTER_URL = f"{self.llm_server.base_url}/chat/completions"
+
+        self.use_rag = False
+        if use_rag:
+            from rag import initialize_rag
+            self.use_rag = initialize_rag()
+
+    def _answer(self, text: str, timings: dict) -> set:
+        """Retrieve context and stream a mock answer; returns the context sources"""
+        from prompt import system_prompt
+        from rag import get_candidate_profile, retrieve_context
+
+        context, profile = "", ""
+        if self.use_rag:
+            start = time.perf_counter()
+            context = retrieve_context(text, self.top_k)
+            timings['retrieve'].append((time.perf_counter() - start) * 1000)
+            profile = get_candidate_profile()
+
+        first_token = []
+        start = time.perf_counter()
+        asyncio.run(self.generate(
+            system_prompt=system_prompt, user_message=text, temperature=0.7, max_tokens=500,
+            context=context, profile=profile,
+            on_token=lambda token: first_token or first_token.append(time.perf_counter())
+        ))
+        end = time.perf_counter()
+        timings['llm_first_token'].append(((first_token[0] if first_token else end) - start) * 1000)
+        timings['llm_total'].append((end - start) * 1000)
+        return set(SOURCE_PATTERN.findall(context))
+
+    def replay_file(self, wav_path: Path) -> dict:
+        """Run one recording through the pipeline"""
+        with wave.open(str(wav_path), 'rb') as wav:
+            if wav.getsampwidth() != 2:
+                raise ValueError(f"{wav_path.name}: 16-bit PCM WAV required")
+            sample_rate = wav.getframerate()
+            channels = wav.getnchannels()
+            frames = wav.readframes(wav.getnframes())
+        audio_seconds = len(frames) / (channels * 2) / sample_rate
+        expectations = load_expectations(wav_path)
+
+        transcription_queue = Queue()
+        results_queue = Queue()
+        context = None
+        if self.key_terms is not None:
+            from decoder_context import DecoderContext
+            context = DecoderContext(self.key_terms)  # New session per recording
+        worker = threading.Thread(
+            target=self.transcription_worker,
+            args=(sample_rate, channels, transcription_queue, results_queue, MIN_AUDIO_DURATION),
+            kwargs={'context': context},
+            daemon=True
+        )
+        worker.start()
+
+        timings = {stage: [] for stage in STAGES}
+        queued_at = {}
+        last_done = [0.0]
+        pending = set()
+        accumulated = []
+        utterances = []
+        hits = 0
+        task_counter = 0
+
+        def collect():
+            while not results_queue.empty():
+                task_id, text = results_queue.get()
+                now = time.perf_counter()
+                # One worker, FIFO: the task started when it was queued or when the previous one ended
+                timings['transcribe'].append((now - max(queued_at[task_id], last_done[0])) * 1000)
+                last_done[0] = now
+                pending.discard(task_id)
+                if text:
+                    accumulated.append(text)
+
+        wall_start = time.perf_counter()
+        for kind, audio_time, value in iter_segments(frames, sample_rate, channels, self.adaptive_silence):
+            if self.speed:
+                delay = wall_start + audio_time / self.speed - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            collect()
+
+            if kind == 'chunk':
+                task_counter += 1
+                queued_at[task_counter] = time.perf_counter()
+                pending.add(task_counter)
+                transcription_queue.put((value, task_counter))
+                continue
+
+            # Silence: wait for the pending transcriptions, then answer
+            flush_start = time.perf_counter()
+            while pending and time.perf_counter() - flush_start < FLUSH_TIMEOUT:
+                collect()
+                time.sleep(0.01)
+            collect()
+            if not accumulated:
+                continue
+
+            text = " ".join(accumulated)
+            accumulated.clear()
+            pending.clear()
+            timings['silence_to_text'].append((time.perf_counter() - flush_start) * 1000)
+            sources = self._answer(text, timings)
+            timings['silence_to_answer'].append((time.perf_counter() - flush_start) * 1000)
+            utterances.append({'text': text, 'sources': sorted(sources)})
+            if expectations['sources'] and sources & set(expectations['sources']):
+                hits += 1
+
+        transcription_queue.put(None)
+        worker.join(timeout=FLUSH_TIMEOUT)
+
+        result = {
+            'file': wav_path.name,
+            'audio_seconds': audio_seconds,
+            'transcribe_seconds': sum(timings['transcribe']) / 1000,
+            'first_chunk_ms': timings['transcribe'][0] if timings['transcribe'] else None,
+            'timings': timings,
+            'utterances': utterances,
+            'transcript': " ".join(u['text'] for u in utterances),
+            'word_errors': None,
+            'reference_words': None,
+            'hits': hits if expectations['sources'] and self.use_rag else None,
+        }
+        if expectations['reference']:
+            result['word_errors'], result['reference_words'] = word_error_rate(
+                expectations['reference'], result['transcript'])
+        return result
+
+    def stop(self):
+        self.llm_server.stop()
+
+
+def summarize(results: List[dict]) -> dict:
+    """Aggregate metrics of a run (the format saved as a baseline)"""
+    audio = sum(r['audio_seconds'] for r in results)
+    summary = {
+        'files': len(results),
+        'audio_seconds': audio,
+        'rtf': sum(r['transcribe_seconds'] for r in results) / audio if audio else 0.0,
+        # First chunk of the first file: the only one decoded right after startup
+        'first_chunk_ms': results[0]['first_chunk_ms'] if results else None,
+    }
+    for stage in STAGES:
+        values = [value for r in results for value in r['timings'][stage]]
+        summary[f'{stage}_p50_ms'] = percentile(values, 0.5)
+        summary[f'{stage}_p95_ms'] = percentile(values, 0.95)
+
+    scored = [r for r in results if r['reference_words']]
+    summary['wer'] = (sum(r['word_errors'] for r in scored) / sum(r['reference_words'] for r in scored)
+                      if scored else None)
+    labelled = [r for r in results if r['hits'] is not None and r['utterances']]
+    summary['retrieval_hit_rate'] = (sum(r['hits'] for r in labelled) / sum(len(r['utterances']) for r in labelled)
+                                     if labelled else None)
+    return summary
+
+
+def compare(summary: dict, baseline: dict) -> List[str]:
+    """Regressions of a run compared with a baseline summary"""
+    regressions = []
+    for key, base in baseline.items():
+        value = summary.get(key)
+        if value is None or base is None or key in ('files', 'audio_seconds'):
+            continue
+        if key == 'wer':
+            failed = value > base + WER_TOLERANCE
+        elif key == 'retrieval_hit_rate':
+            failed = value < base - HIT_RATE_TOLERANCE
+        else:
+            failed = value > base * (1 + RELATIVE_TOLERANCE)
+        if failed:
+            regressions.append(f"{key}: {base:.3f} -> {value:.3f}")
+    return regressions
+
+
+def print_report(results: List[dict], summary: dict, baseline: dict = None):
+    print(f"\n{'file':<28} {'audio s':>8} {'RTF':>6} {'WER':>6} {'hits':>6}")
+    for r in results:
+        rtf = r['transcribe_seconds'] / r['audio_seconds'] if r['audio_seconds'] else 0.0
+        wer = f"{r['word_errors'] / r['reference_words']:.3f}" if r['reference_words'] else "-"
+        hits = f"{r['hits']}/{len(r['utterances'])}" if r['hits'] is not None else "-"
+        print(f"{r['file'][:28]:<28} {r['audio_seconds']:>8.1f} {rtf:>6.2f} {wer:>6} {hits:>6}")
+
+    print(f"\n{'metric':<26} {'run':>10} {'baseline':>10}")
+    for key, value in summary.items():
+        base = (baseline or {}).get(key)
+        fmt = lambda v: "-" if v is None else f"{v:.3f}" if isinstance(v, float) else str(v)
+        print(f"{key:<26} {fmt(value):>10} {fmt(base):>10}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay WAV recordings through the pipeline headlessly")
+    parser.add_argument("path", help="WAV file or directory of WAV files")
+    parser.add_argument("--speed", type=float, default=0.0, help="1 = real time, 0 = as fast as possible")
+    parser.add_argument("--top-k", type=int, default=TOP_K)
+    parser.add_argument("--no-rag", action="store_true", help="Skip retrieval")
+    parser.add_argument("--cold", action="store_true", help="No Whisper warm-up before the first file")
+    parser.add_argument("--no-context", action="store_true", help="Decode every chunk without a prompt")
+    parser.add_argument("--fixed-threshold", action="store_true", help="Silence detection with SILENCE_THRESHOLD")
+    parser.add_argument("--baseline", help="Compare with a saved baseline (exit 1 on regression)")
+    parser.add_argument("--save-baseline", help="Save this run's summary as a baseline")
+    parser.add_argument("--output", help="Write per-file results as JSON")
+    args = parser.parse_args()
+
+    path = Path(args.path)
+    files = sorted(path.glob("*.wav")) if path.is_dir() else [path]
+    if not files:
+        raise SystemExit(f"[NEGATIVE] No WAV files in {path}")
+
+    replay = PipelineReplay(speed=args.speed, top_k=args.top_k, use_rag=not args.no_rag,
+                            warm=not args.cold, carry_context=not args.no_context,
+                            adaptive_silence=not args.fixed_threshold)
+    try:
+        results = []
+        for wav_path in files:
+            print(f">>> Replaying {wav_path.name}...")
+            results.append(replay.replay_file(wav_path))
+    finally:
+        replay.stop()
+
+    summary = summarize(results)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    print_report(results, summary, baseline)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+        print(f"[POSITIVE] Baseline saved to {args.save_baseline}")
+    if baseline:
+        regressions = compare(summary, baseline)
+        if regressions:
+            print("[NEGATIVE] Regressions against the baseline:")
+            for line in regressions:
+                print(f"           {line}")
+            raise SystemExit(1)
+        print("[POSITIVE] No regression against the baseline")
@@ -0,0 +1,111 @@
+import asyncio
+import threading
+from typing import Awaitable, Callable, Optional
+
+# Configuration
+MAX_CONCURRENT_REQUESTS = 2  # LLM calls allowed in flight at the same time
+CANCEL_SUPERSEDED = True     # A new question cancels the ones still in flight
+
+
+class AIRequestManager:
+    def __init__(self, max_concurrent: int = MAX_CONCURRENT_REQUESTS,
+                 cancel_superseded: bool = CANCEL_SUPERSEDED):
+        """
+        Run AI requests on one background event loop.
+
+        Every request gets an increasing generation ID. A newer request
+        cancels the older ones still in flight (which aborts their HTTP
+        streams), at most `max_concurrent` requests run at once, and results
+        are delivered strictly in generation order.
+        """
+        self.cancel_superseded = cancel_superseded
+        self.lock = threading.Lock()
+        self.last_id = 0
+
+        # Only touched from the event loop thread
+        self.tasks = {}          # generation_id -> running task
+        self.finished = {}       # generation_id -> (task, on_result, on_cancel) waiting for display
+        self.next_display = 1
+
+        self.loop = asyncio.new_event_loop()
+        self.semaphore = asyncio.Semaphore(max_concurrent)
+        self.thread = threading.Thread(target=self._run_loop, daemon=True)
+        self.thread.start()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, make_coroutine: Callable[[int], Awaitable],
+               on_result: Callable[[int, object], None],
+               on_cancel: Optional[Callable[[int], None]] = None) -> int:
+        """
+        Start a request (thread-safe).
+
+        Args:
+            make_coroutine: Called with the generation ID, returns the coroutine to run
+            on_result: Called with (generation_id, result) in generation order;
+                       never called for cancelled requests
+            on_cancel: Called with the generation ID instead of on_result when
+                       the request was cancelled or failed (e.g. to drop what
+                       it already streamed)
+
+        Returns:
+            The generation ID of the request
+        """
+        with self.lock:
+            self.last_id += 1
+            generation_id = self.last_id
+        self.loop.call_soon_threadsafe(self._start, generation_id, make_coroutine, on_result, on_cancel)
+        return generation_id
+
+    def is_current(self, generation_id: int) -> bool:
+        """True if no newer request has been submitted"""
+        return generation_id == self.last_id
+
+    def cancel_all(self):
+        """Cancel every request in flight (thread-safe)"""
+        self.loop.call_soon_threadsafe(self._cancel_older, self.last_id + 1)
+
+    def _cancel_older(self, generation_id: int):
+        for old_id, task in list(self.tasks.items()):
+            if old_id < generation_id:
+                print(f"[REQ] Cancelling superseded request #{old_id}")
+                task.cancel()
+
+    def _start(self, generation_id, make_coroutine, on_result, on_cancel):
+        if self.cancel_superseded:
+            self._cancel_older(generation_id)
+
+        task = self.loop.create_task(self._run(make_coroutine, generation_id))
+        self.tasks[generation_id] = task
+        task.add_done_callback(lambda t: self._finished(generation_id, t, on_result, on_cancel))
+
+    async def _run(self, make_coroutine, generation_id):
+        async with self.semaphore:
+            return await make_coroutine(generation_id)
+
+    def _finished(self, generation_id, task, on_result, on_cancel):
+        self.tasks.pop(generation_id, None)
+        self.finished[generation_id] = (task, on_result, on_cancel)
+
+        # Deliver results in generation order
+        while self.next_display in self.finished:
+            current_id = self.next_display
+            task, on_result, on_cancel = self.finished.pop(current_id)
+            self.next_display += 1
+
+            try:
+                if task.cancelled() or task.exception():
+                    if not task.cancelled():
+                        print(f"[REQ] Request #{current_id} failed: {task.exception()}")
+                    if on_cancel:
+                        on_cancel(current_id)
+                    continue
+                on_result(current_id, task.result())
+            except Exception as e:
+                print(f"[REQ] Error displaying request #{current_id}: {e}")
+
+    def stop(self):
+        self.cancel_all()
+        self.loop.call_soon_threadsafe(self.loop.stop)
@@ -0,0 +1,283 @@
+"""
+Crash-safe session log.
+
+Everything that happens during an interview is appended to a JSONL file as
+it happens: transcript segments, questions, retrieved chunk IDs, answers
+and timings. Events are written by a background thread and fsynced in
+batches (at most FLUSH_INTERVAL seconds after being recorded). A session
+that did not end cleanly is resumed on the next start, unless its last
+event is older than RESUME_MAX_AGE: the conversation is rebuilt from its
+events and new events are appended to the same file.
+
+Usage:
+    python session_store.py --list
+    python session_store.py [sessions/session_20250101_100000.jsonl] --format md --output interview.md
+"""
+import argparse
+import datetime
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from queue import Empty, Queue
+from typing import Dict, List, Optional, Tuple
+
+# Configuration
+SESSIONS_DIR = "sessions"
+FLUSH_INTERVAL = 1.0   # Seconds an event may wait before its batch is fsynced
+MAX_BATCH = 256        # Events written per fsync at most
+RESUME_MAX_AGE = 2 * 3600  # Seconds since its last event after which a session is not resumed
+EXPORT_FORMATS = ('txt', 'md', 'json')
+
+
+def read_events(path: Path) -> List[Dict]:
+    """Events of a session log; a line cut short by a crash is ignored"""
+    events = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                events.append(json.loads(line))
+            except json.JSONDecodeError:
+                print(f"[NEGATIVE] Ignoring a truncated event in {Path(path).name}")
+    return events
+
+
+def session_state(events: List[Dict]) -> Dict:
+    """
+    Rebuild the window state of a session from its events.
+
+    A 'draft' (local draft or cached answer being refreshed) is shown only
+    until the 'answer' with the same id replaces it, as in the window.
+
+    Returns:
+        {'conversation': [(role, text)], 'transcript': pending text not yet asked,
+         'questions': questions asked since the last clear}
+    """
+    conversation, transcript, questions = [], [], []
+    drafts = {}  # Request id -> index in conversation of its draft
+    for event in events:
+        kind = event['kind']
+        if kind == 'segment':
+            transcript.append(event['text'])
+        elif kind == 'question':
+            conversation.append(("Interviewer", event['text']))
+            questions.append(event['text'])
+            transcript = []
+        elif kind in ('draft', 'answer'):
+            index = drafts.pop(event.get('id'), None)
+            if index is None:
+                index = len(conversation)
+                conversation.append(None)
+            conversation[index] = ("AI", event['text'])
+            if kind == 'draft':
+                drafts[event.get('id')] = index
+        elif kind == 'candidate':
+            conversation.append(("Candidate", event['text']))
+        elif kind == 'clear':
+            conversation, transcript, questions = [], [], []
+            drafts = {}
+    return {'conversation': conversation, 'transcript': " ".join(transcript), 'questions': questions}
+
+
+def _clock(event: Dict) -> str:
+    return datetime.datetime.fromtimestamp(event['t']).strftime('%H:%M:%S')
+
+
+def export_events(events: List[Dict], fmt: str) -> str:
+    """Render a session as plain text, markdown or JSON"""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt} (use {', '.join(EXPORT_FORMATS)})")
+    state = session_state(events)
+    started = events[0]['t'] if events else time.time()
+
+    if fmt == 'json':
+        return json.dumps({
+            'started_at': datetime.datetime.fromtimestamp(started).isoformat(timespec='seconds'),
+            'conversation': [{'role': role, 'text': text} for role, text in state['conversation']],
+            'pending_transcript': state['transcript'],
+            'events': events,
+        }, indent=2, ensure_ascii=False)
+
+    if fmt == 'txt':
+        blocks = [f"{role}:\n{text}" for role, text in state['conversation']]
+        if state['transcript']:
+            blocks.append(state['transcript'])
+        return "\n\n".join(blocks) + "\n"
+
+    # Markdown: the conversation since the last clear, with times and context sources
+    start = max((i + 1 for i, e in enumerate(events) if e['kind'] == 'clear'), default=0)
+    answered = {e.get('id') for e in events[start:] if e['kind'] == 'answer'}
+    lines = [f"# Interview session - {datetime.datetime.fromtimestamp(started):%Y-%m-%d %H:%M}", ""]
+    for event in events[start:]:
+        kind = event['kind']
+        if kind == 'question':
+            lines += [f"## Interviewer ({_clock(event)})", "", event['text'], ""]
+        elif kind == 'candidate':
+            lines += [f"### Candidate ({_clock(event)})", "", event['text'], ""]
+        elif kind == 'retrieval' and event.get('chunk_ids'):
+            lines += [f"_Context: {', '.join(event['chunk_ids'])}_", ""]
+        elif kind == 'answer':
+            latency = f", {event['latency']:.1f}s" if event.get('latency') else ""
+            lines += [f"### AI ({_clock(event)}{latency})", "", event['text'], ""]
+        elif kind == 'draft' and event.get('id') not in answered:
+            lines += [f"### AI draft ({_clock(event)})", "", event['text'], ""]
+    if state['transcript']:
+        lines += ["## Not yet asked", "", state['transcript'], ""]
+    return "\n".join(lines)
+
+
+class SessionStore:
+    def __init__(self, path: Path, flush_interval: float = FLUSH_INTERVAL, max_batch: int = MAX_BATCH):
+        """
+        Append-only JSONL log of one session, written by a background thread.
+
+        record() never blocks on disk: events are queued, then written and
+        fsynced in batches by the writer thread. Use create() or
+        resume_latest() rather than the constructor.
+        """
+        self.path = Path(path)
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.queue = Queue()
+        self.events = []  # In-memory copy, for export
+        self.lock = threading.Lock()
+        self.closed = False
+        self.writer = threading.Thread(target=self._write, daemon=True)
+        self.writer.start()
+
+    @classmethod
+    def create(cls, directory: str = SESSIONS_DIR, **kwargs) -> "SessionStore":
+        Path(directory).mkdir(parents=True, exist_ok=True)
+        name = f"session_{datetime.datetime.now():%Y%m%d_%H%M%S}.jsonl"
+        store = cls(Path(directory) / name, **kwargs)
+        store.record('start')
+        return store
+
+    @classmethod
+    def resume_latest(cls, directory: str = SESSIONS_DIR, max_age: float = RESUME_MAX_AGE,
+                      **kwargs) -> Optional[Tuple["SessionStore", List[Dict]]]:
+        """
+        Reopen the most recent session if it did not end cleanly and was active
+        less than `max_age` seconds ago; returns (store, past events)
+        """
+        sessions = sorted(Path(directory).glob("session_*.jsonl")) if Path(directory).exists() else []
+        if not sessions:
+            return None
+        path = sessions[-1]
+        events = read_events(path)
+        if not events or events[-1]['kind'] == 'end':
+            return None
+        if time.time() - events[-1]['t'] > max_age:
+            print(f"[SESSION] Not resuming {path.name}: inactive for more than {max_age / 3600:g}h")
+            return None
+
+        # Cut a line torn by the crash so new events start on a line of their own
+        with open(path, 'rb+') as f:
+            data = f.read()
+            f.truncate(data.rfind(b'\n') + 1)
+        store = cls(path, **kwargs)
+        store.events = list(events)
+        store.record('resume')
+        return store, events
+
+    def record(self, kind: str, **fields):
+        """Queue an event (thread-safe, returns immediately)"""
+        event = {'t': time.time(), 'kind': kind, **fields}
+        with self.lock:
+            if self.closed:
+                return
+            self.events.append(event)
+        self.queue.put(event)
+
+    def flush(self, timeout: float = None) -> bool:
+        """Wait until the events recorded so far are on disk"""
+        done = threading.Event()
+        self.queue.put(done)
+        return done.wait(timeout)
+
+    def export(self, fmt: str) -> str:
+        with self.lock:
+            events = list(self.events)
+        return export_events(events, fmt)
+
+    def export_to(self, filename: str):
+        """Write the session to a file, the format taken from its extension (.txt, .md, .json)"""
+        fmt = Path(filename).suffix.lstrip('.').lower()
+        fmt = 'md' if fmt == 'markdown' else fmt
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write(self.export(fmt if fmt in EXPORT_FORMATS else 'txt'))
+
+    def close(self, ended: bool = True):
+        """
+        Wait for the writer. With ended=True the session is marked as ended
+        cleanly; otherwise it stays resumable (e.g. when closing on an error).
+        """
+        if ended:
+            self.record('end')
+        with self.lock:
+            self.closed = True
+        self.queue.put(None)
+        self.writer.join()
+
+    def _write(self):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            running = True
+            while running:
+                batch = [self.queue.get()]
+                deadline = time.monotonic() + self.flush_interval
+                while len(batch) < self.max_batch and batch[-1] is not None \
+                        and not isinstance(batch[-1], threading.Event):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(self.queue.get(timeout=remaining))
+                    except Empty:
+                        break
+
+                try:
+                    for item in batch:
+                        if isinstance(item, dict):
+                            f.write(json.dumps(item, ensure_ascii=False) + "\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+                except OSError as e:
+                    print(f"[NEGATIVE] Session log write failed: {e}")
+
+                for item in batch:
+                    if item is None:
+                        running = False
+                    elif isinstance(item, threading.Event):
+                        item.set()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export a session log")
+    parser.add_argument("session", nargs="?", help="Session log (default: the latest one)")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="md")
+    parser.add_argument("--output", help="Output file (default: print)")
+    parser.add_argument("--list", action="store_true", help="List the recorded sessions")
+    args = parser.parse_args()
+
+    sessions = sorted(Path(SESSIONS_DIR).glob("session_*.jsonl")) if Path(SESSIONS_DIR).exists() else []
+    if args.list:
+        for path in sessions:
+            events = read_events(path)
+            questions = sum(1 for e in events if e['kind'] == 'question')
+            ended = "ended" if events and events[-1]['kind'] == 'end' else "interrupted"
+            print(f"{path.name}  {len(events):>5} events  {questions:>3} questions  {ended}")
+        raise SystemExit(0)
+
+    path = Path(args.session) if args.session else (sessions[-1] if sessions else None)
+    if path is None or not path.exists():
+        raise SystemExit(f"[NEGATIVE] No session log found in {SESSIONS_DIR}/")
+
+    start = time.perf_counter()
+    output = export_events(read_events(path), args.format)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+        print(f"[POSITIVE] Exported {path.name} to {args.output} in {(time.perf_counter() - start) * 1000:.0f}ms")
+    else:
+        print(output)
@@ -0,0 +1,152 @@
+"""
+Speculative answer drafting while the question is still being spoken.
+
+Once the partial transcript already reads as a question, the answer is
+generated with it (and the context pre-warmed for it) before the interviewer
+stops talking. When the final question arrives, its embedding is compared
+with the speculated one: a close match continues the speculation (its answer
+is used, or awaited if still streaming), otherwise it is discarded and the
+answer is generated normally. Speculations in flight are capped, and the
+tokens of discarded drafts are counted against a budget; once it is spent,
+speculation turns itself off for the session.
+"""
+import asyncio
+import threading
+import time
+from typing import Awaitable, Callable, Optional
+import numpy as np
+
+# Configuration
+SPECULATE_THRESHOLD = 0.6     # Question score the partial text needs (QuestionDetector.score)
+CONTINUE_SIMILARITY = 0.85    # Cosine similarity final/partial question needed to keep a draft
+MAX_SPECULATIONS = 1          # Speculative drafts in flight at the same time
+WASTE_BUDGET = 4000           # Tokens of discarded drafts allowed per session before turning off
+SPECULATION_TTL = 30.0        # Seconds an unclaimed draft is kept
+
+
+class Speculation:
+    def __init__(self, question: str, embedding: np.ndarray, context: str, chunk_ids: list):
+        self.question = question
+        self.embedding = embedding
+        self.context = context
+        self.chunk_ids = chunk_ids
+        self.started_at = time.time()
+        self.tokens = 0
+        self.future = None  # concurrent.futures.Future of the answer
+
+
+class SpeculativeDrafter:
+    def __init__(self, loop: asyncio.AbstractEventLoop,
+                 generate: Callable[[str, str, Callable[[str], None]], Awaitable[Optional[str]]],
+                 embed: Callable[[str], np.ndarray],
+                 score: Callable[[str], float],
+                 threshold: float = SPECULATE_THRESHOLD,
+                 similarity: float = CONTINUE_SIMILARITY,
+                 max_speculations: int = MAX_SPECULATIONS,
+                 waste_budget: int = WASTE_BUDGET):
+        """
+        Args:
+            loop: Event loop the drafts run on (the AI request manager's)
+            generate: generate(question, context, on_token) coroutine returning the answer
+            embed: Normalized embedding of a question
+            score: Question score of a text (e.g. QuestionDetector.score)
+        """
+        self.loop = loop
+        self.generate = generate
+        self.embed = embed
+        self.score = score
+        self.threshold = threshold
+        self.similarity = similarity
+        self.max_speculations = max_speculations
+        self.waste_budget = waste_budget
+
+        self.lock = threading.Lock()
+        self.speculations = []  # Oldest first
+        self.enabled = True
+        self.stats = {'started': 0, 'continued': 0, 'discarded': 0, 'tokens': 0, 'wasted_tokens': 0}
+
+    def consider(self, partial: str, context: str = "", chunk_ids: list = None):
+        """
+        New partial question text (with its pre-warmed context): start a draft
+        if it reads as a question and no draft covers it yet. Thread-safe.
+        """
+        if not self.enabled or self.score(partial) < self.threshold:
+            return
+        embedding = self.embed(partial)
+
+        with self.lock:
+            self._expire()
+            for speculation in self.speculations:
+                if float(np.dot(speculation.embedding, embedding)) >= self.similarity:
+                    return  # The question has not changed enough to draft again
+            while len(self.speculations) >= self.max_speculations:
+                self._discard(self.speculations.pop(0))
+
+            speculation = Speculation(partial, embedding, context, chunk_ids or [])
+            speculation.future = asyncio.run_coroutine_threadsafe(self._draft(speculation), self.loop)
+            self.speculations.append(speculation)
+            self.stats['started'] += 1
+        print(f"[SPEC] Drafting on the partial question ({len(partial.split())} words)")
+
+    async def _draft(self, speculation: Speculation) -> Optional[str]:
+        def on_token(token):
+            speculation.tokens += 1
+            self.stats['tokens'] += 1
+        return await self.generate(speculation.question, speculation.context, on_token)
+
+    def claim(self, question: str, embedding: np.ndarray) -> Optional[Speculation]:
+        """
+        The final question: the draft to continue (its future gives the answer),
+        or None. Every other draft is discarded.
+        """
+        with self.lock:
+            self._expire()
+            best, best_similarity = None, -1.0
+            for speculation in self.speculations:
+                similarity = float(np.dot(speculation.embedding, embedding))
+                if similarity > best_similarity:
+                    best, best_similarity = speculation, similarity
+            if best_similarity < self.similarity or best.future.cancelled():
+                best = None
+            for speculation in self.speculations:
+                if speculation is not best:
+                    self._discard(speculation)
+            self.speculations = []
+            if best:
+                self.stats['continued'] += 1
+        if best:
+            print(f"[SPEC] Continuing the draft (similarity {best_similarity:.2f}, "
+                  f"started {time.time() - best.started_at:.1f}s ago)")
+        elif best_similarity >= 0:
+            print(f"[SPEC] Final question diverged (similarity {best_similarity:.2f}), draft discarded")
+        return best
+
+    def reset(self):
+        """Discard every draft (new session)"""
+        with self.lock:
+            for speculation in self.speculations:
+                self._discard(speculation)
+            self.speculations = []
+
+    def _expire(self):
+        """Discard drafts nobody claimed in time (caller holds the lock)"""
+        now = time.time()
+        for speculation in [s for s in self.speculations if now - s.started_at > SPECULATION_TTL]:
+            self.speculations.remove(speculation)
+            self._discard(speculation)
+
+    def _discard(self, speculation: Speculation):
+        """Cancel a draft and charge its tokens to the budget (caller holds the lock)"""
+        speculation.future.cancel()
+        self.stats['discarded'] += 1
+        # Tokens streamed so far; a cancelled stream stops before the next one
+        self.stats['wasted_tokens'] += speculation.tokens
+        if self.enabled and self.stats['wasted_tokens'] >= self.waste_budget:
+            self.enabled = False
+            print(f"[SPEC] {self.stats['wasted_tokens']} tokens spent on discarded drafts, "
+                  f"speculation turned off for this session")
+
+    def report(self) -> str:
+        s = self.stats
+        return (f"Speculation: {s['started']} drafts, {s['continued']} continued, {s['discarded']} discarded, "
+                f"{s['tokens']} tokens ({s['wasted_tokens']} wasted)")
@@ -4,7 +4,7 @@ import queue
 import threading
 
 class TranscriptWindow:
-    def __init__(self, ai_callback=None):
+    def __init__(self, ai_callback=None, clear_callback=None, save_callback=None):
         self.root = tk.Tk()
         self.root.title("🎤 Live Transcription")
         self.root.geometry("900x900")
@@ -15,6 +15,8 @@ class TranscriptWindow:
         except Exception:
             pass
         self.ai_callback = ai_callback  # Callback for AI processing
+        self.clear_callback = clear_callback  # Called when the conversation is cleared
+        self.save_callback = save_callback  # Writes the session to a .txt/.md/.json file (see Save)
         
         # Make window always on top
         self.root.attributes('-topmost', True)
@@ -172,6 +174,8 @@ class TranscriptWindow:
         self.conversation_area.tag_config("transcript_text", foreground=self.text_color, font=("Segoe UI", 11))
         self.conversation_area.tag_config("human_tag", foreground="#5fb8a6", font=("Segoe UI", 11, "bold"))
         self.conversation_area.tag_config("human_text", foreground=self.text_color, font=("Segoe UI", 10))
+        self.conversation_area.tag_config("candidate_tag", foreground="#d9a05b", font=("Segoe UI", 11, "bold"))
+        self.conversation_area.tag_config("candidate_text", foreground=self.text_color, font=("Segoe UI", 10, "italic"))
         self.conversation_area.tag_config("ai_tag", foreground="#6f9fe6", font=("Segoe UI", 11, "bold"))
         self.conversation_area.tag_config("ai_text", foreground="#3b5566", font=("Segoe UI", 10))
 
@@ -188,6 +192,7 @@ class TranscriptWindow:
         
         # Track conversation history
         self.conversation_history = []
+        self.streams = {}  # stream_id -> index in conversation_history of a message being streamed
         
         # Temporary buffer for accumulating transcript before sending to AI
         self.current_transcript = ""
@@ -209,6 +214,7 @@ class TranscriptWindow:
         if not self.is_running:
             return
         
+        streamed = False  # Streamed tokens are drawn once per check, not once per token
         try:
             while True:
                 update_type, data = self.update_queue.get_nowait()
@@ -243,13 +249,57 @@ class TranscriptWindow:
                     self.conversation_history.append((role, message))
                     self._rebuild_conversation()
                 
+                elif update_type == "stream":
+                    # Token of a message being streamed (starts the message if new)
+                    stream_id, role, text = data
+                    if stream_id not in self.streams:
+                        self.streams[stream_id] = len(self.conversation_history)
+                        self.conversation_history.append((role, ""))
+                    index = self.streams[stream_id]
+                    self.conversation_history[index] = (role, self.conversation_history[index][1] + text)
+                    streamed = True
+                
+                elif update_type == "finish_stream":
+                    # Final text of a streamed message (a new message if nothing was streamed)
+                    stream_id, role, message = data
+                    if stream_id in self.streams:
+                        self.conversation_history[self.streams.pop(stream_id)] = (role, message)
+                    else:
+                        self.conversation_history.append((role, message))
+                    self._rebuild_conversation()
+                
+                elif update_type == "drop_stream":
+                    # Partial message of a cancelled request
+                    index = self.streams.pop(data, None)
+                    if index is not None:
+                        del self.conversation_history[index]
+                        for stream_id, other in self.streams.items():
+                            if other > index:
+                                self.streams[stream_id] = other - 1
+                        self._rebuild_conversation()
+                
+                elif update_type == "ask_ai":
+                    # Triggered automatically (e.g. question detected)
+                    self.process_with_ai()
+                
                 elif update_type == "clear_conversation":
                     # Clear conversation history
                     self.conversation_history.clear()
+                    self.streams.clear()
+                    self._rebuild_conversation()
+                
+                elif update_type == "restore":
+                    # State of a resumed session
+                    conversation, transcript = data
+                    self.conversation_history = list(conversation)
+                    self.streams.clear()
+                    self.current_transcript = transcript + " " if transcript else ""
                     self._rebuild_conversation()
         
         except queue.Empty:
             pass
+        if streamed:
+            self._rebuild_conversation()
         
         # Schedule next check
         if self.is_running:
@@ -270,10 +320,13 @@ class TranscriptWindow:
     def clear_all(self):
         """Clear entire conversation and current transcript (thread-safe)"""
         self.conversation_history.clear()
+        self.streams.clear()
         self.current_transcript = ""
         self._rebuild_conversation()
         self.update_status("Cleared - Waiting for audio...")
         self.update_latency("--")
+        if self.clear_callback:
+            self.clear_callback()
     
     def _render_markdown(self, text):
         """Simple markdown rendering using text tags"""
@@ -323,7 +376,7 @@ class TranscriptWindow:
                 self.conversation_area.insert(tk.END, part, "ai_text")
     
     def _rebuild_conversation(self):
-        """Rebuild the conversation view (Human/AI + visible accumulating text)"""
+        """Rebuild the conversation view (Interviewer/Candidate/AI + visible accumulating text)"""
         # Save current scroll position
         scroll_position = self.conversation_area.yview()
         
@@ -335,9 +388,12 @@ class TranscriptWindow:
                 self.conversation_area.insert(tk.END, "\n\n")
             
             # Format based on role
-            if role == "Human":
-                self.conversation_area.insert(tk.END, "Human:\n", "human_tag")
+            if role == "Interviewer":
+                self.conversation_area.insert(tk.END, "Interviewer:\n", "human_tag")
                 self.conversation_area.insert(tk.END, message, "human_text")
+            elif role == "Candidate":
+                self.conversation_area.insert(tk.END, "Candidate:\n", "candidate_tag")
+                self.conversation_area.insert(tk.END, message, "candidate_text")
             else:  # AI - render as markdown
                 self.conversation_area.insert(tk.END, "AI:\n", "ai_tag")
                 self._render_markdown(message)
@@ -346,7 +402,7 @@ class TranscriptWindow:
         if self.current_transcript.strip():
             if len(self.conversation_history) > 0:
                 self.conversation_area.insert(tk.END, "\n\n")
-            # Show as regular text (will become Human: when Ask AI is clicked)
+            # Show as regular text (will become Interviewer: when Ask AI is clicked)
             self.conversation_area.insert(tk.END, self.current_transcript.strip(), "transcript_text")
         
         self.conversation_area.config(state=tk.DISABLED)
@@ -362,10 +418,30 @@ class TranscriptWindow:
         """Add a message to the conversation area (thread-safe)"""
         self.update_queue.put(("ai_message", (role, message)))
     
+    def stream_message(self, stream_id, role, text):
+        """Append text to the message streamed under `stream_id`, starting it if new (thread-safe)"""
+        self.update_queue.put(("stream", (stream_id, role, text)))
+    
+    def finish_stream(self, stream_id, role, message):
+        """Replace the message streamed under `stream_id` with its final text (thread-safe)"""
+        self.update_queue.put(("finish_stream", (stream_id, role, message)))
+    
+    def drop_stream(self, stream_id):
+        """Remove the partial message streamed under `stream_id`, if any (thread-safe)"""
+        self.update_queue.put(("drop_stream", stream_id))
+    
     def clear_conversation(self):
         """Clear conversation history (thread-safe)"""
         self.update_queue.put(("clear_conversation", None))
     
+    def restore(self, conversation, transcript=""):
+        """Show the conversation of a resumed session (thread-safe)"""
+        self.update_queue.put(("restore", (conversation, transcript)))
+    
+    def request_ai(self):
+        """Ask the AI as if the button was clicked (thread-safe)"""
+        self.update_queue.put(("ask_ai", None))
+    
     def process_with_ai(self):
         """Process transcript with AI (called by button click)"""
         transcript = self.get_transcript_text()
@@ -374,8 +450,8 @@ class TranscriptWindow:
             self.add_conversation_message("AI", "⚠️ No transcription available to process!")
             return
         
-        # Add human message to conversation
-        self.add_conversation_message("Human", transcript)
+        # Add the interviewer's question to the conversation
+        self.add_conversation_message("Interviewer", transcript)
         
         # Auto-clear the accumulation buffer immediately
         self.current_transcript = ""
@@ -386,12 +462,9 @@ class TranscriptWindow:
         
         # Call the callback if provided
         if self.ai_callback:
-            # Run in separate thread to avoid blocking GUI
-            threading.Thread(
-                target=self.ai_callback,
-                args=(transcript,),
-                daemon=True
-            ).start()
+            # Called in the GUI thread so requests are numbered in click order;
+            # the callback only submits the request and must not block
+            self.ai_callback(transcript)
         else:
             self.add_conversation_message("AI", "⚠️ AI callback not configured!")
     
@@ -409,18 +482,25 @@ class TranscriptWindow:
         
         # Default filename with timestamp
         default_name = f"transcript_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
+        filetypes = [("Text files", "*.txt"), ("All files", "*.*")]
+        if self.save_callback:
+            # Exported from the session log, which also has the retrieved context and timings
+            filetypes = [("Text files", "*.txt"), ("Markdown", "*.md"), ("JSON", "*.json"), ("All files", "*.*")]
         
         # Ask user for save location
         filename = filedialog.asksaveasfilename(
             defaultextension=".txt",
             initialfile=default_name,
-            filetypes=[("Text files", "*.txt"), ("All files", "*.*")]
+            filetypes=filetypes
         )
         
         if filename:
             try:
-                with open(filename, 'w', encoding='utf-8') as f:
-                    f.write(text_content)
+                if self.save_callback:
+                    self.save_callback(filename)
+                else:
+                    with open(filename, 'w', encoding='utf-8') as f:
+                        f.write(text_content)
                 self.update_status(f"Saved to {filename}")
             except Exception as e:
                 self.update_status(f"Error saving: {e}")
@@ -0,0 +1,298 @@
+"""
+Out-of-process transcription engine.
+
+Whisper runs in a child process with its own GIL, so decoding never delays
+the audio loop's stream.read or the Tk main loop. Audio goes through a ring
+of shared-memory slots (multiprocessing.shared_memory) instead of pickled
+bytes. A small control channel carries only task IDs, slot indices and
+results, as JSON lines over the child's stdin/stdout.
+
+The child is started as `python transcription_process.py --shm <name> ...`
+rather than with multiprocessing.Process: main.py has no `__main__` guard,
+and a spawned child would re-run it. A crashed child is restarted, and the
+chunks it had in flight are submitted again from their slots.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from multiprocessing import shared_memory
+from queue import Queue
+from typing import List, Optional
+
+# Configuration
+RING_SLOTS = 16         # Chunks in flight at most (about 48s of audio at 3s per chunk)
+SLOT_SECONDS = 12.0     # Longest chunk a slot holds (main.py cuts 3-5s chunks)
+MAX_RESTARTS = 5        # Restarts allowed within RESTART_WINDOW before giving up
+RESTART_WINDOW = 60.0   # Seconds
+MAX_ATTEMPTS = 2        # A chunk in flight during this many crashes is dropped (poison chunk)
+STOP_TIMEOUT = 10.0     # Seconds to wait for the child to finish its queue on stop
+
+
+def attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    """Attach to the parent's ring without letting this process unlink it on exit"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+        if os.name == 'posix':
+            # Older versions register attached segments with the resource
+            # tracker, which would unlink the ring when a child exits
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, 'shared_memory')
+        return shm
+
+
+class TranscriptionProcess:
+    def __init__(self, sample_rate: int, channels: int, results_queue: Queue,
+                 min_audio_duration: float = 0.5, stats: dict = None, governor=None,
+                 key_terms: Optional[List[str]] = None, warm_up: bool = True,
+                 slots: int = RING_SLOTS, slot_seconds: float = SLOT_SECONDS):
+        """
+        Drop-in replacement of main.py's transcription queue: put((audio_bytes, task_id)),
+        put(None) to stop, qsize() and join(). Results arrive on `results_queue`
+        as (task_id, text), in order, like with transcription_worker.
+
+        Args:
+            stats: dict kept up to date with the child's decode stats
+            governor: QualityGovernor mirrored from the child's (the child decides,
+                      this one only exposes the current settings to the audio loop)
+            key_terms: Enable decoder context carry-over with these terms (None = off)
+        """
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.results_queue = results_queue
+        self.stats = stats if stats is not None else {}
+        self.governor = governor
+        self.options = {
+            'sample_rate': sample_rate, 'channels': channels, 'min_audio_duration': min_audio_duration,
+            'adaptive_quality': governor is not None, 'key_terms': key_terms, 'warm_up': warm_up,
+        }
+
+        self.slot_bytes = int(slot_seconds * sample_rate) * channels * 2
+        self.slots = slots
+        self.ring = shared_memory.SharedMemory(create=True, size=self.slot_bytes * slots)
+        self.free_slots = deque(range(slots))
+        self.in_flight = {}  # task_id -> [slot, size, attempts], in submission order
+
+        self.lock = threading.Condition()
+        self.process = None
+        self.stopping = False
+        self.restarts = deque()        # Times of recent restarts
+        self.base_stats = {}           # Stats of the previous children
+        self.dropped_chunks = 0        # Chunks lost (ring full, poison chunk, engine gone)
+
+    def start(self):
+        self._spawn()
+        threading.Thread(target=self._supervise, daemon=True).start()
+        return self
+
+    def _spawn(self):
+        process = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "--shm", self.ring.name,
+             "--slot-bytes", str(self.slot_bytes), "--options", json.dumps(self.options)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        )
+        with self.lock:
+            self.process = process
+            # Chunks the previous child did not finish, oldest first
+            for task_id, (slot, size, attempts) in list(self.in_flight.items()):
+                self._send({'task': task_id, 'slot': slot, 'size': size})
+
+    def _send(self, message: dict):
+        """Write a control message (caller holds the lock); a dead child is handled by _supervise"""
+        try:
+            self.process.stdin.write((json.dumps(message) + "\n").encode('utf-8'))
+            self.process.stdin.flush()
+        except (OSError, ValueError, AttributeError):
+            pass
+
+    def put(self, task):
+        if task is None:
+            self.stop()
+            return
+        audio_bytes, task_id = task
+        with self.lock:
+            if not self.free_slots or self.process is None:
+                self.dropped_chunks += 1
+                print(f"\n[NEGATIVE] Transcription engine {'busy' if self.process else 'unavailable'}, "
+                      f"chunk #{task_id} dropped")
+                self.results_queue.put((task_id, ""))
+                return
+            if len(audio_bytes) > self.slot_bytes:
+                print(f"\n[NEGATIVE] Chunk #{task_id} longer than a ring slot, truncated")
+                audio_bytes = audio_bytes[:self.slot_bytes]
+            slot = self.free_slots.popleft()
+            offset = slot * self.slot_bytes
+            self.ring.buf[offset:offset + len(audio_bytes)] = audio_bytes
+            self.in_flight[task_id] = [slot, len(audio_bytes), 0]
+            self._send({'task': task_id, 'slot': slot, 'size': len(audio_bytes)})
+
+    def qsize(self) -> int:
+        return len(self.in_flight)
+
+    def join(self, timeout: float = None):
+        """Wait until every submitted chunk has a result"""
+        with self.lock:
+            self.lock.wait_for(lambda: not self.in_flight, timeout)
+
+    def reset_context(self):
+        """Forget the carried-over transcript (new interview session)"""
+        with self.lock:
+            self._send({'reset': True})
+
+    def stop(self):
+        with self.lock:
+            if self.stopping:
+                return
+            self.stopping = True
+            self._send({'stop': True})
+            process = self.process
+        if process:
+            try:
+                process.wait(timeout=STOP_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        self.ring.close()
+        self.ring.unlink()
+
+    def _finish(self, task_id: int, text: str):
+        """Free a chunk's slot and deliver its text (caller holds the lock)"""
+        entry = self.in_flight.pop(task_id, None)
+        if entry is None:
+            return
+        self.free_slots.append(entry[0])
+        self.results_queue.put((task_id, text))
+        self.lock.notify_all()
+
+    def _read_results(self, process):
+        for line in process.stdout:
+            try:
+                message = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if message.get('ready'):
+                print("[POSITIVE] Transcription process ready")
+                continue
+            with self.lock:
+                self._finish(message['task'], message['text'])
+                for key, value in message.get('stats', {}).items():
+                    self.stats[key] = self.base_stats.get(key, 0) + value
+            if self.governor is not None and message.get('level') is not None:
+                self.governor.level = message['level']
+
+    def _supervise(self):
+        """Read results; restart the child when it dies"""
+        while True:
+            process = self.process
+            self._read_results(process)
+            code = process.wait()
+            if self.stopping:
+                return
+
+            now = time.time()
+            while self.restarts and now - self.restarts[0] > RESTART_WINDOW:
+                self.restarts.popleft()
+            with self.lock:
+                self.base_stats = dict(self.stats)
+                for task_id, entry in list(self.in_flight.items()):
+                    entry[2] += 1
+                    if entry[2] >= MAX_ATTEMPTS:
+                        print(f"[NEGATIVE] Chunk #{task_id} was in flight during {entry[2]} crashes, dropped")
+                        self.dropped_chunks += 1
+                        self._finish(task_id, "")
+                if len(self.restarts) >= MAX_RESTARTS:
+                    print(f"[NEGATIVE] Transcription process exited (code {code}) {MAX_RESTARTS} times "
+                          f"in {RESTART_WINDOW:.0f}s, giving up")
+                    self.process = None
+                    for task_id in list(self.in_flight):
+                        self.dropped_chunks += 1
+                        self._finish(task_id, "")
+                    return
+            print(f"[NEGATIVE] Transcription process exited (code {code}), restarting...")
+            self.restarts.append(now)
+            self._spawn()
+
+
+def run_engine(shm_name: str, slot_bytes: int, options: dict):
+    """Child process: decode the chunks named on stdin, write results to stdout"""
+    # stdout is the control channel: move prints (model loading, governor) to stderr
+    control = os.fdopen(os.dup(sys.stdout.fileno()), 'wb', buffering=0)
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    send_lock = threading.Lock()
+
+    def send(message: dict):
+        with send_lock:
+            control.write((json.dumps(message) + "\n").encode('utf-8'))
+
+    ring = attach_shared_memory(shm_name)
+    from voice_to_text import transcription_worker, warm_up
+    governor = None
+    if options['adaptive_quality']:
+        from quality_governor import QualityGovernor
+        governor = QualityGovernor()
+    context = None
+    if options['key_terms'] is not None:
+        from decoder_context import DecoderContext
+        context = DecoderContext(options['key_terms'])
+    if options['warm_up']:
+        warm_up()
+
+    transcription_queue = Queue()
+    results_queue = Queue()
+    stats = {}
+    worker = threading.Thread(
+        target=transcription_worker,
+        args=(options['sample_rate'], options['channels'], transcription_queue, results_queue,
+              options['min_audio_duration']),
+        kwargs={'stats': stats, 'governor': governor, 'context': context},
+        daemon=True
+    )
+    worker.start()
+
+    def deliver():
+        while True:
+            result = results_queue.get()
+            if result is None:
+                return
+            task_id, text = result
+            send({'task': task_id, 'text': text, 'stats': dict(stats),
+                  'level': governor.level if governor else None})
+
+    deliverer = threading.Thread(target=deliver, daemon=True)
+    deliverer.start()
+    send({'ready': True})
+
+    for line in sys.stdin.buffer:
+        message = json.loads(line)
+        if message.get('stop'):
+            break
+        if message.get('reset'):
+            if context:
+                context.reset()
+            continue
+        offset = message['slot'] * slot_bytes
+        # Copied out of the ring: the slot is reused once its result is sent
+        audio_bytes = bytes(ring.buf[offset:offset + message['size']])
+        transcription_queue.put((audio_bytes, message['task']))
+
+    # Stop requested or parent gone (EOF): finish the queued chunks, then exit
+    transcription_queue.put(None)
+    worker.join()
+    results_queue.put(None)
+    deliverer.join()
+    ring.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Transcription engine process (started by TranscriptionProcess)")
+    parser.add_argument("--shm", required=True, help="Name of the shared-memory audio ring")
+    parser.add_argument("--slot-bytes", type=int, required=True)
+    parser.add_argument("--options", required=True, help="JSON engine options")
+    args = parser.parse_args()
+    run_engine(args.shm, args.slot_bytes, json.loads(args.options))
@@ -1,4 +1,5 @@
 import numpy as np
+import threading
 import time
 
 # Try to use faster-whisper (much faster), fallback to standard whisper
@@ -13,83 +14,274 @@ except ImportError:
     print("For better performance, install: pip install faster-whisper")
 
 
-# Load Whisper model
-print("Loading Whisper model...")
-if USE_FASTER_WHISPER:
-    # faster-whisper uses GPU by default if available
-    model = WhisperModel("distil-medium.en", device="cuda", compute_type="float16", num_workers=4)
-    print("Model loaded on GPU!\n")
-else:
-    # Standard whisper
-    model = whisper.load_model("base")
-    print("Model loaded on CPU (slow)\n")
+# Main Whisper model, loaded on first use (in the transcription process when
+# main.py runs Whisper out of process, so the GUI process never loads it)
+model = None
+_model_lock = threading.Lock()
 
 
-# Transcription worker thread
-def transcription_worker(sample_rate, channels, transcription_queue, results_queue, min_audio_duration=0.5):
-    """Background thread that processes transcription queue"""
-    import sys
+def get_model():
+    global model
+    with _model_lock:
+        if model is None:
+            print("Loading Whisper model...")
+            if USE_FASTER_WHISPER:
+                # faster-whisper uses GPU by default if available
+                model = WhisperModel("distil-medium.en", device="cuda", compute_type="float16", num_workers=4)
+                print("Model loaded on GPU!\n")
+            else:
+                # Standard whisper
+                model = whisper.load_model("base")
+                print("Model loaded on CPU (slow)\n")
+    return model
+
+# Cheaper model for the candidate's own speech (optional, see main.py)
+CANDIDATE_MODEL = "tiny.en"
+# Smaller model used by the quality governor's lowest level (see quality_governor.py)
+FALLBACK_MODEL = "base.en"
+
+
+def load_cheap_model(name=CANDIDATE_MODEL):
+    """Load a small Whisper model on the CPU (does not compete with the main model's GPU)"""
+    print(f"Loading cheap Whisper model ({name})...")
+    if USE_FASTER_WHISPER:
+        return WhisperModel(name, device="cpu", compute_type="int8")
+    return whisper.load_model(name)
+
+
+# Batched decoding of queued chunks
+MAX_BATCH_SIZE = 8  # Queued chunks decoded together (1 = one at a time)
+
+_batched_pipelines = {}  # id(model) -> faster-whisper BatchedInferencePipeline
+_fallback_model = None   # Loaded the first time the governor needs it
+
+# Decoding settings when no governor is used (standard whisper decodes greedily by default)
+DEFAULT_SETTINGS = {'beam_size': 5 if USE_FASTER_WHISPER else 1,
+                    'temperature': (0.0, 0.2, 0.4, 0.6, 0.8, 1.0)}
+
+
+def prepare_audio(audio_bytes, sample_rate, channels):
+    """int16 PCM bytes -> float32 mono 16 kHz array for Whisper"""
+    audio_array = np.frombuffer(audio_bytes, dtype=np.int16)
+    audio_float = audio_array.astype(np.float32) / 32768.0
     
-    while True:
-        task = transcription_queue.get()
+    # Convert stereo to mono if needed
+    if channels == 2:
+        audio_float = audio_float.reshape(-1, 2).mean(axis=1)
+    
+    # Resample to 16kHz for Whisper
+    if sample_rate != 16000:
+        ratio = sample_rate / 16000
+        indices = np.arange(0, len(audio_float), ratio).astype(int)
+        audio_float = audio_float[indices]
+    return audio_float
+
+
+def get_fallback_model():
+    global _fallback_model
+    if _fallback_model is None:
+        _fallback_model = load_cheap_model(FALLBACK_MODEL)
+    return _fallback_model
+
+
+def warm_up(whisper_model=None, seconds=1.0):
+    """
+    Decode a short synthetic clip once at load time, so the first real chunk
+    does not pay kernel compilation, CUDA context and allocator warm-up.
+    """
+    whisper_model = whisper_model or get_model()
+    audio = (np.random.default_rng(0).standard_normal(int(seconds * 16000)) * 0.01).astype(np.float32)
+    start_time = time.time()
+    try:
+        if USE_FASTER_WHISPER:
+            # The VAD would skip noise without decoding; segments are generated lazily
+            segments, info = whisper_model.transcribe(audio, language="en", beam_size=DEFAULT_SETTINGS['beam_size'],
+                                                      vad_filter=False)
+            list(segments)
+        else:
+            whisper_model.transcribe(audio, fp16=False, language="en")
+        print(f"Whisper warmed up in {time.time() - start_time:.2f}s")
+    except Exception as e:
+        print(f"[NEGATIVE] Whisper warm-up failed: {e}")
+
+
+def transcribe_one(whisper_model, audio_float, settings=None, prompt=None):
+    """
+    Decode one chunk (settings: beam_size and temperature, see DEFAULT_SETTINGS;
+    prompt: initial prompt, see decoder_context.DecoderContext)
+    """
+    settings = settings or DEFAULT_SETTINGS
+    if USE_FASTER_WHISPER:
+        segments, info = whisper_model.transcribe(
+            audio_float,
+            language="en",
+            beam_size=settings['beam_size'],
+            temperature=settings['temperature'],
+            initial_prompt=prompt,
+            vad_filter=True
+        )
+        return " ".join([segment.text for segment in segments]).strip()
+    
+    result = whisper_model.transcribe(
+        audio_float, 
+        fp16=False, 
+        language="en",
+        beam_size=settings['beam_size'] if settings['beam_size'] > 1 else None,
+        temperature=settings['temperature'],
+        initial_prompt=prompt,
+        condition_on_previous_text=False
+    )
+    return result["text"].strip()
+
+
+def transcribe_batch(whisper_model, audios, settings=None, prompt=None):
+    """
+    Decode several chunks in one batched pass, one text per chunk.
+    
+    faster-whisper: the chunks are concatenated and their speech regions
+    (same VAD as vad_filter=True) are passed as clip timestamps to the
+    batched pipeline; each segment goes back to the chunk it starts in.
+    Standard whisper: the chunks are padded to 30s and decoded as one batch.
+    All chunks share the same initial prompt.
+    """
+    settings = settings or DEFAULT_SETTINGS
+    if len(audios) == 1:
+        return [transcribe_one(whisper_model, audios[0], settings, prompt)]
+    
+    if USE_FASTER_WHISPER:
+        from faster_whisper import BatchedInferencePipeline
+        from faster_whisper.vad import VadOptions, get_speech_timestamps
         
-        if task is None:  # Poison pill to stop thread
-            break
+        pipeline = _batched_pipelines.get(id(whisper_model))
+        if pipeline is None:
+            pipeline = _batched_pipelines[id(whisper_model)] = BatchedInferencePipeline(model=whisper_model)
         
-        audio_bytes, task_id = task
+        clips = []
+        starts = []  # First sample of every chunk in the concatenated audio
+        offset = 0
+        for audio in audios:
+            starts.append(offset)
+            for speech in get_speech_timestamps(audio, VadOptions()):
+                clips.append({"start": offset + speech["start"], "end": offset + speech["end"]})
+            offset += len(audio)
         
-        try:
-            # Convert to audio array for Whisper
-            audio_array = np.frombuffer(audio_bytes, dtype=np.int16)
-            audio_float = audio_array.astype(np.float32) / 32768.0
-            
-            # Convert stereo to mono if needed
-            if channels == 2:
-                audio_float = audio_float.reshape(-1, 2).mean(axis=1)
+        texts = [[] for _ in audios]
+        if clips:
+            segments, info = pipeline.transcribe(
+                np.concatenate(audios),
+                language="en",
+                beam_size=settings['beam_size'],
+                temperature=settings['temperature'],
+                initial_prompt=prompt,
+                batch_size=len(clips),
+                vad_filter=False,
+                clip_timestamps=clips
+            )
+            for segment in segments:
+                owner = int(np.searchsorted(starts, segment.start * 16000, side="right")) - 1
+                texts[max(owner, 0)].append(segment.text)
+        return [" ".join(parts).strip() for parts in texts]
+    
+    import torch
+    mels = torch.stack([
+        whisper.log_mel_spectrogram(whisper.pad_or_trim(audio), whisper_model.dims.n_mels)
+        for audio in audios
+    ]).to(whisper_model.device)
+    # Batched decoding has no temperature fallback: greedy or beam search at 0
+    beam_size = settings['beam_size'] if settings['beam_size'] > 1 else None
+    results = whisper.decode(whisper_model, mels,
+                             whisper.DecodingOptions(language="en", fp16=False, beam_size=beam_size,
+                                                     prompt=prompt))
+    return [result.text.strip() for result in results]
+
+
+# Transcription worker thread
+def transcription_worker(sample_rate, channels, transcription_queue, results_queue, min_audio_duration=0.5,
+                         whisper_model=None, stats=None, max_batch_size=MAX_BATCH_SIZE, governor=None,
+                         context=None):
+    """
+    Background thread that processes transcription queue.
+    
+    Chunks waiting in the queue are drained and decoded together (up to
+    max_batch_size); results are still delivered per task_id, in order.
+    
+    whisper_model: model to use instead of the main one (e.g. load_cheap_model())
+    stats: optional dict accumulating 'tasks', 'batches', 'audio_seconds' and 'decode_seconds'
+    governor: optional QualityGovernor choosing the decoding settings and model tier
+    context: optional DecoderContext; its prompt primes each decode, and the
+             decoded text is carried over to the next one
+    """
+    import sys
+    whisper_model = whisper_model or get_model()
+    running = True
+    
+    while running:
+        tasks = [transcription_queue.get()]
+        while len(tasks) < max_batch_size and not transcription_queue.empty():
+            tasks.append(transcription_queue.get_nowait())
+        
+        batch = []  # (task_id, audio) to decode
+        for task in tasks:
+            if task is None:  # Poison pill to stop thread (after this batch)
+                running = False
+                transcription_queue.task_done()
+                continue
             
-            # Resample to 16kHz for Whisper
-            if sample_rate != 16000:
-                ratio = sample_rate / 16000
-                indices = np.arange(0, len(audio_float), ratio).astype(int)
-                audio_float = audio_float[indices]
+            audio_bytes, task_id = task
+            try:
+                audio_float = prepare_audio(audio_bytes, sample_rate, channels)
+            except Exception as e:
+                print(f"\n[Transcription error for task #{task_id}: {e}]")
+                audio_float = np.zeros(0, dtype=np.float32)
             
             # Check if audio is long enough
-            audio_duration = len(audio_float) / 16000
-            if audio_duration < min_audio_duration:
+            if len(audio_float) / 16000 < min_audio_duration:
                 results_queue.put((task_id, ""))
                 transcription_queue.task_done()
                 continue
-            
-            # Transcribe
-            start_time = time.time()
-            if USE_FASTER_WHISPER:
-                segments, info = model.transcribe(
-                    audio_float,
-                    language="en",
-                    beam_size=5,
-                    vad_filter=True
-                )
-                text = " ".join([segment.text for segment in segments]).strip()
-            else:
-                result = model.transcribe(
-                    audio_float, 
-                    fp16=False, 
-                    language="en",
-                    condition_on_previous_text=False
-                )
-                text = result["text"].strip()
-            
-            elapsed = time.time() - start_time
-            
-            # Debug: print to stderr so it doesn't interfere with main output
-            # print(f"[Worker] Task #{task_id} done in {elapsed:.1f}s: '{text[:50]}...'", file=sys.stderr)
-            
-            results_queue.put((task_id, text))
-            
+            batch.append((task_id, audio_float))
+        
+        if not batch:
+            continue
+        
+        # Transcribe
+        settings = governor.settings if governor else None
+        active_model = whisper_model
+        if settings and settings['model'] == 'fallback':
+            active_model = get_fallback_model()
+        prompt = context.prompt() if context else None
+        start_time = time.time()
+        audios = [audio for _, audio in batch]
+        try:
+            texts = transcribe_batch(active_model, audios, settings, prompt)
         except Exception as e:
             import traceback
-            print(f"\n[Transcription error for task #{task_id}: {e}]")
+            task_ids = ", ".join(f"#{task_id}" for task_id, _ in batch)
+            print(f"\n[Transcription error for task {task_ids}: {e}]")
             traceback.print_exc()
-            results_queue.put((task_id, ""))
+            texts = [""] * len(batch)
+            if len(batch) > 1:
+                # Retry one by one so a single bad chunk does not empty the whole batch
+                for i, (task_id, audio) in enumerate(batch):
+                    try:
+                        texts[i] = transcribe_one(active_model, audio, settings, prompt)
+                    except Exception as e:
+                        print(f"\n[Transcription error for task #{task_id}: {e}]")
         
-        transcription_queue.task_done()
\ No newline at end of file
+        elapsed = time.time() - start_time
+        if stats is not None:
+            stats['tasks'] = stats.get('tasks', 0) + len(batch)
+            stats['batches'] = stats.get('batches', 0) + 1
+            stats['audio_seconds'] = stats.get('audio_seconds', 0.0) + sum(len(a) for a in audios) / 16000
+            stats['decode_seconds'] = stats.get('decode_seconds', 0.0) + elapsed
+        if governor:
+            governor.record(sum(len(a) for a in audios) / 16000, elapsed, transcription_queue.qsize(), len(batch))
+        
+        # Debug: print to stderr so it doesn't interfere with main output
+        # print(f"[Worker] {len(batch)} tasks done in {elapsed:.1f}s", file=sys.stderr)
+        
+        for (task_id, _), text in zip(batch, texts):
+            if context:
+                context.commit(text)
+            results_queue.put((task_id, text))
+            transcription_queue.task_done()